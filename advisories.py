@@ -0,0 +1,203 @@
+"""Precomputed stage advisories for every crop x growth stage x district.
+
+The crop tracker's stage recommendations depend only on the crop, its
+growth stage and the district, so they are generated offline in one
+Message Batches job (half the price of live calls, no rate-limit pressure
+on the app) and stored in ``stage_advisories``. The tracker shows the stored
+advisory instantly and only calls the live model for a farmer's own
+follow-up question.
+
+    python advisories.py [--crop Onion] [--district Nashik] [--refresh] [--fake]
+    python advisories.py --collect <batch_id>
+
+``--fake`` uses ``FakeBatchClient``, which answers locally with templated
+text, to try the pipeline without an API key.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+from types import SimpleNamespace
+
+import ai_prompts
+import db
+import queries
+from agri_data import CROP_DATABASE, MAHARASHTRA_LOCATIONS
+
+logger = logging.getLogger(__name__)
+
+# Advisories older than this are regenerated by the next run.
+MAX_AGE_DAYS = int(os.environ.get("KRISHIMITRA_ADVISORY_MAX_AGE_DAYS", "30"))
+POLL_SECONDS = 30
+
+_UPSERT = '''INSERT INTO stage_advisories (crop, stage, district, advisory, model, batch_id, generated_at)
+             VALUES (?, ?, ?, ?, ?, ?, ?)
+             ON CONFLICT(crop, stage, district) DO UPDATE SET
+                 advisory = excluded.advisory, model = excluded.model,
+                 batch_id = excluded.batch_id, generated_at = excluded.generated_at'''
+
+
+def stages(crop):
+    return CROP_DATABASE.get(crop, {}).get("critical_growth_stages", [])
+
+
+def stage_for_day(crop, day):
+    """The crop's growth stage covering ``day`` days after sowing, or None"""
+    for stage in stages(crop):
+        day_range = stage["days"].split("-")
+        if int(day_range[0]) <= day <= int(day_range[-1]):
+            return stage
+    return None
+
+
+def custom_id(crop, stage, district):
+    """Batch request id (the API allows only [A-Za-z0-9_-], up to 64 chars)"""
+    return "adv-" + hashlib.sha256(f"{crop}|{stage}|{district}".encode("utf-8")).hexdigest()[:32]
+
+
+def advisory_prompt(crop, stage, district):
+    return f"""Crop: {crop}
+Growth stage: {stage['stage']} (days {stage['days']} after sowing)
+Water need at this stage: {stage.get('water_need', 'Unknown')}
+Nutrient focus: {stage.get('nutrients', 'Unknown')}
+District: {district}, Maharashtra"""
+
+
+def enumerate_keys(crops=None, districts=None):
+    """Every (crop, stage, district) to precompute"""
+    return [(crop, stage["stage"], district)
+            for crop in (crops or CROP_DATABASE)
+            for stage in stages(crop)
+            for district in (districts or MAHARASHTRA_LOCATIONS)]
+
+
+def _stale_keys(keys, max_age_days):
+    cutoff = time.time() - max_age_days * 86400
+    fresh = set(db.query("SELECT crop, stage, district FROM stage_advisories WHERE generated_at >= ?",
+                         (cutoff,)))
+    return [key for key in keys if key not in fresh]
+
+
+def batch_requests(keys):
+    by_name = {(crop, s["stage"]): s for crop in {k[0] for k in keys} for s in stages(crop)}
+    system = ai_prompts.system_blocks("stage_advisory", None)
+    return [{"custom_id": custom_id(crop, stage, district),
+             "params": {"model": ai_prompts.MODEL,
+                        "max_tokens": ai_prompts.MAX_TOKENS,
+                        "system": system,
+                        "messages": [{"role": "user",
+                                      "content": advisory_prompt(crop, by_name[(crop, stage)], district)}]}}
+            for crop, stage, district in keys]
+
+
+def submit(client, keys):
+    """Submit one batch for ``keys``; returns the batch id"""
+    batch = client.messages.batches.create(requests=batch_requests(keys))
+    db.execute("INSERT INTO advisory_batches (batch_id, submitted_at, requests, status) VALUES (?, ?, ?, ?)",
+               (batch.id, time.time(), len(keys), batch.processing_status))
+    logger.info("Submitted advisory batch %s with %d requests", batch.id, len(keys))
+    return batch.id
+
+
+def wait(client, batch_id, poll_seconds=POLL_SECONDS):
+    while True:
+        batch = client.messages.batches.retrieve(batch_id)
+        db.execute("UPDATE advisory_batches SET status = ? WHERE batch_id = ?",
+                   (batch.processing_status, batch_id))
+        if batch.processing_status == "ended":
+            return batch
+        logger.info("Batch %s: %s", batch_id, batch.request_counts)
+        time.sleep(poll_seconds)
+
+
+def collect(client, batch_id, keys=None):
+    """Store a finished batch's advisories; returns (succeeded, failed)"""
+    by_id = {custom_id(*key): key for key in (keys or enumerate_keys())}
+    rows, failed = [], 0
+    now = time.time()
+    for item in client.messages.batches.results(batch_id):
+        key = by_id.get(item.custom_id)
+        if key is None or item.result.type != "succeeded":
+            failed += 1
+            logger.warning("Advisory %s not stored: %s", item.custom_id, item.result.type)
+            continue
+        message = item.result.message
+        rows.append(key + (message.content[0].text, message.model, batch_id, now))
+    if rows:
+        db.executemany(_UPSERT, rows)
+    db.execute('''UPDATE advisory_batches SET status = 'collected', succeeded = ?, failed = ?, collected_at = ?
+                  WHERE batch_id = ?''', (len(rows), failed, now, batch_id))
+    return len(rows), failed
+
+
+def precompute(client, crops=None, districts=None, refresh=False,
+               max_age_days=MAX_AGE_DAYS, poll_seconds=POLL_SECONDS):
+    """Generate every missing or stale advisory in one batch; returns (succeeded, failed)"""
+    keys = enumerate_keys(crops, districts)
+    if not refresh:
+        keys = _stale_keys(keys, max_age_days)
+    if not keys:
+        return 0, 0
+    batch_id = submit(client, keys)
+    wait(client, batch_id, poll_seconds)
+    return collect(client, batch_id, keys)
+
+
+def get_advisory(crop, stage, district):
+    """``(advisory, generated_at)`` or None"""
+    return db.query_one(queries.STAGE_ADVISORY, (crop, stage, district))
+
+
+class FakeBatchClient:
+    """Offline stand-in for ``anthropic.Anthropic`` covering ``messages.batches``"""
+
+    def __init__(self):
+        self._batches = {}
+        self.messages = SimpleNamespace(batches=SimpleNamespace(
+            create=self._create, retrieve=self._retrieve, results=self._results))
+
+    def _create(self, requests):
+        batch_id = f"msgbatch_fake_{len(self._batches) + 1}"
+        self._batches[batch_id] = list(requests)
+        return self._retrieve(batch_id)
+
+    def _retrieve(self, batch_id):
+        counts = SimpleNamespace(processing=0, succeeded=len(self._batches[batch_id]),
+                                 errored=0, canceled=0, expired=0)
+        return SimpleNamespace(id=batch_id, processing_status="ended", request_counts=counts)
+
+    def _results(self, batch_id):
+        for request in self._batches[batch_id]:
+            params = request["params"]
+            text = ("Fake advisory (generated offline) for:\n" + params["messages"][0]["content"])
+            message = SimpleNamespace(model=params["model"], content=[SimpleNamespace(type="text", text=text)])
+            yield SimpleNamespace(custom_id=request["custom_id"],
+                                  result=SimpleNamespace(type="succeeded", message=message))
+
+
+def _client(fake):
+    if fake:
+        return FakeBatchClient()
+    from anthropic import Anthropic
+    return Anthropic()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Precompute crop stage advisories with the Message Batches API")
+    parser.add_argument("--crop", action="append", choices=sorted(CROP_DATABASE))
+    parser.add_argument("--district", action="append", choices=sorted(MAHARASHTRA_LOCATIONS))
+    parser.add_argument("--refresh", action="store_true", help="regenerate advisories that are still fresh")
+    parser.add_argument("--collect", metavar="BATCH_ID", help="store the results of an already submitted batch")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="seconds between batch status checks")
+    parser.add_argument("--fake", action="store_true", help="use the offline fake client")
+    args = parser.parse_args()
+    db.ensure_schema()
+    client = _client(args.fake)
+    if args.collect:
+        wait(client, args.collect, args.poll)
+        succeeded, failed = collect(client, args.collect)
+    else:
+        succeeded, failed = precompute(client, args.crop, args.district, args.refresh, poll_seconds=args.poll)
+    print(f"{succeeded} advisories stored, {failed} failed")
@@ -0,0 +1,548 @@
+"""Reference data shared by the app, the importers and the AI prompts.
+
+Plain module-level constants so command-line tools can use them without
+importing the Streamlit app.
+"""
+
+# Maharashtra Locations
+MAHARASHTRA_LOCATIONS = {
+    "Pune": {
+        "tehsils": {
+            "Pune City": ["Shivajinagar", "Kothrud", "Hadapsar", "Yerawada", "Aundh", "Deccan", "Swargate", "Kasba Peth", "Bibwewadi", "Warje"],
+            "Haveli": ["Phursungi", "Manjri", "Uruli Kanchan", "Wagholi", "Lohegaon", "Undri", "Kondhwa", "Pisoli", "Uttamnagar"],
+            "Mulshi": ["Paud", "Pirangut", "Lavale", "Mulshi", "Tamhini", "Valvan", "Donaje", "Kolwan"],
+            "Maval": ["Talegaon", "Vadgaon Maval", "Kamshet", "Lonavala", "Khandala", "Karla", "Bhaje", "Uksan"],
+            "Bhor": ["Bhor", "Nasrapur", "Yavat", "Khandas", "Sangvi", "Randullabad"],
+            "Velhe": ["Velhe", "Shindawane", "Kenjal", "Garade", "Pabe", "Shirgaon"],
+            "Purandhar": ["Saswad", "Jejuri", "Pargaon", "Narayanpur", "Dive", "Bopdev", "Nimgaon Ketki"],
+            "Baramati": ["Baramati", "Morgaon", "Bhigwan", "Kurkumbh", "Malad", "Supe", "Nira"],
+            "Indapur": ["Indapur", "Akluj", "Nimgaon Ketki", "Bhigwan", "Karkamb", "Walchandnagar"],
+            "Daund": ["Daund", "Kurkundi", "Yevat", "Patas", "Ranjangaon", "Loni Kalbhor", "Supa"],
+            "Shirur": ["Shirur", "Shikrapur", "Kendal", "Pabal", "Talegaon Dhamdhere", "Ranjangaon Ganpati", "Nhavara"],
+            "Khed": ["Rajgurunagar", "Chakan", "Manchar", "Kusgaon", "Alandi", "Ranjangaon", "Kendal"],
+            "Junnar": ["Junnar", "Narayangaon", "Otur", "Alephata", "Manchar", "Wadgaon", "Pimpri"],
+            "Ambegaon": ["Ghodegaon", "Manchar", "Pargaon", "Bhigwan", "Jeur", "Kalamb", "Shirur"]
+        }
+    },
+    "Mumbai Suburban": {
+        "tehsils": {
+            "Kurla": ["Kurla East", "Kurla West", "Chunabhatti", "Tilak Nagar", "Ghatkopar", "Chembur"],
+            "Andheri": ["Andheri East", "Andheri West", "Jogeshwari", "Vile Parle", "Santacruz", "Goregaon"],
+            "Borivali": ["Borivali East", "Borivali West", "Kandivali", "Malad", "Dahisar", "Mira Road"]
+        }
+    },
+    "Nagpur": {
+        "tehsils": {
+            "Nagpur Urban": ["Dharampeth", "Sadar", "Hingna", "Nandanvan", "Civil Lines", "Sitabuldi"],
+            "Nagpur Rural": ["Kalmeshwar", "Kamptee", "Ramtek", "Parseoni", "Mouda", "Kuhi"],
+            "Umred": ["Umred", "Khapa", "Bhiwapur", "Kuhi"],
+            "Kalameshwar": ["Kalameshwar", "Mouza", "Parseoni", "Savner", "Hinganghat"]
+        }
+    },
+    "Nashik": {
+        "tehsils": {
+            "Nashik": ["Nashik Road", "Panchavati", "Satpur", "Deolali", "College Road", "Cidco"],
+            "Igatpuri": ["Igatpuri", "Ghoti", "Trimbakeshwar", "Peth"],
+            "Sinnar": ["Sinnar", "Malegaon", "Nandgaon", "Manmad"],
+            "Niphad": ["Niphad", "Dindori", "Vani"],
+            "Dindori": ["Dindori", "Peth", "Mohadi"],
+            "Kalwan": ["Kalwan", "Satana", "Surgana"],
+            "Yeola": ["Yeola", "Nandgaon"],
+            "Chandwad": ["Chandwad", "Malegaon Camp"],
+            "Surgana": ["Surgana", "Peth", "Trimbak"],
+            "Peint": ["Peint", "Deola"],
+            "Trimbakeshwar": ["Trimbak", "Anjaneri", "Nimon"],
+            "Baglan": ["Satana", "Malegaon", "Kalwan"],
+            "Malegaon": ["Malegaon City", "Malegaon Camp", "Nandgaon"],
+            "Nandgaon": ["Nandgaon", "Vani", "Malegaon"],
+            "Satana": ["Satana", "Dindori", "Kalwan"]
+        }
+    },
+    "Thane": {
+        "tehsils": {
+            "Thane": ["Naupada", "Kopri", "Vartak Nagar", "Wagle Estate", "Ghodbunder", "Majiwada"],
+            "Kalyan": ["Kalyan East", "Kalyan West", "Dombivli East", "Dombivli West", "Titwala", "Ambernath"],
+            "Bhiwandi": ["Bhiwandi", "Nizampur", "Anjur", "Padgha"],
+            "Shahapur": ["Shahapur", "Asangaon", "Atgaon", "Vashind", "Tokawade"],
+            "Ulhasnagar": ["Ulhasnagar 1", "Ulhasnagar 2", "Ulhasnagar 3", "Ulhasnagar 4", "Ulhasnagar 5"],
+            "Murbad": ["Murbad", "Khardi", "Tokawade"],
+            "Dahanu": ["Dahanu", "Bordi", "Kasa"],
+            "Palghar": ["Palghar", "Vasai", "Virar"],
+            "Jawhar": ["Jawhar", "Mokhada"],
+            "Mokhada": ["Mokhada", "Vikramgad"],
+            "Talasari": ["Talasari", "Dahanu"],
+            "Vikramgad": ["Vikramgad", "Jawhar"],
+            "Vasai": ["Vasai East", "Vasai West", "Nala Sopara"],
+            "Wada": ["Wada", "Vikramgad"]
+        }
+    },
+    "Aurangabad": {
+        "tehsils": {
+            "Aurangabad": ["Aurangabad City", "Paithan", "Gangapur", "Vaijapur"],
+            "Paithan": ["Paithan", "Gangapur", "Phulambri"],
+            "Gangapur": ["Gangapur", "Vaijapur"],
+            "Vaijapur": ["Vaijapur", "Harsul"],
+            "Kannad": ["Kannad", "Phulambri"],
+            "Sillod": ["Sillod", "Phulambri"],
+            "Phulambri": ["Phulambri", "Khultabad"],
+            "Khultabad": ["Khultabad", "Vaijapur"],
+            "Soegaon": ["Soegaon", "Sillod"]
+        }
+    },
+    "Solapur": {
+        "tehsils": {
+            "Solapur North": ["Solapur City", "Barshi", "Karmala"],
+            "Solapur South": ["Solapur South", "Mohol", "Malshiras"],
+            "Barshi": ["Barshi", "Karmala"],
+            "Karmala": ["Karmala", "Madha"],
+            "Madha": ["Madha", "Karmala"],
+            "Mohol": ["Mohol", "Pandharpur"],
+            "Pandharpur": ["Pandharpur", "Malshiras"],
+            "Malshiras": ["Malshiras", "Sangole"],
+            "Sangole": ["Sangole", "Pandharpur"],
+            "Mangalvedhe": ["Mangalvedhe", "Barshi"],
+            "Akkalkot": ["Akkalkot", "Solapur South"]
+        }
+    },
+    "Kolhapur": {
+        "tehsils": {
+            "Kolhapur": ["Kolhapur City", "Karveer", "Panhala", "Hatkanangle"],
+            "Karveer": ["Kolhapur", "Shirol"],
+            "Panhala": ["Panhala", "Shahuwadi"],
+            "Shahuwadi": ["Shahuwadi", "Bavda"],
+            "Hatkanangle": ["Hatkanangle", "Nesari"],
+            "Shirol": ["Shirol", "Kurundwad"],
+            "Radhanagari": ["Radhanagari", "Gaganbawda"],
+            "Kagal": ["Kagal", "Hatkanangle"],
+            "Bhudargad": ["Bhudargad", "Ajra"],
+            "Ajra": ["Ajra", "Gadhinglaj"],
+            "Gadhinglaj": ["Gadhinglaj", "Chandgad"],
+            "Chandgad": ["Chandgad", "Bhudargad"]
+        }
+    },
+    "Ahmednagar": {
+        "tehsils": {
+            "Ahmednagar": ["Ahmednagar City", "Nagar", "Shevgaon"],
+            "Nagar": ["Nagar", "Rahuri"],
+            "Shrigonda": ["Shrigonda", "Parner", "Karjat"],  # HERE IT IS!
+            "Parner": ["Parner", "Shrigonda"],
+            "Sangamner": ["Sangamner", "Akole", "Kopargaon"],
+            "Kopargaon": ["Kopargaon", "Shrirampur"],
+            "Rahuri": ["Rahuri", "Nevasa"],
+            "Nevasa": ["Nevasa", "Pathardi"],
+            "Pathardi": ["Pathardi", "Shrigonda"],
+            "Akole": ["Akole", "Sangamner"],
+            "Shevgaon": ["Shevgaon", "Karjat"],
+            "Karjat": ["Karjat", "Jamkhed"],
+            "Jamkhed": ["Jamkhed", "Karjat"],
+            "Shrirampur": ["Shrirampur", "Kopargaon"],
+            "Rahata": ["Rahata", "Shrirampur"]
+        }
+    },
+    "Satara": {
+        "tehsils": {
+            "Satara": ["Satara City", "Karad", "Koregaon", "Phaltan"],
+            "Karad": ["Karad", "Patan"],
+            "Koregaon": ["Koregaon", "Satara"],
+            "Phaltan": ["Phaltan", "Lonand"],
+            "Wai": ["Wai", "Mahabaleshwar"],
+            "Mahabaleshwar": ["Mahabaleshwar", "Panchgani"],
+            "Patan": ["Patan", "Khandala"],
+            "Khandala": ["Khandala", "Satara"],
+            "Jaoli": ["Jaoli", "Koregaon"],
+            "Khatav": ["Khatav", "Phaltan"],
+            "Maan": ["Maan", "Khatav"]
+        }
+    },
+    "Sangli": {
+        "tehsils": {
+            "Sangli": ["Sangli City", "Miraj", "Tasgaon", "Jat"],
+            "Miraj": ["Miraj", "Kavathe Mahankal"],
+            "Tasgaon": ["Tasgaon", "Kavalapur"],
+            "Jat": ["Jat", "Khanapur"],
+            "Walwa": ["Walwa", "Islampur"],
+            "Khanapur": ["Khanapur", "Atpadi"],
+            "Atpadi": ["Atpadi", "Palus"],
+            "Palus": ["Palus", "Kavalapur"],
+            "Kavalapur": ["Kavalapur", "Tasgaon"],
+            "Shirala": ["Shirala", "Walwa"]
+        }
+    }
+}
+
+# Crop Database with ALL original details
+CROP_DATABASE = {
+    "Rice": {
+        "seed_rate_kg_per_acre": "10-12",
+        "spacing": "20cm x 15cm",
+        "water_requirement": "485-607 mm",
+        "duration_days": "120-150",
+        "expected_yield_tons": "1.6-2.4",
+        "best_season": "Kharif (June-October)",
+        "soil_type": "Clay loam, silt loam",
+        "market_price_range": "₹2000-2800/quintal",
+        "msp_2024": "₹2183/quintal",
+        "insurance_premium_percent": "2.0",
+        "critical_growth_stages": [
+            {"stage": "Germination", "days": "0-10", "water_need": "High", "nutrients": "Minimal"},
+            {"stage": "Tillering", "days": "15-40", "water_need": "Medium", "nutrients": "High N"},
+            {"stage": "Panicle Initiation", "days": "45-65", "water_need": "Critical", "nutrients": "Balanced NPK"},
+            {"stage": "Flowering", "days": "70-90", "water_need": "High", "nutrients": "Low N, High K"},
+            {"stage": "Grain Filling", "days": "95-120", "water_need": "Medium", "nutrients": "K only"}
+        ],
+        "detailed_practices": {
+            "land_preparation": [
+                "First plowing: Deep plowing to 20-25 cm depth after monsoon onset",
+                "Puddle the field 2-3 times with 5 cm water standing",
+                "Level the field properly for uniform water distribution",
+                "Create 30 cm height bunds to retain water",
+                "Apply decomposed FYM 2 weeks before transplanting"
+            ],
+            "nursery_management": [
+                "Seed treatment: Soak seeds in water for 24 hours, incubate for 48 hours",
+                "Prepare raised nursery bed of 1m width, 10m length, 15cm height",
+                "Apply 2 kg Urea, 4 kg SSP per 100 sq.m nursery",
+                "Sow pre-germinated seeds @ 20-25 kg per hectare",
+                "Maintain 2-3 cm water in nursery after 3 days of sowing"
+            ],
+            "transplanting": [
+                "Transplant 21-25 days old seedlings (3-4 leaf stage)",
+                "Plant 2-3 seedlings per hill at 20x15 cm spacing",
+                "Transplant at shallow depth (2-3 cm) for better tillering",
+                "Complete transplanting within 3-4 weeks for uniform maturity",
+                "Replant missing hills within 7 days"
+            ]
+        },
+        "chemical_fertilizers": {
+            "urea_kg": "65",
+            "dap_kg": "50",
+            "mop_kg": "20",
+            "total_npk": "48:24:16 kg/acre",
+            "application_schedule": [
+                "Basal: 50% N + 100% P + 100% K at transplanting",
+                "First top dressing: 25% N at tillering (21-25 days)",
+                "Second top dressing: 25% N at panicle initiation (40-45 days)"
+            ]
+        },
+        "organic_fertilizers": {
+            "fym_tons": "4-5",
+            "vermicompost_kg": "500-600",
+            "neem_cake_kg": "100",
+            "green_manure": "Dhaincha or Sunhemp - 8-10 kg/acre",
+            "biofertilizers": "Azospirillum + PSB @ 2 kg each per acre",
+        },
+        "common_pests": ["Stem Borer", "Brown Plant Hopper", "Leaf Folder"],
+        "common_diseases": ["Blast Disease", "Sheath Blight", "Bacterial Leaf Blight"],
+        "rotation_crops": ["Wheat", "Chickpea", "Mustard"],
+        "intercrop_options": ["None (flooded conditions)"],
+        "export_potential": "Medium",
+        "storage_duration_months": "6-12",
+        "processing_options": ["Milling", "Parboiling", "Flaking"]
+    },
+    "Wheat": {
+        "seed_rate_kg_per_acre": "40-50",
+        "spacing": "20-23cm row spacing",
+        "water_requirement": "182-263 mm",
+        "duration_days": "110-130",
+        "expected_yield_tons": "1.6-2.0",
+        "best_season": "Rabi (November-March)",
+        "soil_type": "Loam to clay loam",
+        "market_price_range": "₹2000-2400/quintal",
+        "msp_2024": "₹2125/quintal",
+        "insurance_premium_percent": "1.5",
+        "critical_growth_stages": [
+            {"stage": "Crown Root Initiation", "days": "20-25", "water_need": "Critical", "nutrients": "High N"},
+            {"stage": "Tillering", "days": "30-50", "water_need": "Medium", "nutrients": "High N"},
+            {"stage": "Jointing", "days": "60-70", "water_need": "High", "nutrients": "Balanced NPK"},
+            {"stage": "Flowering", "days": "80-85", "water_need": "Critical", "nutrients": "Low N, High K"},
+            {"stage": "Grain Filling", "days": "95-110", "water_need": "Medium", "nutrients": "K only"}
+        ],
+        "chemical_fertilizers": {
+            "urea_kg": "87",
+            "dap_kg": "65",
+            "mop_kg": "17",
+            "total_npk": "48:24:16 kg/acre",
+            "application_schedule": [
+                "Basal: 50% N + 100% P + 100% K at sowing",
+                "First top dressing: 25% N at CRI (21 days)",
+                "Second top dressing: 25% N at tillering (45 days)"
+            ]
+        },
+        "organic_fertilizers": {
+            "fym_tons": "4-5",
+            "vermicompost_kg": "500-600",
+            "neem_cake_kg": "80-100",
+            "biofertilizers": "Azotobacter + PSB @ 2 kg each per acre",
+        },
+        "common_pests": ["Aphids", "Termites"],
+        "common_diseases": ["Yellow Rust", "Brown Rust", "Powdery Mildew"],
+        "rotation_crops": ["Rice", "Cotton", "Soybean"],
+        "intercrop_options": ["Chickpea", "Mustard"],
+        "export_potential": "Low",
+        "storage_duration_months": "6-9",
+        "processing_options": ["Flour milling", "Semolina", "Bread"]
+    },
+    "Cotton": {
+        "seed_rate_kg_per_acre": "5-6",
+        "spacing": "90cm x 60cm",
+        "water_requirement": "283-526 mm",
+        "duration_days": "150-180",
+        "expected_yield_tons": "0.8-1.2",
+        "best_season": "Kharif (May-June sowing)",
+        "soil_type": "Deep black cotton soil",
+        "market_price_range": "₹5500-7000/quintal",
+        "msp_2024": "₹6620/quintal",
+        "insurance_premium_percent": "2.0",
+        "critical_growth_stages": [
+            {"stage": "Germination", "days": "0-15", "water_need": "High", "nutrients": "Minimal"},
+            {"stage": "Square Formation", "days": "40-60", "water_need": "Critical", "nutrients": "High N"},
+            {"stage": "Flowering", "days": "70-100", "water_need": "Critical", "nutrients": "Balanced NPK"},
+            {"stage": "Boll Development", "days": "105-140", "water_need": "High", "nutrients": "High K"},
+            {"stage": "Boll Opening", "days": "145-180", "water_need": "Low", "nutrients": "Minimal"}
+        ],
+        "chemical_fertilizers": {
+            "urea_kg": "87",
+            "dap_kg": "65",
+            "mop_kg": "25",
+            "total_npk": "48:24:24 kg/acre",
+            "application_schedule": [
+                "Basal: 25% N + 100% P + 50% K at sowing",
+                "First: 25% N + 50% K at square formation (30-35 days)",
+                "Second: 25% N at flowering (60-65 days)",
+                "Third: 25% N at boll development (90-95 days)"
+            ]
+        },
+        "organic_fertilizers": {
+            "fym_tons": "5-6",
+            "vermicompost_kg": "800-1000",
+            "neem_cake_kg": "120-150",
+            "biofertilizers": "Azospirillum + PSB + KSB @ 2 kg each",
+        },
+        "common_pests": ["Pink Bollworm", "Whitefly", "Aphids"],
+        "common_diseases": ["Wilt", "Root Rot", "Leaf Spot"],
+        "rotation_crops": ["Wheat", "Chickpea", "Sorghum"],
+        "intercrop_options": ["Soybean", "Green gram"],
+        "export_potential": "High",
+        "storage_duration_months": "12",
+        "processing_options": ["Ginning", "Spinning", "Textile"]
+    },
+    "Tomato": {
+        "seed_rate_kg_per_acre": "80-100 grams",
+        "spacing": "60cm x 45cm",
+        "water_requirement": "243-324 mm",
+        "duration_days": "65-90",
+        "expected_yield_tons": "20-28",
+        "best_season": "Kharif, Rabi & Summer",
+        "soil_type": "Well-drained sandy loam",
+        "market_price_range": "₹800-2500/quintal",
+        "msp_2024": "Not applicable",
+        "insurance_premium_percent": "5.0",
+        "critical_growth_stages": [
+            {"stage": "Transplanting", "days": "0-10", "water_need": "High", "nutrients": "Minimal"},
+            {"stage": "Vegetative Growth", "days": "15-35", "water_need": "Medium", "nutrients": "High N"},
+            {"stage": "Flowering", "days": "40-55", "water_need": "Critical", "nutrients": "Balanced NPK + Ca"},
+            {"stage": "Fruit Setting", "days": "60-75", "water_need": "High", "nutrients": "High K + Ca"},
+            {"stage": "Fruit Development", "days": "80-90", "water_need": "Medium", "nutrients": "High K"}
+        ],
+        "chemical_fertilizers": {
+            "urea_kg": "108",
+            "dap_kg": "109",
+            "mop_kg": "33",
+            "total_npk": "60:40:40 kg/acre",
+            "application_schedule": [
+                "Basal: 50% N + 100% P + 50% K at transplanting",
+                "30 days: 25% N + 25% K",
+                "60 days: 25% N + 25% K"
+            ]
+        },
+        "organic_fertilizers": {
+            "fym_tons": "6-8",
+            "vermicompost_kg": "800-1000",
+            "neem_cake_kg": "100-120",
+            "biofertilizers": "Azotobacter + PSB @ 2 kg each",
+        },
+        "common_pests": ["Fruit Borer", "Whitefly", "Leaf Miner"],
+        "common_diseases": ["Early Blight", "Late Blight", "Wilt", "Leaf Curl Virus"],
+        "rotation_crops": ["Cabbage", "Cauliflower", "Onion"],
+        "intercrop_options": ["Coriander", "Fenugreek"],
+        "export_potential": "Medium",
+        "storage_duration_months": "0.5-1",
+        "processing_options": ["Puree", "Ketchup", "Paste", "Drying"]
+    },
+    "Onion": {
+        "seed_rate_kg_per_acre": "3-4",
+        "spacing": "15cm x 10cm",
+        "water_requirement": "182-283 mm",
+        "duration_days": "120-150",
+        "expected_yield_tons": "10-16",
+        "best_season": "Kharif, Late Kharif, Rabi",
+        "soil_type": "Well-drained loamy soil",
+        "market_price_range": "₹1000-3500/quintal",
+        "msp_2024": "Not applicable",
+        "insurance_premium_percent": "5.0",
+        "critical_growth_stages": [
+            {"stage": "Transplanting", "days": "0-10", "water_need": "High", "nutrients": "Minimal"},
+            {"stage": "Vegetative Growth", "days": "15-50", "water_need": "Medium", "nutrients": "High N"},
+            {"stage": "Bulb Initiation", "days": "60-90", "water_need": "Critical", "nutrients": "Balanced NPK"},
+            {"stage": "Bulb Development", "days": "100-130", "water_need": "Medium", "nutrients": "High K"},
+            {"stage": "Maturity", "days": "140-150", "water_need": "Stop", "nutrients": "None"}
+        ],
+        "chemical_fertilizers": {
+            "urea_kg": "72",
+            "dap_kg": "54",
+            "mop_kg": "17",
+            "total_npk": "40:20:20 kg/acre",
+            "application_schedule": [
+                "Basal: 50% N + 100% P + 50% K at transplanting",
+                "30 days: 25% N + 25% K",
+                "60 days: 25% N + 25% K"
+            ]
+        },
+        "organic_fertilizers": {
+            "fym_tons": "4-5",
+            "vermicompost_kg": "600-800",
+            "neem_cake_kg": "80-100",
+            "biofertilizers": "Azospirillum + PSB @ 2 kg each"
+        },
+        "common_pests": ["Thrips", "Onion Maggot"],
+        "common_diseases": ["Purple Blotch", "Stemphylium Blight", "Basal Rot"],
+        "rotation_crops": ["Wheat", "Cabbage", "Tomato"],
+        "intercrop_options": ["Not recommended"],
+        "export_potential": "High",
+        "storage_duration_months": "3-6",
+        "processing_options": ["Dehydration", "Powder", "Flakes"]
+    },
+    "Sugarcane": {
+    "seed_rate_kg_per_acre": "3000-4000 setts (3 budded)",
+    "spacing": "90cm x 60cm (furrow to furrow)",
+    "water_requirement": "607-850 mm",
+    "duration_days": "300-365",
+    "expected_yield_tons": "40-60",
+    "best_season": "Year-round (Main: Feb-March, Oct-Nov)",
+    "soil_type": "Deep, well-drained loamy soil",
+    "market_price_range": "₹2800-3500/ton",
+    "msp_2024": "₹3150/ton",
+    "insurance_premium_percent": "2.0",
+    "critical_growth_stages": [
+        {"stage": "Germination", "days": "0-30", "water_need": "High", "nutrients": "Minimal"},
+        {"stage": "Tillering/Grand Growth", "days": "60-120", "water_need": "Critical", "nutrients": "High N"},
+        {"stage": "Formation", "days": "150-240", "water_need": "Critical", "nutrients": "Balanced NPK"},
+        {"stage": "Maturation", "days": "270-330", "water_need": "Medium", "nutrients": "High K"},
+        {"stage": "Ripening", "days": "335-365", "water_need": "Low", "nutrients": "Minimal"}
+    ],
+    "detailed_practices": {
+        "land_preparation": [
+            "Deep plowing 2-3 times to 30-45 cm depth",
+            "Prepare furrows at 90 cm spacing",
+            "Apply FYM 10-15 tons per acre 3-4 weeks before planting",
+            "Level the field properly for uniform water distribution",
+            "Make ridges and furrows for planting and irrigation"
+        ],
+        "sett_preparation": [
+            "Select healthy, disease-free canes of 8-10 months age",
+            "Cut into 3-budded setts (45-60 cm length)",
+            "Treat setts with fungicide (Carbendazim @ 2g/liter)",
+            "Dip setts in insecticide solution to prevent termite attack",
+            "Plant within 24 hours of cutting for best germination"
+        ],
+        "planting": [
+            "Plant during Feb-March (Adsali) or Oct-Nov (Suru)",
+            "Place setts end-to-end in furrows at 60 cm spacing",
+            "Cover setts with 5-8 cm soil",
+            "Apply light irrigation immediately after planting",
+            "Gap filling within 3-4 weeks with reserve setts"
+        ]
+    },
+    "chemical_fertilizers": {
+        "urea_kg": "260",
+        "dap_kg": "130",
+        "mop_kg": "65",
+        "total_npk": "140:60:60 kg/acre",
+        "application_schedule": [
+            "Basal: 25% N + 100% P + 50% K at planting",
+            "30 days: 25% N (earthing up)",
+            "60 days: 25% N + 25% K",
+            "90 days: 25% N + 25% K"
+        ]
+    },
+    "organic_fertilizers": {
+        "fym_tons": "10-15",
+        "vermicompost_kg": "1000-1500",
+        "neem_cake_kg": "200-250",
+        "green_manure": "Sunhemp or Dhaincha - intercrop in early stage",
+        "biofertilizers": "Azotobacter + PSB + Trichoderma @ 2 kg each per acre",
+    },
+    "common_pests": ["Early Shoot Borer", "Top Borer", "White Grub", "Termites", "Woolly Aphid"],
+    "common_diseases": ["Red Rot", "Smut", "Wilt", "Rust", "Grassy Shoot"],
+    "rotation_crops": ["Wheat", "Chickpea", "Soybean", "Onion"],
+    "intercrop_options": ["Potato", "Onion", "Garlic", "Cabbage", "Cauliflower (in early stage)"],
+    "export_potential": "Low (mainly domestic consumption)",
+    "storage_duration_months": "Harvest and crush immediately",
+    "processing_options": ["Sugar mills", "Jaggery (Gur)", "Khandsari", "Ethanol production"]
+    }
+    
+    
+}
+
+# Government Schemes Database - NEW ADDITION
+GOVERNMENT_SCHEMES = {
+    "PM-KISAN": {
+        "name": "Pradhan Mantri Kisan Samman Nidhi",
+        "benefit": "₹6000/year in 3 installments",
+        "eligibility": "All landholding farmers",
+        "how_to_apply": "Online at pmkisan.gov.in or through agriculture office",
+        "documents": ["Aadhaar", "Land records", "Bank account"],
+        "contact": "Toll-free: 155261 / 011-24300606"
+    },
+    "PMFBY": {
+        "name": "Pradhan Mantri Fasal Bima Yojana",
+        "benefit": "Crop insurance at subsidized premium",
+        "eligibility": "All farmers including sharecroppers",
+        "how_to_apply": "Through banks, CSCs, or insurance agents",
+        "documents": ["Land records", "Loan documents", "Bank account"],
+        "contact": "Toll-free: 1800-180-1551"
+    },
+    "KCC": {
+        "name": "Kisan Credit Card",
+        "benefit": "Credit up to ₹3 lakh at 4% interest",
+        "eligibility": "All farmers with land holdings",
+        "how_to_apply": "Any nationalized or cooperative bank",
+        "documents": ["Land records", "Identity proof", "Address proof"],
+        "contact": "Contact nearest bank branch"
+    },
+    "Soil_Health_Card": {
+        "name": "Soil Health Card Scheme",
+        "benefit": "Free soil testing every 2 years",
+        "eligibility": "All farmers",
+        "how_to_apply": "Through agriculture department",
+        "documents": ["Land records"],
+        "contact": "District Agriculture Office"
+    },
+    "PM_Kusum": {
+        "name": "PM-KUSUM (Solar Pumps)",
+        "benefit": "90% subsidy on solar pumps",
+        "eligibility": "Individual farmers and cooperatives",
+        "how_to_apply": "Through MNRE portal",
+        "documents": ["Land documents", "Electricity connection"],
+        "contact": "State Nodal Agency"
+    }
+}
+
+# APMC mandis per district
+MANDIS = {
+    "Pune": ["Pune Market Yard", "Baramati APMC", "Daund APMC", "Indapur APMC", "Shirur APMC"],
+    "Nagpur": ["Nagpur Cotton Market", "Kamptee APMC", "Umred APMC", "Hinganghat APMC"],
+    "Nashik": ["Nashik APMC", "Lasalgaon APMC", "Sinnar APMC", "Niphad APMC"],
+    "Mumbai Suburban": ["Vashi APMC", "Turbhe Market", "Kalyan APMC"],
+    "Thane": ["Kalyan APMC", "Bhiwandi Market", "Thane Market"],
+    "Aurangabad": ["Aurangabad APMC", "Paithan Market", "Gangapur Market"],
+    "Solapur": ["Solapur APMC", "Barshi Market", "Pandharpur APMC"],
+    "Kolhapur": ["Kolhapur APMC", "Ichalkaranji Market", "Kagal APMC"],
+    "Ahmednagar": ["Ahmednagar APMC", "Sangamner Market", "Rahuri Market"],
+    "Satara": ["Satara APMC", "Karad Market", "Phaltan APMC"],
+    "Sangli": ["Sangli APMC", "Miraj Market", "Tasgaon APMC"]
+}
+
+
+def get_nearest_mandis(district):
+    return MANDIS.get(district, ["Contact District Agriculture Office", "Visit nearest APMC"])
@@ -0,0 +1,134 @@
+"""Response cache for AI answers, shared by every server process.
+
+Entries live in the ``ai_response_cache`` table keyed by a hash of the
+normalized prompt, system prompt and model, so an identical question from
+any session or worker is answered from the database instead of the API.
+Each feature has its own time-to-live; features mapped to ``None`` (the
+free-form chat) are never cached. The table is bounded to ``MAX_ENTRIES``
+by evicting the least recently used rows.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import db
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Seconds an answer stays valid, per feature. None means never cache.
+FEATURE_TTLS = {
+    "chat": None,
+    "quick_question": DAY,
+    "crop_care": DAY,
+    "irrigation": DAY,
+    "soil_health": 7 * DAY,
+    "yield_prediction": 7 * DAY,
+    "price_analysis": 6 * HOUR,
+    "market_trends": 6 * HOUR,
+    "selling_strategy": 6 * HOUR,
+    "disease_diagnosis": 7 * DAY,
+    "government_schemes": 7 * DAY,
+    "loan_advice": 7 * DAY,
+    "crop_rotation": 30 * DAY,
+    "expert_advice": 7 * DAY,
+}
+DEFAULT_TTL = DAY
+
+MAX_ENTRIES = int(os.environ.get("KRISHIMITRA_AI_CACHE_MAX_ENTRIES", "5000"))
+
+_LOOKUP = '''UPDATE ai_response_cache SET last_used_at = ?, hits = hits + 1
+             WHERE key = ? AND expires_at > ?
+             RETURNING response'''
+
+_STORE = '''INSERT INTO ai_response_cache
+                (key, feature, model, response, created_at, expires_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                feature = excluded.feature, response = excluded.response,
+                created_at = excluded.created_at, expires_at = excluded.expires_at,
+                last_used_at = excluded.last_used_at'''
+
+_EVICT_EXPIRED = "DELETE FROM ai_response_cache WHERE expires_at <= ?"
+
+_EVICT_LRU = '''DELETE FROM ai_response_cache WHERE key IN
+                    (SELECT key FROM ai_response_cache ORDER BY last_used_at
+                     LIMIT MAX(0, (SELECT COUNT(*) FROM ai_response_cache) - ?))'''
+
+_stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _normalize(text):
+    return " ".join(str(text).split())
+
+
+def make_key(prompt, system, model):
+    """Cache key for a request; insensitive to whitespace differences"""
+    payload = "\0".join((_normalize(prompt), _normalize(system), model))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ttl_for(feature):
+    return FEATURE_TTLS.get(feature, DEFAULT_TTL)
+
+
+def cacheable(feature):
+    return ttl_for(feature) is not None
+
+
+def lookup(key):
+    """The cached response for ``key``, or None if absent or expired"""
+    now = time.time()
+    with db.connection() as conn:
+        row = conn.execute(_LOOKUP, (now, key, now)).fetchone()
+    _count("hits" if row else "misses")
+    return row[0] if row else None
+
+
+def store(key, feature, model, response):
+    ttl = ttl_for(feature)
+    if ttl is None:
+        return
+    now = time.time()
+    with db.connection() as conn:
+        conn.execute(_STORE, (key, feature, model, response, now, now + ttl, now))
+        evicted = conn.execute(_EVICT_EXPIRED, (now,)).rowcount
+        evicted += conn.execute(_EVICT_LRU, (MAX_ENTRIES,)).rowcount
+    _count("stores")
+    if evicted:
+        _count("evictions", evicted)
+
+
+def lookup_request(feature, prompt, system, model):
+    """``(key, cached response)`` for a request; key is None for uncached features"""
+    if not cacheable(feature):
+        _count("bypassed")
+        return None, None
+    key = make_key(prompt, system, model)
+    return key, lookup(key)
+
+
+def invalidate(feature=None):
+    with db.connection() as conn:
+        if feature is None:
+            conn.execute("DELETE FROM ai_response_cache")
+        else:
+            conn.execute("DELETE FROM ai_response_cache WHERE feature = ?", (feature,))
+
+
+def stats():
+    """Process-local counters plus the shared table's size"""
+    with _stats_lock:
+        result = dict(_stats)
+    with db.connection() as conn:
+        result["entries"] = conn.execute("SELECT COUNT(*) FROM ai_response_cache").fetchone()[0]
+    lookups = result["hits"] + result["misses"]
+    result["hit_ratio"] = result["hits"] / lookups if lookups else 0.0
+    return result
@@ -0,0 +1,263 @@
+"""Bounded-concurrency gateway in front of the Anthropic client.
+
+Every live AI call from the app goes through the process-wide ``gateway``:
+
+- each farmer first takes a token from their own bucket in ``rate_limits``
+  (``ai-user:<id>``), so one user clicking repeatedly can't burn the
+  shared budget;
+- at most ``MAX_CONCURRENCY`` calls run at once; the rest wait in per-user
+  queues served round-robin, so a user with many queued calls gets one slot
+  per turn and can't starve the others;
+- 429 and 529 answers are retried with capped exponential backoff and full
+  jitter (honouring ``retry-after``), inside a hard per-request timeout and
+  an overall deadline. The slot is given back while backing off, and the
+  retry queues for a new one.
+
+Queue wait and service time are kept for the System Status page.
+"""
+import os
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import ratelimit
+
+MAX_CONCURRENCY = int(os.environ.get("KRISHIMITRA_AI_MAX_CONCURRENCY", "4"))
+# Per-user budget: sustained requests per second and burst.
+USER_RATE = float(os.environ.get("KRISHIMITRA_AI_USER_RATE", "0.2"))
+USER_BURST = int(os.environ.get("KRISHIMITRA_AI_USER_BURST", "3"))
+# Longest a caller waits for its user budget, and then for a slot.
+MAX_USER_WAIT = 10.0
+MAX_QUEUE_WAIT = float(os.environ.get("KRISHIMITRA_AI_MAX_QUEUE_WAIT", "30"))
+# Hard limit for one API request, and for all attempts together.
+REQUEST_TIMEOUT = float(os.environ.get("KRISHIMITRA_AI_TIMEOUT", "60"))
+DEADLINE = 120.0
+
+RETRY_STATUSES = (429, 529)
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 20.0
+
+WINDOW = 1000
+
+
+class GatewayBusy(Exception):
+    """No slot freed up within the queue wait limit"""
+
+
+class GatewayTimeout(GatewayBusy):
+    """The call's deadline ran out while it waited for a slot"""
+
+
+class _Ticket:
+    __slots__ = ("user", "granted", "event")
+
+    def __init__(self, user):
+        self.user = user
+        self.granted = False
+        self.event = threading.Event()
+
+
+def status_of(error):
+    """HTTP status of an API error, if it carries one"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt, rng=random):
+    """Full-jitter delay before retry number ``attempt`` (0-based)"""
+    return rng.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class Gateway:
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, user_limits=(USER_RATE, USER_BURST),
+                 max_queue_wait=MAX_QUEUE_WAIT, request_timeout=REQUEST_TIMEOUT, deadline=DEADLINE,
+                 max_retries=MAX_RETRIES):
+        self.max_concurrency = max_concurrency
+        self.user_limits = user_limits
+        self.max_queue_wait = max_queue_wait
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._free = max_concurrency
+        self._queues = {}
+        self._turns = deque()
+        self._queue_waits = deque(maxlen=WINDOW)
+        self._service_times = deque(maxlen=WINDOW)
+        self._stats = {"requests": 0, "retries": 0, "timeouts": 0, "busy": 0,
+                       "user_limited": 0, "errors": 0}
+
+    # Fair slot allocation
+
+    def _dispatch(self):
+        """Hand free slots to the next user in turn; caller holds the lock"""
+        while self._free and self._turns:
+            user = self._turns.popleft()
+            queue = self._queues[user]
+            ticket = queue.popleft()
+            if queue:
+                self._turns.append(user)
+            else:
+                del self._queues[user]
+            ticket.granted = True
+            self._free -= 1
+            ticket.event.set()
+
+    def _acquire_slot(self, user):
+        ticket = _Ticket(user)
+        with self._lock:
+            if user not in self._queues:
+                self._queues[user] = deque()
+                self._turns.append(user)
+            self._queues[user].append(ticket)
+            self._dispatch()
+        if ticket.event.wait(self.max_queue_wait):
+            return
+        with self._lock:
+            if ticket.granted:
+                return
+            queue = self._queues[user]
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[user]
+                self._turns.remove(user)
+            self._stats["busy"] += 1
+        raise GatewayBusy(f"All {self.max_concurrency} AI slots stayed busy for {self.max_queue_wait:.0f}s")
+
+    def _release_slot(self):
+        with self._lock:
+            self._free += 1
+            self._dispatch()
+
+    def _admit(self, user):
+        """Take one call from ``user``'s rate budget (retries don't spend more)"""
+        try:
+            ratelimit.acquire_key(f"ai-user:{user}", self.user_limits, max_wait=MAX_USER_WAIT)
+        except ratelimit.RateLimited:
+            self._count("user_limited")
+            raise
+        self._count("requests")
+
+    def _take(self, user):
+        """Wait for a slot; returns when it was granted"""
+        queued = time.perf_counter()
+        self._acquire_slot(user)
+        granted = time.perf_counter()
+        with self._lock:
+            self._queue_waits.append(granted - queued)
+        return granted
+
+    def _give_back(self, granted):
+        self._release_slot()
+        with self._lock:
+            self._service_times.append(time.perf_counter() - granted)
+
+    # Calls
+
+    def _call(self, user, attempt_call):
+        """``attempt_call(timeout)`` in a slot, retrying 429 and 529 with backoff.
+
+        The slot is given back before each backoff sleep and the retry
+        queues again behind other users. Returns ``(result, granted)`` with
+        the slot still held; the caller gives it back.
+        """
+        deadline = time.monotonic() + self.deadline
+        for attempt in range(self.max_retries + 1):
+            granted = self._take(user)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._give_back(granted)
+                self._count("timeouts")
+                self._count("errors")
+                raise GatewayTimeout(f"No AI slot came free within the {self.deadline:.0f}s deadline")
+            timeout = min(self.request_timeout, remaining)
+            try:
+                return attempt_call(timeout), granted
+            except BaseException as e:
+                self._give_back(granted)
+                if not isinstance(e, Exception):
+                    raise
+                if "Timeout" in type(e).__name__:
+                    self._count("timeouts")
+                if status_of(e) not in RETRY_STATUSES or attempt == self.max_retries:
+                    self._count("errors")
+                    raise
+                delay = max(backoff(attempt), _retry_after(e) or 0)
+                if time.monotonic() + delay >= deadline:
+                    self._count("errors")
+                    raise
+                self._count("retries")
+            time.sleep(delay)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def create(self, client, user, **params):
+        """``client.messages.create(**params)`` through the gateway"""
+        client = _without_sdk_retries(client)
+        self._admit(user)
+        message, granted = self._call(user, lambda timeout: client.messages.create(timeout=timeout, **params))
+        self._give_back(granted)
+        return message
+
+    @contextmanager
+    def stream(self, client, user, **params):
+        """``client.messages.stream(**params)`` through the gateway.
+
+        The slot is held until the stream is closed. Only opening the stream
+        is retried; once text has been sent to the page it can't be replayed.
+        """
+        client = _without_sdk_retries(client)
+
+        def open_stream(timeout):
+            manager = client.messages.stream(timeout=timeout, **params)
+            return manager, manager.__enter__()
+
+        self._admit(user)
+        (manager, stream), granted = self._call(user, open_stream)
+        try:
+            yield stream
+        except BaseException as e:
+            if not manager.__exit__(type(e), e, e.__traceback__):
+                raise
+        else:
+            manager.__exit__(None, None, None)
+        finally:
+            self._give_back(granted)
+
+    def stats(self):
+        with self._lock:
+            result = dict(self._stats)
+            result["in_flight"] = self.max_concurrency - self._free
+            result["queued"] = sum(len(queue) for queue in self._queues.values())
+            result["queued_users"] = len(self._queues)
+            waits, services = list(self._queue_waits), list(self._service_times)
+        for name, samples in (("queue_wait", waits), ("service_time", services)):
+            ordered = sorted(samples)
+            result[f"{name}_p50_s"] = statistics.median(ordered) if ordered else None
+            result[f"{name}_p95_s"] = ordered[int(0.95 * (len(ordered) - 1))] if ordered else None
+        return result
+
+
+def _without_sdk_retries(client):
+    # The gateway owns retries; stacking the SDK's own would multiply them.
+    with_options = getattr(client, "with_options", None)
+    return with_options(max_retries=0) if with_options else client
+
+
+gateway = Gateway()
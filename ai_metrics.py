@@ -0,0 +1,84 @@
+"""Per-feature latency metrics for AI calls, kept per server process.
+
+Every answer records its total latency and, for streamed answers, the time
+to first token; cache hits are counted separately so they don't flatter the
+API numbers. Only the last ``WINDOW`` samples per feature are kept.
+
+Token usage is summed per feature and split into uncached input, input
+read from the prompt cache and input written to it, and each call's split
+is logged.
+"""
+import logging
+import statistics
+import threading
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 500
+
+# Anthropic usage fields, summed per feature.
+USAGE_FIELDS = ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens", "output_tokens")
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: {"ttft": deque(maxlen=WINDOW), "total": deque(maxlen=WINDOW)})
+_counts = defaultdict(lambda: {"calls": 0, "streamed": 0, "cache_hits": 0, "errors": 0,
+                               **{field: 0 for field in USAGE_FIELDS}})
+
+
+def usage_dict(usage):
+    """Token counts from an API response's ``usage`` (missing fields count as 0)"""
+    return {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+
+
+def record(feature, total, ttft=None, usage=None):
+    """One answer from the API took ``total`` seconds (first token after ``ttft``)"""
+    tokens = usage_dict(usage) if usage is not None else None
+    with _lock:
+        counts = _counts[feature]
+        counts["calls"] += 1
+        _samples[feature]["total"].append(total)
+        if ttft is not None:
+            counts["streamed"] += 1
+            _samples[feature]["ttft"].append(ttft)
+        if tokens:
+            for field, value in tokens.items():
+                counts[field] += value
+    if tokens:
+        logger.info("AI %s: %d input tokens uncached, %d read from cache, %d written to cache, %d output",
+                    feature, tokens["input_tokens"], tokens["cache_read_input_tokens"],
+                    tokens["cache_creation_input_tokens"], tokens["output_tokens"])
+
+
+def record_cache_hit(feature):
+    with _lock:
+        _counts[feature]["cache_hits"] += 1
+
+
+def record_error(feature):
+    with _lock:
+        _counts[feature]["errors"] += 1
+
+
+def cached_input_ratio(counts):
+    """Share of input tokens served from the prompt cache"""
+    total = sum(counts[field] for field in USAGE_FIELDS[:3])
+    return counts["cache_read_input_tokens"] / total if total else 0.0
+
+
+def _percentiles(samples, prefix):
+    if not samples:
+        return {f"{prefix}_p50_s": None, f"{prefix}_p95_s": None}
+    ordered = sorted(samples)
+    return {f"{prefix}_p50_s": statistics.median(ordered),
+            f"{prefix}_p95_s": ordered[int(0.95 * (len(ordered) - 1))]}
+
+
+def snapshot():
+    """One row per feature with counters and latency percentiles"""
+    with _lock:
+        features = {name: (dict(counts), list(_samples[name]["ttft"]), list(_samples[name]["total"]))
+                    for name, counts in _counts.items()}
+    return [{"feature": name, **counts, "cached_input_ratio": cached_input_ratio(counts),
+             **_percentiles(ttft, "ttft"), **_percentiles(total, "latency")}
+            for name, (counts, ttft, total) in sorted(features.items())]
@@ -0,0 +1,76 @@
+"""Benchmark CEDA page parsing: per-commodity re-parse vs the single-pass extractor.
+
+    python benchmarks/bench_ceda_parse.py [--repeat N]
+
+The baseline is the original scraper loop: one BeautifulSoup tree and one
+keyword scan per commodity. The single pass is ``ceda.parse_price_tables``,
+which must return the same rows.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import ceda  # noqa: E402
+from fixtures import load_fixtures  # noqa: E402
+
+
+def legacy_parse(content, commodity_keywords):
+    soup = BeautifulSoup(content, 'html.parser')
+    price_data = []
+    for table in soup.find_all('table'):
+        rows = table.find_all('tr')
+        if len(rows) > 1:
+            for row in rows[1:]:
+                cols = row.find_all('td')
+                if len(cols) >= 4:
+                    item_name = cols[0].get_text(strip=True).lower()
+                    if any(keyword in item_name for keyword in commodity_keywords):
+                        price_data.append({
+                            'commodity': cols[0].get_text(strip=True),
+                            'market': cols[1].get_text(strip=True),
+                            'price': cols[2].get_text(strip=True),
+                            'date': cols[3].get_text(strip=True),
+                            'source': 'CEDA Ashoka University'
+                        })
+    return price_data
+
+
+def legacy_all(content):
+    return {commodity: legacy_parse(content, keywords)
+            for commodity, keywords in ceda.CEDA_COMMODITY_MAP.items()}
+
+
+def best_of(fn, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(content)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"parser backend: {ceda.HTML_PARSER}")
+    for name, content in load_fixtures().items():
+        legacy_s, expected = best_of(legacy_all, content, args.repeat)
+        single_s, actual = best_of(ceda.parse_price_tables, content, args.repeat)
+        expected = {commodity: rows for commodity, rows in expected.items() if rows}
+        if actual != expected:
+            sys.exit(f"{name}: single-pass rows differ from the per-commodity baseline")
+        matched = sum(len(rows) for rows in actual.values())
+        print(f"{name} ({len(content) / 1024:.0f} KiB, {matched} commodity rows): "
+              f"per-commodity {legacy_s * 1000:.1f} ms, single pass {single_s * 1000:.1f} ms, "
+              f"{legacy_s / single_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
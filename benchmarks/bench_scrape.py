@@ -0,0 +1,145 @@
+"""End-to-end CEDA scrape benchmark against the local fixture server (no network).
+
+    python benchmarks/bench_scrape.py [--runs N] [--callers N] [--seconds S]
+
+Reports parse time per fixture page, cold and revalidated (304) scrape
+latency for each server variant, and throughput of concurrent
+``fetch_ceda_prices`` callers with the cache on and off. Exits non-zero if
+the healthy variant stops yielding prices, so it doubles as a CI check.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+_workdir = tempfile.mkdtemp(prefix="krishimitra-bench-")
+os.environ["KRISHIMITRA_DB"] = os.path.join(_workdir, "bench.db")
+os.environ["KRISHIMITRA_HTTP_CACHE"] = os.path.join(_workdir, "http_cache")
+os.environ.setdefault("KRISHIMITRA_SCRAPE_RATE", "100000")
+os.environ.setdefault("KRISHIMITRA_SCRAPE_BURST", "100000")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import breaker  # noqa: E402
+import ceda  # noqa: E402
+import db  # noqa: E402
+import http_client  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+from fixtures import load_fixtures  # noqa: E402
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {"p50": statistics.median(samples),
+            "p95": samples[int(0.95 * (len(samples) - 1))],
+            "max": samples[-1]}
+
+
+def fmt_ms(stats):
+    return ", ".join(f"{name} {value * 1000:.1f} ms" for name, value in stats.items())
+
+
+def bench_parse(runs):
+    print("Parse time per page")
+    for name, content in load_fixtures().items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            ceda.parse_price_tables(content)
+            timings.append(time.perf_counter() - started)
+        print(f"  {name} ({len(content) / 1024:.0f} KiB): {fmt_ms(percentiles(timings))}")
+
+
+def _scrape_once(base_url, cold):
+    ceda.CEDA_BASE_URL = base_url
+    if cold:
+        ceda.reset()
+        breaker.reset()
+        for name in os.listdir(os.environ["KRISHIMITRA_HTTP_CACHE"]) if os.path.isdir(
+                os.environ["KRISHIMITRA_HTTP_CACHE"]) else ():
+            os.remove(os.path.join(os.environ["KRISHIMITRA_HTTP_CACHE"], name))
+    started = time.perf_counter()
+    ceda_df, status = ceda.scrape_ceda_prices("Onion")
+    return time.perf_counter() - started, ceda_df is not None, status
+
+
+def bench_latency(server, runs):
+    print("Scrape latency (scrape_ceda_prices, uncached)")
+    healthy = True
+    for variant in ("ok", "mixed", "404", "500", "malformed", "empty"):
+        for label, cold in (("cold", True), ("warm", False)):
+            if variant != "ok" and not cold:
+                continue
+            timings, found, status = [], 0, ""
+            _scrape_once(server.base_url(variant), cold=True)
+            for _ in range(runs):
+                elapsed, ok, status = _scrape_once(server.base_url(variant), cold)
+                timings.append(elapsed)
+                found += ok
+            print(f"  {variant:<9} {label}: {fmt_ms(percentiles(timings))}; "
+                  f"prices found {found}/{runs} ({status[:50]})")
+            if variant == "ok" and found != runs:
+                healthy = False
+    return healthy
+
+
+def bench_throughput(server, callers, seconds, cached):
+    ceda.CEDA_BASE_URL = server.base_url("ok")
+    ceda.reset()
+    breaker.reset()
+    fetch = ceda.fetch_ceda_prices if cached else (lambda commodity: ceda.scrape_ceda_prices(commodity))
+    commodities = list(ceda.CEDA_COMMODITY_MAP)
+    started = time.perf_counter()
+    fetch(commodities[0])
+    first_call = time.perf_counter() - started
+    deadline = time.monotonic() + seconds
+    calls, latencies, lock = [0], [], threading.Lock()
+    requests_before = server.requests
+
+    def worker():
+        rng = random.Random()
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            fetch(rng.choice(commodities))
+            elapsed = time.perf_counter() - started
+            with lock:
+                calls[0] += 1
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    label = "cached fetch_ceda_prices" if cached else "uncached scrape"
+    print(f"  {label}: first call {first_call * 1000:.1f} ms, then "
+          f"{calls[0] / seconds:,.0f} calls/s with {callers} callers; "
+          f"{fmt_ms(percentiles(latencies))}; {server.requests - requests_before} upstream requests")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    db.ensure_schema()
+    print(f"parser backend: {ceda.HTML_PARSER}")
+    bench_parse(args.runs)
+    with FixtureServer(delay=0.5) as server:
+        healthy = bench_latency(server, args.runs)
+        print("Throughput")
+        bench_throughput(server, args.callers, args.seconds, cached=False)
+        bench_throughput(server, args.callers, args.seconds, cached=True)
+    print(f"HTTP client: {http_client.stats()}")
+    if not healthy:
+        sys.exit("The healthy fixture variant did not yield prices")
+
+
+if __name__ == "__main__":
+    main()
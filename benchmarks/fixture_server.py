@@ -0,0 +1,122 @@
+"""Local stand-in for the CEDA site, replaying the pages in benchmarks/fixtures/.
+
+The first path segment picks the behaviour, so one server covers every
+variant; point the scraper at it with
+``KRISHIMITRA_CEDA_BASE_URL=http://127.0.0.1:8765/<variant>``:
+
+    ok         every candidate path serves the fixture page (with an ETag)
+    mixed      first candidate 404s, second is slow, third serves the page
+    slow       every path answers after --delay seconds
+    404        every path is Not Found
+    500        every path is a server error
+    malformed  truncated, unclosed markup
+    empty      200 with no price table
+
+    python benchmarks/fixture_server.py [--port 8765] [--delay 2]
+"""
+import argparse
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fixtures import load_fixtures
+
+CANDIDATE_PATHS = ("/data/agricultural-prices", "/data/agriculture", "/agriculture")
+VARIANTS = ("ok", "mixed", "slow", "404", "500", "malformed", "empty")
+
+
+class FixtureServer:
+    """Serve the fixture variants on a background thread; usable as a context manager"""
+
+    def __init__(self, page=None, port=0, delay=2.0):
+        self.page = page or load_fixtures()["ceda_agricultural_prices.html"]
+        self.etag = '"%s"' % hashlib.sha256(self.page).hexdigest()[:16]
+        self.delay = delay
+        self.requests = 0
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._httpd.server_port
+
+    def base_url(self, variant="ok"):
+        return f"http://127.0.0.1:{self.port}/{variant}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="ceda-fixtures", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def respond(self, variant, path):
+        """Return (delay, status, headers, body) for a request"""
+        if path not in CANDIDATE_PATHS or variant not in VARIANTS:
+            return 0, 404, {}, b"not found"
+        if variant == "mixed":
+            variant = {CANDIDATE_PATHS[0]: "404", CANDIDATE_PATHS[1]: "slow"}.get(path, "ok")
+        if variant == "404":
+            return 0, 404, {}, b"<html><body>Page not found</body></html>"
+        if variant == "500":
+            return 0, 500, {}, b"<html><body>Internal Server Error</body></html>"
+        if variant == "malformed":
+            return 0, 200, {}, self.page[:len(self.page) // 3] + b"<tr><td>Onion<td><table><tr"
+        if variant == "empty":
+            return 0, 200, {}, b"<html><body><p>Data temporarily unavailable</p></body></html>"
+        delay = self.delay if variant == "slow" else 0
+        return delay, 200, {"ETag": self.etag, "Content-Type": "text/html; charset=utf-8"}, self.page
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle hold the body back.
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                variant, _, path = self.path.partition("/")[2].partition("/")
+                delay, status, headers, body = server.respond(variant, "/" + path)
+                if delay:
+                    time.sleep(delay)
+                if status == 200 and headers.get("ETag") and self.headers.get("If-None-Match") == headers["ETag"]:
+                    status, body = 304, b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded CEDA pages locally")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=2.0, help="seconds the slow variant waits")
+    args = parser.parse_args()
+    server = FixtureServer(port=args.port, delay=args.delay)
+    print(f"Serving CEDA fixtures on http://127.0.0.1:{server.port}/<variant> ({', '.join(VARIANTS)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,70 @@
+"""HTML fixtures shaped like the CEDA agricultural price pages.
+
+``python benchmarks/fixtures.py`` rewrites the files in ``benchmarks/fixtures/``.
+Pages are generated from a fixed seed so benchmark runs are comparable
+across machines and commits.
+"""
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ITEMS = [
+    "Rice", "Paddy (Common)", "Basmati Rice", "Wheat", "Wheat (Lokwan)", "Cotton", "Kapas (Cotton)",
+    "Maize", "Sweet Corn", "Tomato", "Tomato (Hybrid)", "Potato", "Onion", "Onion (Red)",
+    "Soybean", "Soya Bean (Yellow)", "Groundnut", "Groundnut Pods (Peanut)", "Pomegranate",
+    "Green Chilli", "Chili Red", "Sugarcane", "Sugar Cane (Co-86032)", "Brinjal", "Cabbage",
+    "Cauliflower", "Bajra", "Jowar", "Tur", "Gram", "Garlic", "Ginger", "Grapes", "Banana",
+]
+
+MARKETS = [
+    "Pune", "Lasalgaon", "Nashik", "Ahmednagar", "Solapur", "Kolhapur", "Sangli", "Satara",
+    "Aurangabad", "Jalgaon", "Nagpur", "Amravati", "Akola", "Latur", "Baramati", "Pimpalgaon",
+]
+
+
+def ceda_page(rows=600, tables=3, seed=0):
+    """One price page: a navigation table, then ``tables`` price tables"""
+    rng = random.Random(seed)
+    parts = ["<!DOCTYPE html><html><head><title>Agricultural Prices | CEDA</title>",
+             "<script>window.dataLayer = [];</script></head><body>",
+             "<table class='nav'><tr><td><a href='/'>Home</a></td><td><a href='/data'>Data</a></td></tr></table>"]
+    for t in range(tables):
+        parts.append(f"<h2>Mandi prices, part {t + 1}</h2><table class='prices'>")
+        parts.append("<tr><th>Commodity</th><th>Market</th><th>Modal Price (Rs/qtl)</th><th>Date</th><th>Arrivals</th></tr>")
+        for _ in range(rows // tables):
+            day = rng.randint(1, 28)
+            parts.append(
+                f"<tr><td> {rng.choice(ITEMS)} </td><td>{rng.choice(MARKETS)}</td>"
+                f"<td>₹{rng.randint(800, 9000):,}</td><td>{day:02d}/09/2026</td>"
+                f"<td><span class='qty'>{rng.randint(1, 900)}</span> t</td></tr>")
+        parts.append("</table>")
+    parts.append("<footer><p>Centre for Economic Data and Analysis</p></footer></body></html>")
+    return "\n".join(parts)
+
+
+FIXTURES = {
+    "ceda_agricultural_prices.html": dict(rows=600, tables=3, seed=1),
+    "ceda_agriculture_large.html": dict(rows=3000, tables=6, seed=2),
+}
+
+
+def load_fixtures():
+    """Return ``{name: bytes}`` for the recorded pages, generating any that are missing"""
+    pages = {}
+    for name, params in FIXTURES.items():
+        path = os.path.join(FIXTURE_DIR, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                pages[name] = f.read()
+        else:
+            pages[name] = ceda_page(**params).encode("utf-8")
+    return pages
+
+
+if __name__ == "__main__":
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, params in FIXTURES.items():
+        with open(os.path.join(FIXTURE_DIR, name), "w", encoding="utf-8") as f:
+            f.write(ceda_page(**params))
+        print(f"wrote {name}")
@@ -0,0 +1,99 @@
+"""Per-endpoint circuit breakers for upstream sources.
+
+After ``FAILURE_THRESHOLD`` consecutive failures a breaker opens and calls
+fail fast with ``CircuitOpen`` for ``RESET_TIMEOUT`` seconds. The first call
+after that is let through as a trial (half-open): success closes the
+breaker, failure opens it for another cool-down. State is per process and
+shown on the System Status page.
+"""
+import os
+import threading
+import time
+
+FAILURE_THRESHOLD = int(os.environ.get("KRISHIMITRA_BREAKER_FAILURES", "3"))
+RESET_TIMEOUT = float(os.environ.get("KRISHIMITRA_BREAKER_RESET_SECONDS", "120"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpen(Exception):
+    """The endpoint's breaker is open; use the fallback"""
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._last_error = None
+        self._stats = {"successes": 0, "failures": 0, "short_circuits": 0}
+
+    def before_call(self):
+        """Raise CircuitOpen unless a call may go through now"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                return
+            if self._state != CLOSED:
+                # Open, or half-open with its trial call already in flight.
+                self._stats["short_circuits"] += 1
+                raise CircuitOpen(f"{self.name} is unavailable (circuit {self._state})")
+
+    def record_success(self):
+        with self._lock:
+            self._stats["successes"] += 1
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            self._last_error = str(error) if error is not None else None
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def abandon(self):
+        """The admitted call never reached the endpoint; let the next one try"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = OPEN
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+            return {"endpoint": self.name, "state": self._state,
+                    "consecutive_failures": self._failures, "retry_in_s": retry_in,
+                    "last_error": self._last_error, **self._stats}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get(name):
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def snapshots():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in breakers]
+
+
+def reset():
+    """Drop every breaker (back to closed on next use)"""
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,134 @@
+"""In-process TTL/LRU cache with stale-while-revalidate and single-flight loads.
+
+Lives in an imported module, so one cache serves every Streamlit session in
+the server process. Within ``ttl`` an entry is served as is. Up to
+``stale_ttl`` beyond that it is still served, while one background thread
+reloads it. Concurrent misses for the same key share a single load.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    def __init__(self, ttl, maxsize=256, stale_ttl=0, cacheable=None, negative_ttl=0):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self.cacheable = cacheable or (lambda value: True)
+        # Values failing ``cacheable`` are remembered this long (never served
+        # stale), unless a good entry for the key is still servable.
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()   # key -> (value, fresh_until, stale_until)
+        self._inflight = {}             # key -> Future of the running load
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                       "refreshes": 0, "evictions": 0, "negative_stores": 0,
+                       "load_errors": 0}
+
+    def get(self, key, loader, allow_stale=True):
+        """Return the cached value for ``key``, calling ``loader()`` at most once per miss.
+
+        With ``allow_stale`` False a stale entry counts as a miss, for
+        callers that must not act on old data.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fresh_until, stale_until = entry
+                now = time.monotonic()
+                if now < (stale_until if allow_stale else fresh_until):
+                    self._entries.move_to_end(key)
+                    if now < fresh_until:
+                        self._stats["hits"] += 1
+                        return value
+                    self._stats["stale_hits"] += 1
+                    stale = True
+                else:
+                    del self._entries[key]
+                    stale = False
+            else:
+                stale = False
+            future, leader = self._claim(key, "refreshes" if stale else "misses")
+
+        if stale:
+            if leader:
+                threading.Thread(target=self._fill, args=(key, loader, future),
+                                 name="krishimitra-cache-refresh", daemon=True).start()
+            return value
+        if leader:
+            self._fill(key, loader, future)
+        return future.result()
+
+    def _claim(self, key, counter):
+        """Join the running load for ``key`` or become its leader (call with the lock held)"""
+        future = self._inflight.get(key)
+        if future is not None:
+            if counter == "misses":
+                self._stats["coalesced"] += 1
+            return future, False
+        future = Future()
+        self._inflight[key] = future
+        self._stats[counter] += 1
+        return future, True
+
+    def _fill(self, key, loader, future):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._stats["load_errors"] += 1
+            logger.warning("Cache load for %r failed: %s", key, e)
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._store(key, value)
+        future.set_result(value)
+
+    def _store(self, key, value):
+        """Insert or replace an entry (call with the lock held)"""
+        now = time.monotonic()
+        if self.cacheable(value):
+            self._entries[key] = (value, now + self.ttl, now + self.ttl + self.stale_ttl)
+        elif self.negative_ttl:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[2] and self.cacheable(entry[0]):
+                return
+            self._entries[key] = (value, now + self.negative_ttl, now + self.negative_ttl)
+            self._stats["negative_stores"] += 1
+        else:
+            return
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def put(self, key, value):
+        """Store a value loaded elsewhere (e.g. as a by-product of another key's load)"""
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,322 @@
+"""CEDA Ashoka University price scraping.
+
+``fetch_ceda_prices`` is the cached entry point, and what ``ingest`` calls:
+results are cached per (commodity, state) for ``CACHE_TTL`` seconds, a miss
+scrapes the page once and fills every commodity, concurrent misses share
+that scrape, and failures are remembered for ``NEGATIVE_TTL``. Callers that
+accept stale data get it for up to ``CACHE_STALE_TTL`` more while a
+background refresh runs. Each candidate URL has a circuit breaker, so an
+outage fails fast instead of waiting out timeouts.
+
+The candidate CEDA pages are probed concurrently and the first one with a
+usable table wins; that URL is tried on its own first next time. Each page
+is parsed once (with lxml when installed) and every row is classified
+against all commodities in one regex pass. Fetches go through
+``http_client``, so an unchanged page is a 304 and its previous parse is
+reused.
+"""
+import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+import breaker
+import cache
+import http_client
+import ratelimit
+from markets import market_district
+
+CACHE_TTL = int(os.environ.get("KRISHIMITRA_CEDA_CACHE_TTL", "900"))
+CACHE_STALE_TTL = int(os.environ.get("KRISHIMITRA_CEDA_CACHE_STALE_TTL", "3600"))
+CACHE_SIZE = 256
+NEGATIVE_TTL = int(os.environ.get("KRISHIMITRA_CEDA_NEGATIVE_TTL", "60"))
+
+# Point at benchmarks/fixture_server.py to run without the live site.
+CEDA_BASE_URL = os.environ.get("KRISHIMITRA_CEDA_BASE_URL", "https://ceda.ashoka.edu.in")
+
+CEDA_COMMODITY_MAP = {
+    "Rice": ["rice", "paddy", "basmati"],
+    "Wheat": ["wheat"],
+    "Cotton": ["cotton"],
+    "Maize": ["maize", "corn"],
+    "Tomato": ["tomato"],
+    "Potato": ["potato"],
+    "Onion": ["onion"],
+    "Soybean": ["soybean", "soya"],
+    "Groundnut": ["groundnut", "peanut"],
+    "Pomegranate": ["pomegranate"],
+    "Chilli": ["chilli", "chili", "green chilli"],
+    "Sugarcane": ["sugarcane", "sugar cane"]
+}
+
+
+HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+CANDIDATE_PATHS = (
+    "/data/agricultural-prices",
+    "/data/agriculture",
+    "/agriculture",
+)
+
+PROBE_TIMEOUT = 15
+
+# Shared by all sessions so a burst of scrapes cannot spawn unbounded threads.
+_probe_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="krishimitra-ceda")
+
+# The candidate URL that last returned a usable table; tried first next time.
+_working_url = None
+
+# url -> (validator, rows) of the last full parse, reused when the page is
+# revalidated unchanged.
+_parsed_pages = {}
+
+
+def compile_matcher(keyword_map):
+    """Build ``classify(text) -> set of commodities`` from ``{commodity: [keywords]}``.
+
+    One regex scans the text once. The lookahead reports the longest keyword
+    starting at every position and each keyword also carries the commodities
+    of the keywords it starts with, so the result is the same as testing
+    every keyword as a substring.
+    """
+    owners = {}
+    for commodity, keywords in keyword_map.items():
+        for keyword in keywords:
+            owners.setdefault(keyword.lower(), set()).add(commodity)
+    commodity_of = {keyword: set().union(*(owners[prefix] for prefix in owners if keyword.startswith(prefix)))
+                    for keyword in owners}
+    alternatives = "|".join(re.escape(k) for k in sorted(commodity_of, key=len, reverse=True))
+    pattern = re.compile(f"(?=({alternatives}))")
+    
+    def classify(text):
+        found = set()
+        for match in pattern.finditer(text.lower()):
+            found |= commodity_of[match.group(1)]
+        return found
+    
+    return classify
+
+
+_classify_all = compile_matcher(CEDA_COMMODITY_MAP)
+
+
+def parse_price_tables(content, classify=_classify_all):
+    """Parse a page once and return ``{commodity: [row dicts]}`` for every commodity found"""
+    soup = BeautifulSoup(content, HTML_PARSER, parse_only=SoupStrainer('table'))
+    price_data = {}
+    
+    for table in soup.find_all('table'):
+        for row in table.find_all('tr')[1:]:
+            cols = row.find_all('td', limit=4)
+            if len(cols) < 4:
+                continue
+            item = cols[0].get_text(strip=True)
+            commodities = classify(item)
+            if not commodities:
+                continue
+            record = {
+                'commodity': item,
+                'market': cols[1].get_text(strip=True),
+                'price': cols[2].get_text(strip=True),
+                'date': cols[3].get_text(strip=True),
+                'source': 'CEDA Ashoka University'
+            }
+            for commodity in commodities:
+                price_data.setdefault(commodity, []).append(record)
+    return price_data
+
+
+def _probe(url, classify, settled):
+    """Fetch and parse one candidate URL; returns rows per commodity (possibly empty)"""
+    if settled.is_set():
+        return {}
+    circuit = breaker.get(url)
+    circuit.before_call()
+    try:
+        ratelimit.acquire(url)
+        if settled.is_set():
+            circuit.abandon()
+            return {}
+        response = http_client.get(url, headers=HEADERS, timeout=PROBE_TIMEOUT)
+    except ratelimit.RateLimited:
+        circuit.abandon()
+        raise
+    except Exception as e:
+        circuit.record_failure(e)
+        raise
+    if response.status_code != 200:
+        circuit.record_failure(f"HTTP {response.status_code}")
+        return {}
+    circuit.record_success()
+    if settled.is_set():
+        return {}
+    if classify is not _classify_all:
+        return parse_price_tables(response.content, classify)
+    previous = _parsed_pages.get(url)
+    if response.revalidated and previous is not None and previous[0] == response.validator:
+        return previous[1]
+    price_data = parse_price_tables(response.content)
+    if response.validator:
+        _parsed_pages[url] = (response.validator, price_data)
+    return price_data
+
+
+def _race(urls, classify):
+    """Probe ``urls`` concurrently; return (url, rows) of the first usable one.
+
+    Losing probes that have not started are cancelled and ones already in
+    flight skip their request; if every probe fails, the last error is raised.
+    """
+    settled = threading.Event()
+    futures = {_probe_pool.submit(_probe, url, classify, settled): url for url in urls}
+    error = None
+    try:
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if rows:
+                    return futures[future], rows
+    finally:
+        settled.set()
+        for future in futures:
+            future.cancel()
+    if error is not None:
+        raise error
+    return None, {}
+
+
+def scrape_all_ceda_prices(keyword_map=CEDA_COMMODITY_MAP):
+    """Fetch CEDA once and return ``{commodity: (DataFrame or None, status message)}``"""
+    global _working_url
+    classify = _classify_all if keyword_map is CEDA_COMMODITY_MAP else compile_matcher(keyword_map)
+    try:
+        candidates = [f"{CEDA_BASE_URL}{path}" for path in CANDIDATE_PATHS]
+        
+        url, price_data = None, {}
+        remembered = _working_url
+        if remembered in candidates:
+            try:
+                url, price_data = _race([remembered], classify)
+            except (requests.RequestException, ratelimit.RateLimited, breaker.CircuitOpen):
+                pass
+            candidates.remove(remembered)
+        if not price_data:
+            url, price_data = _race(candidates, classify)
+        _working_url = url
+        
+        missing = (None, "CEDA data not accessible. The website structure may have changed or data is not publicly available.")
+        return {commodity: (pd.DataFrame(price_data[commodity]), "✅ Data retrieved from CEDA Ashoka University")
+                if commodity in price_data else missing
+                for commodity in keyword_map}
+        
+    except breaker.CircuitOpen:
+        status = "CEDA is currently unavailable. Showing estimated prices until it recovers."
+    except ratelimit.RateLimited:
+        status = "CEDA is receiving too many requests right now. Please try again in a minute."
+    except requests.Timeout:
+        status = "Request timeout. CEDA server may be slow or unavailable."
+    except requests.ConnectionError:
+        status = "Connection error. Please check internet connectivity."
+    except Exception as e:
+        status = f"Error accessing CEDA: {str(e)}"
+    return {commodity: (None, status) for commodity in keyword_map}
+
+
+def scrape_ceda_prices(commodity, state="Maharashtra", district=None):
+    """Fetch agricultural prices from CEDA Ashoka University"""
+    keyword_map = CEDA_COMMODITY_MAP if commodity in CEDA_COMMODITY_MAP else {commodity: [commodity.lower()]}
+    return scrape_all_ceda_prices(keyword_map)[commodity]
+
+
+def observation_rows(commodity, ceda_df):
+    """Normalize scraped rows to price series rows, skipping unparseable ones.
+
+    Each market's district comes from ``markets.market_district``, the
+    same mapping imported dumps fall back to, so CEDA prices reach the
+    district reads.
+    """
+    prices = pd.to_numeric(ceda_df['price'].astype(str).str.replace(r'[^\d.]', '', regex=True), errors='coerce')
+    days = pd.to_datetime(ceda_df['date'], errors='coerce', dayfirst=True)
+    rows = []
+    for market, price, day in zip(ceda_df['market'], prices, days):
+        if pd.notna(price) and pd.notna(day) and market:
+            rows.append((commodity, market_district(market), market, day.strftime('%Y-%m-%d'),
+                         price, price, price, None))
+    return rows
+
+
+# Failed scrapes are remembered for NEGATIVE_TTL so a CEDA outage costs one
+# attempt per key per minute, not one per page view.
+_cache = cache.TTLCache(CACHE_TTL, maxsize=CACHE_SIZE, stale_ttl=CACHE_STALE_TTL,
+                        cacheable=lambda result: result[0] is not None, negative_ttl=NEGATIVE_TTL)
+
+# The running full-page scrape, if any: concurrent misses for different
+# commodities wait for it instead of starting their own.
+_scrape_lock = threading.Lock()
+_scrape_inflight = None
+
+
+def fetch_ceda_prices(commodity, state="Maharashtra", district=None, allow_stale=True):
+    """Cached CEDA prices; returns ``(DataFrame or None, status message)``.
+
+    A miss scrapes the page once for every commodity and caches them all.
+    ``allow_stale`` False never returns a stale entry (the ingest uses it).
+    """
+    return _cache.get((commodity, state), lambda: _scrape_and_fill(commodity, state), allow_stale)
+
+
+def _scrape_and_fill(commodity, state):
+    if commodity not in CEDA_COMMODITY_MAP:
+        return scrape_ceda_prices(commodity, state)
+    results = _shared_scrape()
+    for other, result in results.items():
+        if other != commodity:
+            _cache.put((other, state), result)
+    return results[commodity]
+
+
+def _shared_scrape():
+    global _scrape_inflight
+    with _scrape_lock:
+        future, leader = _scrape_inflight, _scrape_inflight is None
+        if leader:
+            future = _scrape_inflight = Future()
+    if leader:
+        try:
+            future.set_result(scrape_all_ceda_prices())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with _scrape_lock:
+                _scrape_inflight = None
+    return future.result()
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def reset():
+    """Forget the remembered endpoint, page parses and cached results"""
+    global _working_url
+    _working_url = None
+    _parsed_pages.clear()
+    _cache.invalidate()
@@ -0,0 +1,212 @@
+"""Process-wide SQLite access layer for KrishiMitra.
+
+Streamlit re-executes the app script on every interaction, but imported
+modules live for the whole server process, so the connection pool kept here
+is shared by every session and rerun.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = os.environ.get("KRISHIMITRA_DB", "krishimitra.db")
+
+POOL_SIZE = int(os.environ.get("KRISHIMITRA_DB_POOL_SIZE", "8"))
+
+# Per-connection cache of compiled statements, keyed by SQL text.
+STATEMENT_CACHE_SIZE = 256
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-16000",      # 16 MB page cache per connection
+    "PRAGMA mmap_size=134217728",    # 128 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _connect(path):
+    """Open a connection with the tuned pragmas applied"""
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to ``size``; callers beyond that wait
+    for one to be returned instead of opening more.
+    """
+
+    def __init__(self, path=DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=30):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return _connect(self.path)
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a database connection")
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def discard(self, conn):
+        """Drop a connection that is in an unknown state"""
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._opened -= 1
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection; commits on success, rolls back on error"""
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            pool.discard(conn)
+            raise
+        pool.release(conn)
+        raise
+    pool.release(conn)
+
+
+def query(sql, params=()):
+    """Run a read query and return all rows"""
+    with connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def query_one(sql, params=()):
+    """Run a read query and return the first row (or None)"""
+    with connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def execute(sql, params=()):
+    """Run a single write statement and return the new row id"""
+    with connection() as conn:
+        return conn.execute(sql, params).lastrowid
+
+
+def executemany(sql, seq_of_params):
+    """Run one write statement for many parameter sets in a single transaction"""
+    with connection() as conn:
+        conn.executemany(sql, seq_of_params)
+
+
+def schema_version(conn):
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn):
+    """Apply pending migrations in order and return the resulting version.
+
+    Runs under ``BEGIN IMMEDIATE`` so concurrent server processes serialize
+    on the write lock and only one of them applies each migration.
+    """
+    from migrations import MIGRATIONS
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version
+                    (version INTEGER PRIMARY KEY,
+                     description TEXT,
+                     applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    if conn.in_transaction:
+        conn.commit()
+    if schema_version(conn) >= MIGRATIONS[-1][0]:
+        return schema_version(conn)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = schema_version(conn)
+        for version, description, steps in MIGRATIONS:
+            if version <= current:
+                continue
+            if callable(steps):
+                steps(conn)
+            else:
+                for sql in steps:
+                    conn.execute(sql)
+            conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                         (version, description))
+            current = version
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return current
+
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def ensure_schema():
+    """Bring the schema up to date once per process; a flag check afterwards"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            with connection() as conn:
+                migrate(conn)
+            _schema_ready = True
+
+
+if __name__ == "__main__":
+    with connection() as conn:
+        print(f"{DB_PATH}: schema version {migrate(conn)}")
@@ -0,0 +1,137 @@
+"""Shared HTTP client for outbound fetches (CEDA today, other feeds later).
+
+One pooled ``requests.Session`` serves the whole process, so connections
+are kept alive between calls, and responses are negotiated gzip. Responses
+that carry an ``ETag`` or ``Last-Modified`` validator are kept in an
+on-disk cache and revalidated with a conditional GET; an unchanged page
+costs a 304 and is served from disk, flagged ``revalidated`` so callers can
+skip re-parsing it too.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get("KRISHIMITRA_HTTP_CACHE", ".http_cache")
+
+# Distinct hosts kept in the pool, and keep-alive connections per host.
+POOL_HOSTS = 10
+POOL_PER_HOST = 4
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'KrishiMitra/1.0 (Educational; Non-commercial; Agricultural Price Research)',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+
+class Response:
+    """What ``get`` returns: the fields callers use from ``requests.Response``"""
+
+    def __init__(self, url, status_code, content, headers, revalidated=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.revalidated = revalidated
+
+    @property
+    def validator(self):
+        return self.headers.get('ETag') or self.headers.get('Last-Modified')
+
+
+_session = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "not_modified": 0, "body_bytes": 0, "cache_writes": 0}
+
+
+def session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers.update(DEFAULT_HEADERS)
+                _session = s
+    return _session
+
+
+def _cache_path(url):
+    return os.path.join(CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".cache")
+
+
+def _load_cached(url):
+    """Return ``(metadata, body)`` of the cached copy, or ``(None, None)``"""
+    try:
+        with open(_cache_path(url), "rb") as f:
+            meta = json.loads(f.readline())
+            return meta, f.read()
+    except (OSError, ValueError):
+        return None, None
+
+
+def _store(url, response):
+    headers = {name: response.headers[name]
+               for name in ('ETag', 'Last-Modified', 'Content-Type') if name in response.headers}
+    meta = json.dumps({"url": url, "headers": headers, "fetched_at": time.time()})
+    path = _cache_path(url)
+    # Metadata line and body in one file, swapped in by an atomic rename.
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(meta.encode("utf-8") + b"\n")
+            f.write(response.content)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not cache %s: %s", url, e)
+        return
+    with _stats_lock:
+        _stats["cache_writes"] += 1
+
+
+def get(url, headers=None, timeout=15, conditional=True):
+    """GET ``url`` through the shared session, revalidating any cached copy"""
+    request_headers = dict(headers or {})
+    meta, body = _load_cached(url) if conditional else (None, None)
+    if meta is not None:
+        cached = meta["headers"]
+        if 'ETag' in cached:
+            request_headers['If-None-Match'] = cached['ETag']
+        if 'Last-Modified' in cached:
+            request_headers['If-Modified-Since'] = cached['Last-Modified']
+
+    response = session().get(url, headers=request_headers, timeout=timeout)
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["body_bytes"] += len(response.content)
+    if response.status_code == 304 and meta is not None:
+        with _stats_lock:
+            _stats["not_modified"] += 1
+        merged = CaseInsensitiveDict(meta["headers"])
+        merged.update(response.headers)
+        revalidated = Response(url, 200, body, merged, revalidated=True)
+        # A 304 may carry fresh validators; keep them and the fetch time.
+        _store(url, revalidated)
+        return revalidated
+
+    if conditional and response.status_code == 200 and (
+            'ETag' in response.headers or 'Last-Modified' in response.headers):
+        _store(url, response)
+    return Response(url, response.status_code, response.content, response.headers)
+
+
+def stats():
+    with _stats_lock:
+        return dict(_stats)
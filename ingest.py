@@ -0,0 +1,108 @@
+"""Scheduled ingestion of CEDA prices into the price time series.
+
+Every commodity in ``CEDA_COMMODITY_MAP`` is fetched on an interval through
+the CEDA cache (one fetch and parse of the page covers them all) and
+upserted into ``price_observations`` (source ``'ceda'``), so the market
+price page only ever reads the database. Unchanged rows are left alone by
+the upsert, so re-ingesting the same page does not touch the rollups.
+
+Run ``python ingest.py [--loop]`` from cron or a worker, or let the app
+start the background thread with ``start_background()``.
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+
+import ceda
+import db
+import queries
+
+logger = logging.getLogger(__name__)
+
+INGEST_INTERVAL_MINUTES = int(os.environ.get("KRISHIMITRA_INGEST_INTERVAL_MINUTES", "60"))
+
+
+_stats_lock = threading.Lock()
+_stats = {"runs": 0, "last_run_at": None, "last_duration_s": None, "last_rows": 0,
+          "last_missing": [], "store_errors": 0}
+
+
+def ingest_all(commodities=None):
+    """Fetch CEDA prices for every commodity (or the given ones); returns rows per commodity.
+
+    Goes through ``ceda.fetch_ceda_prices``, so the first commodity's miss
+    scrapes the page once for all of them and an outage is retried at most
+    once per ``ceda.NEGATIVE_TTL``. Stale entries are never stored.
+    """
+    started = time.monotonic()
+    ingested, missing = {}, []
+    for commodity in commodities or ceda.CEDA_COMMODITY_MAP:
+        ceda_df, status = ceda.fetch_ceda_prices(commodity, allow_stale=False)
+        if ceda_df is None:
+            logger.info("No CEDA prices for %s: %s", commodity, status)
+            ingested[commodity] = 0
+            missing.append(commodity)
+            continue
+        rows = ceda.observation_rows(commodity, ceda_df)
+        try:
+            db.executemany(queries.UPSERT_PRICE_OBSERVATION, [("ceda",) + row for row in rows])
+        except Exception:
+            logger.exception("Storing %s prices failed", commodity)
+            rows = []
+            with _stats_lock:
+                _stats["store_errors"] += 1
+        ingested[commodity] = len(rows)
+    with _stats_lock:
+        _stats.update(runs=_stats["runs"] + 1, last_run_at=time.time(),
+                      last_duration_s=time.monotonic() - started,
+                      last_rows=sum(ingested.values()), last_missing=missing)
+    return ingested
+
+
+def stats():
+    """Counters for the ingest runs made by this process"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def start_background(interval_minutes=INGEST_INTERVAL_MINUTES):
+    """Run ``ingest_all`` now and then every ``interval_minutes`` in a daemon thread"""
+    global _background
+    with _background_lock:
+        if _background is not None:
+            return
+        _background = threading.Thread(target=_ingest_forever, args=(interval_minutes,),
+                                       name="krishimitra-ingest", daemon=True)
+        _background.start()
+
+
+def _ingest_forever(interval_minutes):
+    while True:
+        started = time.monotonic()
+        try:
+            ingested = ingest_all()
+            logger.info("Ingested %d CEDA price rows in %.1fs",
+                        sum(ingested.values()), time.monotonic() - started)
+        except Exception:
+            logger.exception("CEDA ingest failed")
+        time.sleep(interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape CEDA prices for every commodity into the database")
+    parser.add_argument("--loop", action="store_true",
+                        help="keep running every --interval minutes")
+    parser.add_argument("--interval", type=int, default=INGEST_INTERVAL_MINUTES)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    db.ensure_schema()
+    if args.loop:
+        _ingest_forever(args.interval)
+    for commodity, count in ingest_all().items():
+        print(f"{commodity}: {count} rows")
@@ -0,0 +1,46 @@
+"""Canonical mandi names and their districts, from ``agri_data.MANDIS``.
+
+Price sources spell the same mandi differently ("Lasalgaon", "Lasalgaon
+APMC", "LASALGAON Market Yard"). Everything that stores prices normalizes
+through here, so one mandi is one series and carries its district.
+"""
+import re
+from functools import lru_cache
+
+from agri_data import MAHARASHTRA_LOCATIONS, MANDIS
+
+
+def market_key(name):
+    return re.sub(r"\b(apmc|market|yard)\b", "", name.lower()).strip()
+
+
+_KNOWN_MARKETS = {market_key(mandi): mandi for mandis in MANDIS.values() for mandi in mandis}
+
+_LISTED_IN = {}
+for _district, _mandis in MANDIS.items():
+    for _mandi in _mandis:
+        _LISTED_IN.setdefault(_mandi, set()).add(_district)
+
+_DISTRICTS = {district.lower(): district for district in MAHARASHTRA_LOCATIONS}
+
+
+@lru_cache(maxsize=8192)
+def normalize_market(name):
+    """Canonical mandi name when it is one we list ('Lasalgaon' -> 'Lasalgaon APMC')"""
+    cleaned = " ".join(name.split())
+    return _KNOWN_MARKETS.get(market_key(cleaned), cleaned)
+
+
+@lru_cache(maxsize=8192)
+def market_district(name):
+    """District a market is in, or None when it can't be told.
+
+    A listed mandi gives its district; any other market named after a
+    district ("Nagpur") is taken to be in it. Unknown markets and mandis
+    listed under two districts (Kalyan APMC) get None, so their prices only
+    appear in commodity-wide reads, not district ones.
+    """
+    districts = _LISTED_IN.get(normalize_market(name))
+    if districts:
+        return next(iter(districts)) if len(districts) == 1 else None
+    return _DISTRICTS.get(market_key(" ".join(name.split())))
@@ -0,0 +1,542 @@
+"""Versioned schema migrations for the KrishiMitra database.
+
+Each entry in ``MIGRATIONS`` is ``(version, description, steps)`` where
+``steps`` is a sequence of SQL statements or a callable taking the
+connection. Migrations only ever move forward; to change the schema, append
+a new entry rather than editing an applied one.
+"""
+
+INITIAL_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS users
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        full_name TEXT NOT NULL,
+        mobile TEXT NOT NULL,
+        email TEXT,
+        district TEXT,
+        tehsil TEXT,
+        village TEXT,
+        farm_size_acres REAL,
+        user_type TEXT DEFAULT 'Farmer',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+    '''CREATE TABLE IF NOT EXISTS activities
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        activity_type TEXT,
+        crop_name TEXT,
+        area_acres REAL,
+        activity_data TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id))''',
+    '''CREATE TABLE IF NOT EXISTS crop_tracking
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        crop_name TEXT,
+        area_acres REAL,
+        sowing_date DATE,
+        expected_harvest_date DATE,
+        current_stage TEXT,
+        days_after_sowing INTEGER,
+        health_status TEXT,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id))''',
+    '''CREATE TABLE IF NOT EXISTS price_alerts
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        commodity TEXT,
+        target_price REAL,
+        alert_type TEXT,
+        status TEXT DEFAULT 'Active',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id))''',
+    '''CREATE TABLE IF NOT EXISTS irrigation_schedule
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        crop_name TEXT,
+        schedule_date DATE,
+        water_amount REAL,
+        completed BOOLEAN DEFAULT 0,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id))''',
+    '''CREATE TABLE IF NOT EXISTS yield_predictions
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        crop_name TEXT,
+        area_acres REAL,
+        predicted_yield REAL,
+        confidence_level TEXT,
+        factors TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id))''',
+    '''CREATE TABLE IF NOT EXISTS manual_market_prices
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        district TEXT,
+        market_name TEXT,
+        commodity TEXT,
+        min_price REAL,
+        max_price REAL,
+        modal_price REAL,
+        arrival_quantity TEXT,
+        price_date DATE,
+        updated_by INTEGER,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+    '''CREATE TABLE IF NOT EXISTS financial_records
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        category TEXT,
+        amount REAL,
+        transaction_type TEXT,
+        crop_related TEXT,
+        transaction_date DATE,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id))''',
+    '''CREATE TABLE IF NOT EXISTS equipment_rentals
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        equipment_type TEXT,
+        provider_name TEXT,
+        provider_contact TEXT,
+        location TEXT,
+        district TEXT,
+        daily_rate REAL,
+        hourly_rate REAL,
+        availability TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+    '''CREATE TABLE IF NOT EXISTS buyer_connections
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        buyer_name TEXT,
+        buyer_type TEXT,
+        commodities_interested TEXT,
+        contact_number TEXT,
+        email TEXT,
+        district TEXT,
+        minimum_quantity REAL,
+        payment_terms TEXT,
+        active BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+    '''CREATE TABLE IF NOT EXISTS weather_alerts
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        alert_type TEXT,
+        severity TEXT,
+        message TEXT,
+        issued_date DATE,
+        valid_until DATE,
+        acknowledged BOOLEAN DEFAULT 0,
+        FOREIGN KEY(user_id) REFERENCES users(id))''',
+    '''CREATE TABLE IF NOT EXISTS pest_alerts
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        district TEXT,
+        crop_name TEXT,
+        pest_disease TEXT,
+        severity TEXT,
+        alert_date DATE,
+        description TEXT,
+        recommended_action TEXT)''',
+)
+
+# Secondary indexes for the filters and sort orders in queries.py. The
+# financial one covers the per-type totals so they never touch the table.
+HOT_PATH_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_activities_user_created ON activities(user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_crop_tracking_user_sowing ON crop_tracking(user_id, sowing_date)",
+    "CREATE INDEX IF NOT EXISTS idx_manual_prices_commodity_district_date "
+    "ON manual_market_prices(commodity, district, price_date)",
+    "CREATE INDEX IF NOT EXISTS idx_pest_alerts_district_date ON pest_alerts(district, alert_date)",
+    "CREATE INDEX IF NOT EXISTS idx_equipment_district_type_availability "
+    "ON equipment_rentals(district, equipment_type, availability)",
+    "CREATE INDEX IF NOT EXISTS idx_irrigation_user_date ON irrigation_schedule(user_id, schedule_date)",
+    "CREATE INDEX IF NOT EXISTS idx_financial_user_date ON financial_records(user_id, transaction_date)",
+    "CREATE INDEX IF NOT EXISTS idx_financial_user_type_amount "
+    "ON financial_records(user_id, transaction_type, amount)",
+    "CREATE INDEX IF NOT EXISTS idx_price_alerts_user_created ON price_alerts(user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_buyers_district_active ON buyer_connections(district, active)",
+    "ANALYZE",
+)
+
+# Per-user counters for the dashboard, kept current by triggers so reading
+# them is a single primary-key lookup.
+_STAT_SOURCES = (
+    ("activities", "activity_count"),
+    ("crop_tracking", "crop_count"),
+    ("financial_records", "financial_record_count"),
+    ("price_alerts", "price_alert_count"),
+)
+
+USER_STATS = (
+    '''CREATE TABLE IF NOT EXISTS user_stats
+       (user_id INTEGER PRIMARY KEY,
+        activity_count INTEGER NOT NULL DEFAULT 0,
+        crop_count INTEGER NOT NULL DEFAULT 0,
+        financial_record_count INTEGER NOT NULL DEFAULT 0,
+        price_alert_count INTEGER NOT NULL DEFAULT 0)''',
+) + tuple(
+    f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_insert AFTER INSERT ON {table}
+       WHEN NEW.user_id IS NOT NULL
+       BEGIN
+           INSERT INTO user_stats (user_id, {column}) VALUES (NEW.user_id, 1)
+           ON CONFLICT(user_id) DO UPDATE SET {column} = {column} + 1;
+       END'''
+    for table, column in _STAT_SOURCES
+) + tuple(
+    f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_delete AFTER DELETE ON {table}
+       WHEN OLD.user_id IS NOT NULL
+       BEGIN
+           UPDATE user_stats SET {column} = MAX({column} - 1, 0) WHERE user_id = OLD.user_id;
+       END'''
+    for table, column in _STAT_SOURCES
+) + (
+    '''INSERT OR REPLACE INTO user_stats
+       (user_id, activity_count, crop_count, financial_record_count, price_alert_count)
+       SELECT id,
+              (SELECT COUNT(*) FROM activities WHERE user_id = users.id),
+              (SELECT COUNT(*) FROM crop_tracking WHERE user_id = users.id),
+              (SELECT COUNT(*) FROM financial_records WHERE user_id = users.id),
+              (SELECT COUNT(*) FROM price_alerts WHERE user_id = users.id)
+       FROM users''',
+)
+
+# Materialized ledger totals per (user, month, category, crop, type). The
+# Financial Summary tab reads only these rows, so its cost tracks the number
+# of distinct months and categories rather than the size of the ledger.
+_ROLLUP_KEY = "COALESCE(strftime('%Y-%m', {r}.transaction_date), ''), COALESCE({r}.category, ''), " \
+              "COALESCE({r}.crop_related, ''), COALESCE({r}.transaction_type, '')"
+
+_ROLLUP_ADD = '''INSERT INTO financial_rollups
+           (user_id, month, category, crop_related, transaction_type, total, entries)
+           VALUES (NEW.user_id, ''' + _ROLLUP_KEY.format(r="NEW") + ''', COALESCE(NEW.amount, 0), 1)
+           ON CONFLICT(user_id, month, category, crop_related, transaction_type)
+           DO UPDATE SET total = total + excluded.total, entries = entries + 1;'''
+
+_ROLLUP_REMOVE = '''UPDATE financial_rollups
+           SET total = total - COALESCE(OLD.amount, 0), entries = entries - 1
+           WHERE user_id = OLD.user_id
+             AND (month, category, crop_related, transaction_type) = (''' + _ROLLUP_KEY.format(r="OLD") + ''');
+           DELETE FROM financial_rollups
+           WHERE user_id = OLD.user_id AND entries <= 0
+             AND (month, category, crop_related, transaction_type) = (''' + _ROLLUP_KEY.format(r="OLD") + ''');'''
+
+FINANCIAL_ROLLUPS = (
+    '''CREATE TABLE IF NOT EXISTS financial_rollups
+       (user_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        category TEXT NOT NULL,
+        crop_related TEXT NOT NULL,
+        transaction_type TEXT NOT NULL,
+        total REAL NOT NULL DEFAULT 0,
+        entries INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, month, category, crop_related, transaction_type)) WITHOUT ROWID''',
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_rollup_insert AFTER INSERT ON financial_records "
+    "WHEN NEW.user_id IS NOT NULL BEGIN " + _ROLLUP_ADD + " END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_rollup_delete AFTER DELETE ON financial_records "
+    "WHEN OLD.user_id IS NOT NULL BEGIN " + _ROLLUP_REMOVE + " END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_rollup_update "
+    "AFTER UPDATE OF user_id, category, amount, transaction_type, crop_related, transaction_date "
+    "ON financial_records BEGIN " + _ROLLUP_REMOVE + " " + _ROLLUP_ADD + " END",
+    '''INSERT INTO financial_rollups
+       (user_id, month, category, crop_related, transaction_type, total, entries)
+       SELECT user_id, ''' + _ROLLUP_KEY.format(r="financial_records") + ''', SUM(COALESCE(amount, 0)), COUNT(*)
+       FROM financial_records WHERE user_id IS NOT NULL
+       GROUP BY 1, 2, 3, 4, 5''',
+    # The summary no longer aggregates the raw ledger.
+    "DROP INDEX IF EXISTS idx_financial_user_type_amount",
+)
+
+# One time series for every price source. price_daily and price_weekly are
+# recomputed for just the affected (commodity, market, day/week) whenever an
+# observation changes, so chart and latest-price reads are index ranges.
+_WEEK_START = "date({k}.day, 'weekday 0', '-6 days')"
+
+
+def _refresh_price_rollups(k):
+    week = _WEEK_START.format(k=k)
+    match = f"commodity = {k}.commodity AND market = {k}.market"
+    in_week = f"{match} AND day BETWEEN {week} AND date({week}, '+6 days')"
+    return f'''
+           DELETE FROM price_daily WHERE {match} AND day = {k}.day;
+           INSERT INTO price_daily
+               (commodity, market, day, district, low, high, modal, arrivals, observations)
+           SELECT commodity, market, day, MAX(district), MIN(min_price), MAX(max_price),
+                  AVG(modal_price), SUM(arrivals), COUNT(*)
+           FROM price_observations WHERE {match} AND day = {k}.day
+           GROUP BY commodity, market, day;
+           DELETE FROM price_weekly WHERE {match} AND week_start = {week};
+           INSERT INTO price_weekly
+               (commodity, market, week_start, district, open, high, low, close, modal, days)
+           SELECT commodity, market, {week}, MAX(district),
+                  (SELECT modal FROM price_daily WHERE {in_week} ORDER BY day LIMIT 1),
+                  MAX(high), MIN(low),
+                  (SELECT modal FROM price_daily WHERE {in_week} ORDER BY day DESC LIMIT 1),
+                  AVG(modal), COUNT(*)
+           FROM price_daily WHERE {in_week}
+           GROUP BY commodity, market;'''
+
+
+PRICE_TIME_SERIES = (
+    '''CREATE TABLE IF NOT EXISTS price_observations
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source TEXT NOT NULL,
+        commodity TEXT NOT NULL,
+        district TEXT,
+        market TEXT NOT NULL,
+        day DATE NOT NULL,
+        min_price REAL,
+        max_price REAL,
+        modal_price REAL,
+        arrivals REAL,
+        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(commodity, market, day, source))''',
+    '''CREATE TABLE IF NOT EXISTS price_daily
+       (commodity TEXT NOT NULL,
+        market TEXT NOT NULL,
+        day DATE NOT NULL,
+        district TEXT,
+        low REAL,
+        high REAL,
+        modal REAL,
+        arrivals REAL,
+        observations INTEGER NOT NULL,
+        PRIMARY KEY (commodity, market, day)) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS price_weekly
+       (commodity TEXT NOT NULL,
+        market TEXT NOT NULL,
+        week_start DATE NOT NULL,
+        district TEXT,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        modal REAL,
+        days INTEGER NOT NULL,
+        PRIMARY KEY (commodity, market, week_start)) WITHOUT ROWID''',
+    "CREATE INDEX IF NOT EXISTS idx_price_daily_commodity_district_day ON price_daily(commodity, district, day)",
+    "CREATE INDEX IF NOT EXISTS idx_price_weekly_commodity_district_week "
+    "ON price_weekly(commodity, district, week_start)",
+    "CREATE TRIGGER IF NOT EXISTS trg_price_observation_insert AFTER INSERT ON price_observations BEGIN "
+    + _refresh_price_rollups("NEW") + " END",
+    "CREATE TRIGGER IF NOT EXISTS trg_price_observation_update AFTER UPDATE ON price_observations BEGIN "
+    + _refresh_price_rollups("OLD") + _refresh_price_rollups("NEW") + " END",
+    "CREATE TRIGGER IF NOT EXISTS trg_price_observation_delete AFTER DELETE ON price_observations BEGIN "
+    + _refresh_price_rollups("OLD") + " END",
+    # User-contributed mandi prices feed the same series.
+    '''CREATE TRIGGER IF NOT EXISTS trg_manual_price_observation AFTER INSERT ON manual_market_prices
+       WHEN NEW.commodity IS NOT NULL AND NEW.market_name IS NOT NULL AND NEW.price_date IS NOT NULL
+       BEGIN
+           INSERT INTO price_observations
+               (source, commodity, district, market, day, min_price, max_price, modal_price, arrivals)
+           VALUES ('manual', NEW.commodity, NEW.district, NEW.market_name, date(NEW.price_date),
+                   NEW.min_price, NEW.max_price, NEW.modal_price,
+                   NULLIF(CAST(NEW.arrival_quantity AS REAL), 0))
+           ON CONFLICT(commodity, market, day, source) DO UPDATE SET
+               district = excluded.district, min_price = excluded.min_price,
+               max_price = excluded.max_price, modal_price = excluded.modal_price,
+               arrivals = excluded.arrivals, recorded_at = CURRENT_TIMESTAMP;
+       END''',
+    '''INSERT INTO price_observations
+       (source, commodity, district, market, day, min_price, max_price, modal_price, arrivals)
+       SELECT 'manual', commodity, district, market_name, date(price_date),
+              min_price, max_price, modal_price, NULLIF(CAST(arrival_quantity AS REAL), 0)
+       FROM manual_market_prices
+       WHERE commodity IS NOT NULL AND market_name IS NOT NULL AND date(price_date) IS NOT NULL
+       ORDER BY id
+       ON CONFLICT(commodity, market, day, source) DO UPDATE SET
+           district = excluded.district, min_price = excluded.min_price,
+           max_price = excluded.max_price, modal_price = excluded.modal_price,
+           arrivals = excluded.arrivals''',
+)
+
+# External-content FTS5 indexes over free text; the base tables stay the
+# source of truth and triggers mirror every change into the index.
+_FTS_SOURCES = (
+    ("pest_alerts_fts", "pest_alerts", ("crop_name", "pest_disease", "description", "district")),
+    ("crop_notes_fts", "crop_tracking", ("crop_name", "notes")),
+    ("activities_fts", "activities", ("activity_type", "crop_name", "activity_data")),
+)
+
+
+def _fts_statements():
+    for fts, table, columns in _FTS_SOURCES:
+        cols = ", ".join(columns)
+        new = ", ".join(f"NEW.{c}" for c in columns)
+        old = ", ".join(f"OLD.{c}" for c in columns)
+        yield (f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+               f"content='{table}', content_rowid='id', tokenize='porter unicode61')")
+        yield (f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} BEGIN "
+               f"INSERT INTO {fts}(rowid, {cols}) VALUES (NEW.id, {new}); END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} BEGIN "
+               f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old}); END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table} BEGIN "
+               f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old}); "
+               f"INSERT INTO {fts}(rowid, {cols}) VALUES (NEW.id, {new}); END")
+        yield f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+
+
+FULL_TEXT_SEARCH = tuple(_fts_statements())
+
+def _buyer_commodities(conn):
+    """Normalize buyer_connections.commodities_interested into a junction table"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS buyer_commodities
+                    (buyer_id INTEGER NOT NULL,
+                     commodity TEXT NOT NULL,
+                     PRIMARY KEY (buyer_id, commodity),
+                     FOREIGN KEY(buyer_id) REFERENCES buyer_connections(id)) WITHOUT ROWID''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_buyer_commodities_commodity "
+                 "ON buyer_commodities(commodity, buyer_id)")
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_buyer_commodities_delete
+                    BEFORE DELETE ON buyer_connections BEGIN
+                        DELETE FROM buyer_commodities WHERE buyer_id = OLD.id;
+                    END''')
+    rows = conn.execute("SELECT id, commodities_interested FROM buyer_connections "
+                        "WHERE commodities_interested IS NOT NULL").fetchall()
+    conn.executemany("INSERT OR IGNORE INTO buyer_commodities (buyer_id, commodity) VALUES (?, ?)",
+                     [(buyer_id, commodity.strip())
+                      for buyer_id, csv in rows
+                      for commodity in csv.split(",") if commodity.strip()])
+
+
+RATE_LIMITS = (
+    '''CREATE TABLE IF NOT EXISTS rate_limits
+       (host TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL)''',
+)
+
+# A bulk importer inserts a row into price_bulk_load inside its own
+# transaction (no other connection ever sees it), which switches the per-row
+# rollup triggers off; it then refreshes the rollups for everything it
+# touched with REFRESH_BULK_ROLLUPS before committing.
+_NOT_BULK = "WHEN NOT EXISTS (SELECT 1 FROM price_bulk_load)"
+
+BULK_PRICE_LOADS = (
+    "CREATE TABLE IF NOT EXISTS price_bulk_load (started_at REAL)",
+    "DROP TRIGGER IF EXISTS trg_price_observation_insert",
+    "DROP TRIGGER IF EXISTS trg_price_observation_update",
+    "DROP TRIGGER IF EXISTS trg_price_observation_delete",
+    f"CREATE TRIGGER trg_price_observation_insert AFTER INSERT ON price_observations {_NOT_BULK} BEGIN "
+    + _refresh_price_rollups("NEW") + " END",
+    f"CREATE TRIGGER trg_price_observation_update AFTER UPDATE ON price_observations {_NOT_BULK} BEGIN "
+    + _refresh_price_rollups("OLD") + _refresh_price_rollups("NEW") + " END",
+    f"CREATE TRIGGER trg_price_observation_delete AFTER DELETE ON price_observations {_NOT_BULK} BEGIN "
+    + _refresh_price_rollups("OLD") + " END",
+)
+
+# Set-based _refresh_price_rollups over every (commodity, market, day) in
+# temp.price_bulk_keys; run by bulk loaders, not a migration step.
+_BULK_WEEKS = '''(SELECT DISTINCT commodity, market, date(day, 'weekday 0', '-6 days') AS week_start
+                 FROM temp.price_bulk_keys)'''
+_IN_WEEK = "f.commodity = w.commodity AND f.market = w.market AND f.day BETWEEN w.week_start AND date(w.week_start, '+6 days')"
+
+REFRESH_BULK_ROLLUPS = (
+    '''DELETE FROM price_daily WHERE (commodity, market, day) IN
+           (SELECT commodity, market, day FROM temp.price_bulk_keys)''',
+    '''INSERT INTO price_daily
+           (commodity, market, day, district, low, high, modal, arrivals, observations)
+       SELECT o.commodity, o.market, o.day, MAX(o.district), MIN(o.min_price), MAX(o.max_price),
+              AVG(o.modal_price), SUM(o.arrivals), COUNT(*)
+       FROM temp.price_bulk_keys k
+       JOIN price_observations o ON o.commodity = k.commodity AND o.market = k.market AND o.day = k.day
+       GROUP BY o.commodity, o.market, o.day''',
+    f'''DELETE FROM price_weekly WHERE (commodity, market, week_start) IN
+            (SELECT commodity, market, week_start FROM {_BULK_WEEKS})''',
+    f'''INSERT INTO price_weekly
+            (commodity, market, week_start, district, open, high, low, close, modal, days)
+        SELECT w.commodity, w.market, w.week_start, MAX(f.district),
+               (SELECT modal FROM price_daily f WHERE {_IN_WEEK} ORDER BY f.day LIMIT 1),
+               MAX(f.high), MIN(f.low),
+               (SELECT modal FROM price_daily f WHERE {_IN_WEEK} ORDER BY f.day DESC LIMIT 1),
+               AVG(f.modal), COUNT(*)
+        FROM {_BULK_WEEKS} w
+        JOIN price_daily f ON {_IN_WEEK}
+        GROUP BY w.commodity, w.market, w.week_start''',
+)
+
+AI_RESPONSE_CACHE = (
+    '''CREATE TABLE IF NOT EXISTS ai_response_cache
+       (key TEXT PRIMARY KEY,
+        feature TEXT NOT NULL,
+        model TEXT NOT NULL,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        last_used_at REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0)''',
+    "CREATE INDEX IF NOT EXISTS idx_ai_response_cache_last_used ON ai_response_cache(last_used_at)",
+    "CREATE INDEX IF NOT EXISTS idx_ai_response_cache_expires ON ai_response_cache(expires_at)",
+)
+
+# One precomputed advisory per crop x growth stage x district, written by
+# advisories.py from Message Batches results.
+STAGE_ADVISORIES = (
+    '''CREATE TABLE IF NOT EXISTS stage_advisories
+       (crop TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        district TEXT NOT NULL,
+        advisory TEXT NOT NULL,
+        model TEXT NOT NULL,
+        batch_id TEXT,
+        generated_at REAL NOT NULL,
+        PRIMARY KEY (crop, stage, district))''',
+    '''CREATE TABLE IF NOT EXISTS advisory_batches
+       (batch_id TEXT PRIMARY KEY,
+        submitted_at REAL NOT NULL,
+        requests INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        succeeded INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        collected_at REAL)''',
+)
+
+# Newest cutoff tiering.archive_old_rows has used per table: rows older than
+# this may live in the archive, whatever the reader's own setting is.
+ARCHIVE_WATERMARKS = (
+    '''CREATE TABLE IF NOT EXISTS archive_watermarks
+       (table_name TEXT PRIMARY KEY,
+        archived_before TEXT NOT NULL)''',
+)
+
+
+# Migration 4's update trigger ran both halves unguarded, so moving a record
+# to or from a NULL user_id tried to write a NULL rollup key and the UPDATE
+# failed. Each half now fires only for the side that has a user.
+_ROLLUP_COLUMNS = "user_id, category, amount, transaction_type, crop_related, transaction_date"
+
+GUARDED_ROLLUP_UPDATES = (
+    "DROP TRIGGER IF EXISTS trg_financial_rollup_update",
+    f"CREATE TRIGGER trg_financial_rollup_update_remove AFTER UPDATE OF {_ROLLUP_COLUMNS} "
+    "ON financial_records WHEN OLD.user_id IS NOT NULL BEGIN " + _ROLLUP_REMOVE + " END",
+    f"CREATE TRIGGER trg_financial_rollup_update_add AFTER UPDATE OF {_ROLLUP_COLUMNS} "
+    "ON financial_records WHEN NEW.user_id IS NOT NULL BEGIN " + _ROLLUP_ADD + " END",
+)
+
+
+def _ceda_districts(conn):
+    """Fill in the district of CEDA prices stored before markets were mapped"""
+    from markets import market_district
+
+    markets = conn.execute("SELECT DISTINCT market FROM price_observations "
+                           "WHERE source = 'ceda' AND district IS NULL").fetchall()
+    conn.executemany("UPDATE price_observations SET district = ? "
+                     "WHERE source = 'ceda' AND district IS NULL AND market = ?",
+                     [(market_district(market), market) for (market,) in markets
+                      if market_district(market)])
+
+
+MIGRATIONS = [
+    (1, "initial schema", INITIAL_SCHEMA),
+    (2, "hot path indexes", HOT_PATH_INDEXES),
+    (3, "trigger-maintained user stats", USER_STATS),
+    (4, "financial rollups", FINANCIAL_ROLLUPS),
+    (5, "price time series with daily and weekly rollups", PRICE_TIME_SERIES),
+    (6, "full-text search over pest reports, crop notes and activities", FULL_TEXT_SEARCH),
+    (7, "buyer commodities junction table", _buyer_commodities),
+    (8, "per-host rate limit buckets", RATE_LIMITS),
+    (9, "bulk price loads bypass per-row rollup triggers", BULK_PRICE_LOADS),
+    (10, "shared AI response cache", AI_RESPONSE_CACHE),
+    (11, "precomputed stage advisories", STAGE_ADVISORIES),
+    (12, "archive watermarks", ARCHIVE_WATERMARKS),
+    (13, "financial rollup update triggers skip records without a user", GUARDED_ROLLUP_UPDATES),
+    (14, "district for stored CEDA prices", _ceda_districts),
+]
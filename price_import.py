@@ -0,0 +1,257 @@
+"""Streaming bulk import of AGMARKNET-style price dumps (CSV or XLSX).
+
+Rows are read lazily, validated and normalized against ``CROP_DATABASE``
+and the district mandi lists, de-duplicated on (market, commodity, date) and
+upserted into ``price_observations`` (source ``'agmarknet'``) in chunks of
+``CHUNK_SIZE``, one transaction per chunk. Per-row rollup triggers are
+switched off for the load and the affected daily/weekly rollups are
+recomputed set-wise once per chunk.
+
+    python price_import.py prices.csv [--chunk-size N]
+"""
+import argparse
+import csv
+import io
+import logging
+import os
+import re
+import time
+from datetime import date, datetime
+from functools import lru_cache
+
+import db
+import queries
+from agri_data import CROP_DATABASE, MAHARASHTRA_LOCATIONS
+from ceda import CEDA_COMMODITY_MAP, compile_matcher
+from markets import market_district, normalize_market
+from migrations import REFRESH_BULK_ROLLUPS
+
+logger = logging.getLogger(__name__)
+
+SOURCE = "agmarknet"
+CHUNK_SIZE = 50000
+
+# Canonical field -> prefixes of the header with everything but letters
+# stripped, e.g. "Min Price (Rs./Quintal)" -> "minpricersquintal".
+COLUMN_PREFIXES = {
+    "state": ("state",),
+    "district": ("district",),
+    "market": ("market",),
+    "commodity": ("commodity",),
+    "min_price": ("minprice", "minimumprice"),
+    "max_price": ("maxprice", "maximumprice"),
+    "modal_price": ("modalprice",),
+    "date": ("pricedate", "arrivaldate", "reporteddate", "date"),
+    "arrivals": ("arrival",),
+}
+REQUIRED_COLUMNS = ("market", "commodity", "modal_price", "date")
+
+DATE_FORMATS = ("%d %b %Y", "%d-%b-%Y", "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%d %B %Y")
+
+_classify = compile_matcher({crop: [crop.lower()] + CEDA_COMMODITY_MAP.get(crop, []) for crop in CROP_DATABASE})
+
+
+class ImportFormatError(ValueError):
+    """The file is not a price dump we can read"""
+
+
+def map_columns(header):
+    """Map canonical field names to column positions in ``header``"""
+    columns = {}
+    for position, name in enumerate(header):
+        key = re.sub(r"[^a-z]", "", str(name or "").lower())
+        for field, prefixes in COLUMN_PREFIXES.items():
+            if field not in columns and key.startswith(prefixes):
+                columns[field] = position
+                break
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if missing:
+        raise ImportFormatError(f"Missing column(s): {', '.join(missing)}")
+    return columns
+
+
+@lru_cache(maxsize=4096)
+def normalize_commodity(name):
+    """The CROP_DATABASE crop a dump's commodity name refers to, or None"""
+    crops = _classify(name)
+    return crops.pop() if len(crops) == 1 else None
+
+
+@lru_cache(maxsize=1024)
+def normalize_district(name):
+    cleaned = " ".join(name.split())
+    for district in MAHARASHTRA_LOCATIONS:
+        if district.lower() == cleaned.lower():
+            return district
+    return cleaned.title() or None
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_text(text):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_day(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return _parse_date_text(str(value).strip()) if value not in (None, "") else None
+
+
+def parse_number(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").strip())
+    except ValueError:
+        return None
+
+
+def _cell(row, columns, field):
+    position = columns.get(field)
+    return row[position] if position is not None and position < len(row) else None
+
+
+def normalize_row(row, columns):
+    """Return ``(observation, None)`` or ``(None, reason)`` for one input row"""
+    state = _cell(row, columns, "state")
+    if state and str(state).strip().lower() != "maharashtra":
+        return None, "other state"
+    commodity = normalize_commodity(str(_cell(row, columns, "commodity") or ""))
+    if commodity is None:
+        return None, "unknown commodity"
+    market = normalize_market(str(_cell(row, columns, "market") or ""))
+    if not market:
+        return None, "missing market"
+    day = parse_day(_cell(row, columns, "date"))
+    if day is None:
+        return None, "bad date"
+    modal = parse_number(_cell(row, columns, "modal_price"))
+    if modal is None or modal <= 0:
+        return None, "bad price"
+    low = parse_number(_cell(row, columns, "min_price"))
+    high = parse_number(_cell(row, columns, "max_price"))
+    low = modal if low is None else low
+    high = modal if high is None else high
+    if not low <= modal <= high:
+        return None, "bad price"
+    district = _cell(row, columns, "district")
+    district = normalize_district(str(district)) if district else market_district(market)
+    arrivals = parse_number(_cell(row, columns, "arrivals"))
+    return (commodity, district, market, day, low, high, modal, arrivals), None
+
+
+def read_rows(stream, filename):
+    """Yield rows (sequences) from a CSV or XLSX file object, header first"""
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFormatError("Reading .xlsx needs the openpyxl package (pip install openpyxl)")
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+        return
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    yield from csv.reader(text)
+
+
+def _write_chunk(conn, observations):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("INSERT INTO price_bulk_load (started_at) VALUES (?)", (time.time(),))
+        conn.execute("DELETE FROM temp.price_bulk_keys")
+        conn.executemany(queries.UPSERT_PRICE_OBSERVATION,
+                         [(SOURCE,) + observation for observation in observations])
+        conn.executemany("INSERT OR IGNORE INTO temp.price_bulk_keys VALUES (?, ?, ?)",
+                         [(o[0], o[2], o[3]) for o in observations])
+        for sql in REFRESH_BULK_ROLLUPS:
+            conn.execute(sql)
+        conn.execute("DELETE FROM price_bulk_load")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def import_prices(stream, filename, chunk_size=CHUNK_SIZE, progress=None):
+    """Stream a price dump into the database; returns a summary dict.
+
+    ``progress(summary)`` is called after every committed chunk.
+    """
+    started = time.perf_counter()
+    summary = {"rows_read": 0, "rows_imported": 0, "duplicates": 0, "skipped": {}}
+    rows = read_rows(stream, filename)
+    header = next(rows, None)
+    if header is None:
+        raise ImportFormatError("The file is empty")
+    columns = map_columns(header)
+
+    conn = db._connect(db.DB_PATH)
+    try:
+        conn.execute('''CREATE TEMP TABLE IF NOT EXISTS price_bulk_keys
+                        (commodity TEXT, market TEXT, day DATE,
+                         PRIMARY KEY (commodity, market, day)) WITHOUT ROWID''')
+        chunk = {}
+        for row in rows:
+            summary["rows_read"] += 1
+            observation, reason = normalize_row(row, columns)
+            if observation is None:
+                summary["skipped"][reason] = summary["skipped"].get(reason, 0) + 1
+                continue
+            key = (observation[2], observation[0], observation[3])
+            if key in chunk:
+                summary["duplicates"] += 1
+            chunk[key] = observation
+            if len(chunk) >= chunk_size:
+                _write_chunk(conn, list(chunk.values()))
+                summary["rows_imported"] += len(chunk)
+                chunk = {}
+                if progress:
+                    progress(_with_rate(summary, started))
+        if chunk:
+            _write_chunk(conn, list(chunk.values()))
+            summary["rows_imported"] += len(chunk)
+    finally:
+        conn.close()
+    return _with_rate(summary, started)
+
+
+def _with_rate(summary, started):
+    elapsed = time.perf_counter() - started
+    summary["seconds"] = elapsed
+    summary["rows_per_sec"] = summary["rows_read"] / elapsed if elapsed else 0.0
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import an AGMARKNET price export (CSV or XLSX)")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    db.ensure_schema()
+
+    def report(summary):
+        print(f"{summary['rows_read']:,} rows read, {summary['rows_imported']:,} imported "
+              f"({summary['rows_per_sec']:,.0f} rows/s)")
+
+    with open(args.path, "rb") as f:
+        result = import_prices(f, os.path.basename(args.path), args.chunk_size, progress=report)
+    report(result)
+    if result["duplicates"]:
+        print(f"{result['duplicates']:,} duplicate (market, commodity, date) rows collapsed")
+    for reason, count in sorted(result["skipped"].items()):
+        print(f"skipped {count:,}: {reason}")
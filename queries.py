@@ -0,0 +1,258 @@
+"""SQL for the hot read paths (and the shared price upsert).
+
+Keeping these in one place lets ``check_query_plans`` run ``EXPLAIN QUERY
+PLAN`` over exactly what production executes. Run ``python queries.py`` (it
+exits non-zero if any query falls back to a table scan) after changing a
+query or an index.
+"""
+import re
+import sqlite3
+import sys
+
+LOGIN_USER = '''SELECT id, username, full_name, mobile, email, district, tehsil, village, farm_size_acres, user_type
+                FROM users WHERE username=? AND password_hash=?'''
+
+USER_STATS = '''SELECT activity_count, crop_count, financial_record_count, price_alert_count
+                FROM user_stats WHERE user_id=?'''
+
+USER_ACTIVITIES = '''SELECT activity_type, crop_name, area_acres, activity_data, created_at
+                     FROM activities WHERE user_id=?
+                     ORDER BY created_at DESC LIMIT ?'''
+
+USER_RECENT_CROPS = '''SELECT crop_name, area_acres, days_after_sowing, current_stage, health_status
+                       FROM crop_tracking WHERE user_id=? ORDER BY sowing_date DESC LIMIT 5'''
+
+USER_CROPS = '''SELECT id, crop_name, area_acres, sowing_date, days_after_sowing,
+                current_stage, health_status, notes
+                FROM crop_tracking WHERE user_id=? ORDER BY sowing_date DESC'''
+
+USER_CROP_SUMMARY = '''SELECT crop_name, COUNT(*), AVG(area_acres)
+                       FROM crop_tracking WHERE user_id=? GROUP BY crop_name'''
+
+USER_UPCOMING_IRRIGATION = '''SELECT crop_name, schedule_date, completed, notes
+                              FROM irrigation_schedule
+                              WHERE user_id=? AND schedule_date >= date('now')
+                              ORDER BY schedule_date LIMIT 7'''
+
+USER_FINANCIAL_RECORDS = '''SELECT transaction_date as Date, category as Category, amount as Amount,
+                            transaction_type as Type, crop_related as Crop, notes as Notes
+                            FROM financial_records WHERE user_id=? ORDER BY transaction_date DESC LIMIT 50'''
+
+USER_FINANCIAL_ROLLUPS = '''SELECT month, category, crop_related, transaction_type, total, entries
+                            FROM financial_rollups WHERE user_id=?'''
+
+USER_PRICE_ALERTS = '''SELECT id, commodity, target_price, alert_type, status, created_at
+                       FROM price_alerts WHERE user_id=? ORDER BY created_at DESC'''
+
+DISTRICT_PEST_ALERTS = '''SELECT crop_name, pest_disease, severity, description, recommended_action, alert_date
+                          FROM pest_alerts WHERE district=? ORDER BY alert_date DESC LIMIT 10'''
+
+AVAILABLE_EQUIPMENT = '''SELECT equipment_type, provider_name, provider_contact, location,
+                         daily_rate, hourly_rate, availability FROM equipment_rentals
+                         WHERE district=? AND equipment_type=? AND availability='Available' '''
+
+DISTRICT_BUYERS = '''SELECT buyer_name, buyer_type, commodities_interested, contact_number,
+                     minimum_quantity, payment_terms FROM buyer_connections
+                     WHERE active=1 AND district=?'''
+
+INSERT_BUYER_COMMODITY = "INSERT OR IGNORE INTO buyer_commodities (buyer_id, commodity) VALUES (?, ?)"
+
+_MANUAL_PRICES = '''SELECT district, market_name, commodity, min_price, max_price, modal_price,
+                    arrival_quantity, price_date, updated_at
+                    FROM manual_market_prices
+                    WHERE price_date >= date('now', '-' || ? || ' days')'''
+
+UPSERT_PRICE_OBSERVATION = '''INSERT INTO price_observations
+                              (source, commodity, district, market, day,
+                               min_price, max_price, modal_price, arrivals)
+                              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                              ON CONFLICT(commodity, market, day, source) DO UPDATE SET
+                                  district = excluded.district, min_price = excluded.min_price,
+                                  max_price = excluded.max_price, modal_price = excluded.modal_price,
+                                  arrivals = excluded.arrivals, recorded_at = CURRENT_TIMESTAMP
+                              WHERE (district, min_price, max_price, modal_price, arrivals) IS NOT
+                                    (excluded.district, excluded.min_price, excluded.max_price,
+                                     excluded.modal_price, excluded.arrivals)'''
+
+RECENT_SOURCE_PRICES = '''SELECT market, day, min_price, max_price, modal_price, recorded_at
+                          FROM price_observations
+                          WHERE commodity=? AND source=? AND day >= date('now', '-' || ? || ' days')
+                          ORDER BY day DESC, market'''
+
+STAGE_ADVISORY = '''SELECT advisory, generated_at FROM stage_advisories
+                    WHERE crop=? AND stage=? AND district=?'''
+
+DISTRICT_DAILY_PRICES = '''SELECT day, market, low, high, modal, arrivals FROM price_daily
+                           WHERE commodity=? AND district=? AND day >= date('now', '-' || ? || ' days')
+                           ORDER BY day'''
+
+MARKET_WEEKLY_PRICES = '''SELECT week_start, open, high, low, close, modal FROM price_weekly
+                          WHERE commodity=? AND market=? AND week_start >= date('now', '-' || ? || ' days')
+                          ORDER BY week_start'''
+
+LATEST_DISTRICT_PRICE = '''SELECT day, market, low, high, modal FROM price_daily
+                           WHERE commodity=? AND district=? ORDER BY day DESC LIMIT 1'''
+
+LATEST_PRICE = '''SELECT day, market, low, high, modal FROM price_daily
+                  WHERE commodity=? ORDER BY day DESC LIMIT 1'''
+
+SEARCH_PEST_REPORTS = '''SELECT p.crop_name, p.pest_disease, p.severity, p.description,
+                                p.recommended_action, p.alert_date, p.district
+                         FROM pest_alerts_fts JOIN pest_alerts p ON p.id = pest_alerts_fts.rowid
+                         WHERE pest_alerts_fts MATCH ?
+                           AND p.alert_date >= date('now', '-' || ? || ' days')
+                         ORDER BY bm25(pest_alerts_fts, 2.0, 5.0, 1.0, 1.0) LIMIT ?'''
+
+SEARCH_USER_ACTIVITIES = '''SELECT a.activity_type, a.crop_name, a.area_acres, a.activity_data, a.created_at
+                            FROM activities_fts JOIN activities a ON a.id = activities_fts.rowid
+                            WHERE activities_fts MATCH ? AND a.user_id = ?
+                              AND a.created_at >= datetime('now', '-' || ? || ' days')
+                            ORDER BY bm25(activities_fts, 3.0, 2.0, 1.0) LIMIT ?'''
+
+SEARCH_USER_CROP_NOTES = '''SELECT c.crop_name, c.sowing_date, c.current_stage, c.health_status, c.notes
+                            FROM crop_notes_fts JOIN crop_tracking c ON c.id = crop_notes_fts.rowid
+                            WHERE crop_notes_fts MATCH ? AND c.user_id = ?
+                            ORDER BY bm25(crop_notes_fts, 2.0, 1.0) LIMIT ?'''
+
+# Searches default to the whole history when no "last N days" is given.
+ALL_TIME_DAYS = 36500
+
+_LAST_N_DAYS = re.compile(r"\b(?:last|past)\s+(\d+)\s+days?\b", re.IGNORECASE)
+_SEARCH_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_search(text):
+    """Turn free text into ``(fts5 match expression, days)``.
+
+    Every word must match (as a prefix, so "whitefl" finds "whitefly"); a
+    phrase like "last 30 days" becomes the date window instead of a term.
+    Words go in as quoted FTS5 strings, so quotes, ``-``, ``*`` or NEAR/OR
+    typed by the user are never read as query syntax. Returns
+    ``(None, days)`` when nothing searchable is left.
+    """
+    days = ALL_TIME_DAYS
+    window = _LAST_N_DAYS.search(text)
+    if window:
+        days = int(window.group(1))
+        text = text[:window.start()] + " " + text[window.end():]
+    terms = _SEARCH_TERM.findall(text)
+    if not terms:
+        return None, days
+    return " ".join(_fts_prefix(term) for term in terms), days
+
+
+def _fts_prefix(term):
+    """``term`` as an FTS5 prefix query; embedded double quotes are doubled"""
+    return '"' + term.replace('"', '""') + '"*'
+
+# History reads over a date range. ``{table}`` is the hot table, or the
+# ``<table>_all`` view (hot UNION ALL archive) from tiering.attach() when the
+# range reaches past the hot cutoff.
+_ACTIVITY_RANGE = '''SELECT activity_type, crop_name, area_acres, activity_data, created_at
+                     FROM {table} WHERE user_id=? AND created_at >= ? AND created_at < date(?, '+1 day')
+                     ORDER BY created_at DESC LIMIT ?'''
+
+_PEST_ALERT_RANGE = '''SELECT crop_name, pest_disease, severity, description, recommended_action, alert_date
+                       FROM {table} WHERE district=? AND alert_date >= ? AND alert_date <= ?
+                       ORDER BY alert_date DESC LIMIT ?'''
+
+
+def activity_range(include_archive=False):
+    return _ACTIVITY_RANGE.format(table="activities_all" if include_archive else "activities")
+
+
+def pest_alert_range(include_archive=False):
+    return _PEST_ALERT_RANGE.format(table="pest_alerts_all" if include_archive else "pest_alerts")
+
+
+def district_buyers(commodities=()):
+    """Active buyers in a district, optionally interested in any of ``commodities``.
+
+    Parameters are (district, *commodities).
+    """
+    if not commodities:
+        return DISTRICT_BUYERS
+    placeholders = ", ".join("?" * len(commodities))
+    return DISTRICT_BUYERS + (" AND id IN (SELECT buyer_id FROM buyer_commodities "
+                              f"WHERE commodity IN ({placeholders}))")
+
+
+def manual_prices(commodity=None, district=None):
+    """Build the manual price lookup; parameters are (days[, commodity][, district])"""
+    sql = _MANUAL_PRICES
+    if commodity:
+        sql += " AND commodity = ?"
+    if district:
+        sql += " AND district = ?"
+    return sql + " ORDER BY price_date DESC"
+
+
+# (name, sql, sample parameters) for every query above.
+PLAN_CHECKS = [
+    ("login", LOGIN_USER, ("farmer", "0" * 64)),
+    ("user stats", USER_STATS, (1,)),
+    ("user activities", USER_ACTIVITIES, (1, 10)),
+    ("user recent crops", USER_RECENT_CROPS, (1,)),
+    ("user crops", USER_CROPS, (1,)),
+    ("user crop summary", USER_CROP_SUMMARY, (1,)),
+    ("upcoming irrigation", USER_UPCOMING_IRRIGATION, (1,)),
+    ("financial records", USER_FINANCIAL_RECORDS, (1,)),
+    ("financial rollups", USER_FINANCIAL_ROLLUPS, (1,)),
+    ("price alerts", USER_PRICE_ALERTS, (1,)),
+    ("district pest alerts", DISTRICT_PEST_ALERTS, ("Pune",)),
+    ("available equipment", AVAILABLE_EQUIPMENT, ("Pune", "Tractor")),
+    ("district buyers", DISTRICT_BUYERS, ("Pune",)),
+    ("district buyers by commodity", district_buyers(["Onion", "Rice"]), ("Pune", "Onion", "Rice")),
+    ("district daily prices", DISTRICT_DAILY_PRICES, ("Onion", "Nashik", 90)),
+    ("market weekly prices", MARKET_WEEKLY_PRICES, ("Onion", "Lasalgaon APMC", 180)),
+    ("latest district price", LATEST_DISTRICT_PRICE, ("Onion", "Nashik")),
+    ("latest price", LATEST_PRICE, ("Onion",)),
+    ("recent prices from one source", RECENT_SOURCE_PRICES, ("Onion", "ceda", 14)),
+    ("stage advisory", STAGE_ADVISORY, ("Onion", "Bulb Development", "Nashik")),
+    ("search pest reports", SEARCH_PEST_REPORTS, ('"whitefly"*', 30, 20)),
+    ("search user activities", SEARCH_USER_ACTIVITIES, ('"irrigation"*', 1, ALL_TIME_DAYS, 20)),
+    ("search user crop notes", SEARCH_USER_CROP_NOTES, ('"yellow"*', 1, 20)),
+    ("activity history", activity_range(), (1, "2026-01-01", "2026-02-01", 500)),
+    ("pest alert history", pest_alert_range(), ("Pune", "2026-01-01", "2026-02-01", 100)),
+    ("manual prices by commodity", manual_prices("Onion"), (30, "Onion")),
+    ("manual prices by commodity and district", manual_prices("Onion", "Pune"), (30, "Onion", "Pune")),
+]
+
+# Same, for the hot+archive views; needs tiering.attach() on the connection.
+ARCHIVE_PLAN_CHECKS = [
+    ("activity history with archive", activity_range(True), (1, "2024-01-01", "2026-01-01", 500)),
+    ("pest alert history with archive", pest_alert_range(True), ("Pune", "2024-01-01", "2026-01-01", 100)),
+]
+
+# A full scan, unless it is an FTS5 table answering a MATCH ("INDEX n:M...").
+_TABLE_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)\w+(?!\w)(?! VIRTUAL TABLE INDEX \d+:M)")
+
+
+def table_scans(conn, sql, params=()):
+    """Return the EXPLAIN QUERY PLAN lines that scan a whole table or index"""
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [row[3] for row in plan if _TABLE_SCAN.match(row[3])]
+
+
+def check_query_plans(conn, checks=None):
+    """Return ``(name, plan detail)`` for every registered query that scans"""
+    failures = []
+    for name, sql, params in checks or PLAN_CHECKS:
+        for detail in table_scans(conn, sql, params):
+            failures.append((name, detail))
+    return failures
+
+
+if __name__ == "__main__":
+    import db
+    import tiering
+
+    conn = sqlite3.connect(sys.argv[1] if len(sys.argv) > 1 else ":memory:")
+    db.migrate(conn)
+    tiering.attach(conn, ":memory:")
+    checks = PLAN_CHECKS + ARCHIVE_PLAN_CHECKS
+    failures = check_query_plans(conn, checks)
+    for name, detail in failures:
+        print(f"FAIL {name}: {detail}")
+    print(f"{len(checks) - len({name for name, _ in failures})}/{len(checks)} queries use an index")
+    sys.exit(1 if failures else 0)
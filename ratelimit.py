@@ -0,0 +1,70 @@
+"""Token-bucket rate limiting for outbound requests, shared across processes.
+
+Bucket state lives in the ``rate_limits`` table, one row per key (an
+upstream host for scraping, ``ai-user:<id>`` for per-farmer AI budgets),
+so every session and every server process draws from the same budget. A
+request takes a token with a single UPSERT; when the bucket is empty the
+token is borrowed against the refill and the caller sleeps only for its own
+place in line. Callers under budget never sleep.
+"""
+import os
+import time
+from urllib.parse import urlsplit
+
+import db
+
+# Sustained requests per second and burst size, per host.
+DEFAULT_RATE = float(os.environ.get("KRISHIMITRA_SCRAPE_RATE", "0.5"))
+DEFAULT_BURST = int(os.environ.get("KRISHIMITRA_SCRAPE_BURST", "2"))
+HOST_LIMITS = {}
+
+# Give up rather than block a page for longer than this.
+MAX_WAIT = 10.0
+
+_TAKE = '''INSERT INTO rate_limits (host, tokens, updated_at) VALUES (?, ? - 1, ?)
+           ON CONFLICT(host) DO UPDATE SET
+               tokens = MIN(?, tokens + (excluded.updated_at - updated_at) * ?) - 1,
+               updated_at = excluded.updated_at
+           RETURNING tokens'''
+
+_REFUND = "UPDATE rate_limits SET tokens = tokens + 1 WHERE host = ?"
+
+
+class RateLimited(Exception):
+    """The host's budget is exhausted for longer than the caller is willing to wait"""
+
+
+def host_of(url):
+    return urlsplit(url).hostname or url
+
+
+def limits_for(host):
+    return HOST_LIMITS.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+
+
+def reserve(host, limits=None):
+    """Take a token for ``host`` and return how long to wait before using it"""
+    rate, burst = limits or limits_for(host)
+    with db.connection() as conn:
+        tokens = conn.execute(_TAKE, (host, burst, time.time(), burst, rate)).fetchone()[0]
+    return 0.0 if tokens >= 0 else -tokens / rate
+
+
+def refund(host):
+    with db.connection() as conn:
+        conn.execute(_REFUND, (host,))
+
+
+def acquire_key(key, limits=None, max_wait=MAX_WAIT):
+    """Block until ``key`` is within its ``(rate, burst)`` budget; raises RateLimited"""
+    wait = reserve(key, limits)
+    if wait > max_wait:
+        refund(key)
+        raise RateLimited(f"{key} is rate limited for another {wait:.0f}s")
+    if wait:
+        time.sleep(wait)
+
+
+def acquire(url, max_wait=MAX_WAIT):
+    """Block until a request to ``url``'s host is within budget; raises RateLimited"""
+    acquire_key(host_of(url), max_wait=max_wait)
@@ -0,0 +1,110 @@
+"""Estimated mandi prices used when no observed prices are available.
+
+Prices come from the crop's ``market_price_range`` in ``CROP_DATABASE``
+scaled by a per-(day, mandi) variation of -10%..+9%. The variation is a
+stable hash (blake2b of the mandi name mixed with the day number), so every
+process and every run shows the same estimate for the same day and mandi,
+and the whole grid is computed with NumPy in one pass.
+
+    python sample_prices.py Onion [--days 30] [--district Pune ...]
+"""
+import argparse
+import hashlib
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from agri_data import CROP_DATABASE, MANDIS, get_nearest_mandis
+
+SOURCE = "Estimated (Based on typical ranges)"
+DEFAULT_RANGE = (1000, 2000)
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+@lru_cache(maxsize=64)
+def base_range(commodity):
+    """(min, max) price from the crop's ``market_price_range``"""
+    price_range = CROP_DATABASE.get(commodity, {}).get("market_price_range", "")
+    prices = re.findall(r"\d+", price_range)
+    return (int(prices[0]), int(prices[1])) if len(prices) >= 2 else DEFAULT_RANGE
+
+
+@lru_cache(maxsize=1024)
+def _mandi_seed(mandi):
+    return int.from_bytes(hashlib.blake2b(mandi.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _mix(x):
+    """splitmix64 finalizer over a uint64 array"""
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9) & _MASK64
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB) & _MASK64
+        return x ^ (x >> np.uint64(31))
+
+
+def variation(days, mandis):
+    """Price multiplier for every (day, mandi) pair, shape (len(days), len(mandis))"""
+    ordinals = np.fromiter((d.toordinal() for d in days), dtype=np.uint64, count=len(days))
+    seeds = np.fromiter((_mandi_seed(m) for m in mandis), dtype=np.uint64, count=len(mandis))
+    mixed = _mix(_mix(ordinals)[:, None] ^ seeds[None, :])
+    return 1 + ((mixed % np.uint64(20)).astype(np.int16) - 10) / 100
+
+
+def _district_mandis(districts):
+    pairs = [(district, mandi) for district in districts for mandi in get_nearest_mandis(district)]
+    return [d for d, _ in pairs], [m for _, m in pairs]
+
+
+def generate_sample_prices(commodity, districts=None, days=7, end=None):
+    """Estimated daily prices for ``days`` days up to ``end`` (default today), newest first.
+
+    ``districts`` is one district, a list of them, or None for every district
+    with known mandis. Returns one row per (day, mandi) with integer prices
+    and a datetime ``date`` column.
+    """
+    if districts is None:
+        districts = list(MANDIS)
+    elif isinstance(districts, str):
+        districts = [districts]
+    end = end or date.today()
+    day_list = [end - timedelta(days=i) for i in range(days)]
+    district_col, mandis = _district_mandis(districts)
+
+    factor = variation(day_list, mandis).ravel()
+    base_min, base_max = base_range(commodity)
+    min_price = np.rint(base_min * factor).astype(np.int32)
+    max_price = np.rint(base_max * factor).astype(np.int32)
+    modal_price = ((min_price + max_price) // 2).astype(np.int32)
+
+    return pd.DataFrame({
+        "commodity": _constant(commodity, factor.size),
+        "district": _tiled(district_col, len(day_list)),
+        "market": _tiled(mandis, len(day_list)),
+        "min_price": min_price,
+        "max_price": max_price,
+        "modal_price": modal_price,
+        "date": np.repeat(pd.to_datetime(day_list).values.astype("datetime64[ns]"), len(mandis)),
+        "source": _constant(SOURCE, factor.size),
+    })
+
+
+def _constant(value, size):
+    return pd.Categorical.from_codes(np.zeros(size, dtype=np.int8), [value])
+
+
+def _tiled(values, reps):
+    categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+    return pd.Categorical.from_codes(np.tile(codes, reps), categories)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print estimated mandi prices")
+    parser.add_argument("commodity", choices=sorted(CROP_DATABASE))
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--district", action="append", help="repeatable; default every district")
+    args = parser.parse_args()
+    print(generate_sample_prices(args.commodity, args.district, args.days).to_string(index=False))
@@ -3,12 +3,26 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import requests
 import json
 import sqlite3
 import hashlib
-import re
-from bs4 import BeautifulSoup
+import db
+import queries
+import writer
+import tiering
+import ingest
+import ceda
+import ai_cache
+import ai_metrics
+import ai_prompts
+import ai_gateway
+import advisories
+import breaker
+import ratelimit
+import http_client
+import price_import
+from sample_prices import generate_sample_prices
+from agri_data import CROP_DATABASE, GOVERNMENT_SCHEMES, MAHARASHTRA_LOCATIONS, get_nearest_mandis
 import time
 
 # Page configuration
@@ -406,287 +420,6 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# CEDA Integration
-CEDA_BASE_URL = "https://ceda.ashoka.edu.in"
-
-CEDA_COMMODITY_MAP = {
-    "Rice": ["rice", "paddy", "basmati"],
-    "Wheat": ["wheat"],
-    "Cotton": ["cotton"],
-    "Maize": ["maize", "corn"],
-    "Tomato": ["tomato"],
-    "Potato": ["potato"],
-    "Onion": ["onion"],
-    "Soybean": ["soybean", "soya"],
-    "Groundnut": ["groundnut", "peanut"],
-    "Pomegranate": ["pomegranate"],
-    "Chilli": ["chilli", "chili", "green chilli"],
-    "Sugarcane": ["sugarcane", "sugar cane"]
-}
-
-def fetch_ceda_prices(commodity, state="Maharashtra", district=None):
-    """Fetch agricultural prices from CEDA Ashoka University"""
-    try:
-        time.sleep(2)
-        headers = {
-            'User-Agent': 'KrishiMitra/1.0 (Educational; Non-commercial; Agricultural Price Research)',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        }
-        
-        potential_urls = [
-            f"{CEDA_BASE_URL}/data/agricultural-prices",
-            f"{CEDA_BASE_URL}/data/agriculture",
-            f"{CEDA_BASE_URL}/agriculture",
-        ]
-        
-        commodity_keywords = CEDA_COMMODITY_MAP.get(commodity, [commodity.lower()])
-        
-        for search_url in potential_urls:
-            try:
-                response = requests.get(search_url, headers=headers, timeout=15)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    price_data = []
-                    
-                    tables = soup.find_all('table')
-                    
-                    for table in tables:
-                        rows = table.find_all('tr')
-                        if len(rows) > 1:
-                            for row in rows[1:]:
-                                cols = row.find_all('td')
-                                if len(cols) >= 4:
-                                    item_name = cols[0].get_text(strip=True).lower()
-                                    if any(keyword in item_name for keyword in commodity_keywords):
-                                        try:
-                                            price_data.append({
-                                                'commodity': cols[0].get_text(strip=True),
-                                                'market': cols[1].get_text(strip=True) if len(cols) > 1 else 'N/A',
-                                                'price': cols[2].get_text(strip=True) if len(cols) > 2 else 'N/A',
-                                                'date': cols[3].get_text(strip=True) if len(cols) > 3 else 'N/A',
-                                                'source': 'CEDA Ashoka University'
-                                            })
-                                        except:
-                                            continue
-                    
-                    if price_data:
-                        df = pd.DataFrame(price_data)
-                        return df, "✅ Data retrieved from CEDA Ashoka University"
-            except:
-                continue
-        
-        return None, "CEDA data not accessible. The website structure may have changed or data is not publicly available."
-        
-    except requests.Timeout:
-        return None, "Request timeout. CEDA server may be slow or unavailable."
-    except requests.ConnectionError:
-        return None, "Connection error. Please check internet connectivity."
-    except Exception as e:
-        return None, f"Error accessing CEDA: {str(e)}"
-
-def generate_sample_prices(commodity, district):
-    """Generate realistic sample prices based on crop database and location"""
-    crop_info = CROP_DATABASE.get(commodity, {})
-    price_range = crop_info.get("market_price_range", "₹1000-2000/quintal")
-    
-    prices = re.findall(r'\d+', price_range)
-    if len(prices) >= 2:
-        base_min = int(prices[0])
-        base_max = int(prices[1])
-    else:
-        base_min = 1000
-        base_max = 2000
-    
-    sample_data = []
-    mandis = get_nearest_mandis(district)
-    
-    for i in range(7):
-        date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-        for mandi in mandis[:3]:
-            variation = 1 + (hash(f"{date}{mandi}") % 20 - 10) / 100
-            min_price = int(base_min * variation)
-            max_price = int(base_max * variation)
-            modal_price = int((min_price + max_price) / 2)
-            
-            sample_data.append({
-                'commodity': commodity,
-                'market': mandi,
-                'min_price': min_price,
-                'max_price': max_price,
-                'modal_price': modal_price,
-                'date': date,
-                'source': 'Estimated (Based on typical ranges)'
-            })
-    
-    return pd.DataFrame(sample_data)
-
-# Maharashtra Locations
-MAHARASHTRA_LOCATIONS = {
-    "Pune": {
-        "tehsils": {
-            "Pune City": ["Shivajinagar", "Kothrud", "Hadapsar", "Yerawada", "Aundh", "Deccan", "Swargate", "Kasba Peth", "Bibwewadi", "Warje"],
-            "Haveli": ["Phursungi", "Manjri", "Uruli Kanchan", "Wagholi", "Lohegaon", "Undri", "Kondhwa", "Pisoli", "Uttamnagar"],
-            "Mulshi": ["Paud", "Pirangut", "Lavale", "Mulshi", "Tamhini", "Valvan", "Donaje", "Kolwan"],
-            "Maval": ["Talegaon", "Vadgaon Maval", "Kamshet", "Lonavala", "Khandala", "Karla", "Bhaje", "Uksan"],
-            "Bhor": ["Bhor", "Nasrapur", "Yavat", "Khandas", "Sangvi", "Randullabad"],
-            "Velhe": ["Velhe", "Shindawane", "Kenjal", "Garade", "Pabe", "Shirgaon"],
-            "Purandhar": ["Saswad", "Jejuri", "Pargaon", "Narayanpur", "Dive", "Bopdev", "Nimgaon Ketki"],
-            "Baramati": ["Baramati", "Morgaon", "Bhigwan", "Kurkumbh", "Malad", "Supe", "Nira"],
-            "Indapur": ["Indapur", "Akluj", "Nimgaon Ketki", "Bhigwan", "Karkamb", "Walchandnagar"],
-            "Daund": ["Daund", "Kurkundi", "Yevat", "Patas", "Ranjangaon", "Loni Kalbhor", "Supa"],
-            "Shirur": ["Shirur", "Shikrapur", "Kendal", "Pabal", "Talegaon Dhamdhere", "Ranjangaon Ganpati", "Nhavara"],
-            "Khed": ["Rajgurunagar", "Chakan", "Manchar", "Kusgaon", "Alandi", "Ranjangaon", "Kendal"],
-            "Junnar": ["Junnar", "Narayangaon", "Otur", "Alephata", "Manchar", "Wadgaon", "Pimpri"],
-            "Ambegaon": ["Ghodegaon", "Manchar", "Pargaon", "Bhigwan", "Jeur", "Kalamb", "Shirur"]
-        }
-    },
-    "Mumbai Suburban": {
-        "tehsils": {
-            "Kurla": ["Kurla East", "Kurla West", "Chunabhatti", "Tilak Nagar", "Ghatkopar", "Chembur"],
-            "Andheri": ["Andheri East", "Andheri West", "Jogeshwari", "Vile Parle", "Santacruz", "Goregaon"],
-            "Borivali": ["Borivali East", "Borivali West", "Kandivali", "Malad", "Dahisar", "Mira Road"]
-        }
-    },
-    "Nagpur": {
-        "tehsils": {
-            "Nagpur Urban": ["Dharampeth", "Sadar", "Hingna", "Nandanvan", "Civil Lines", "Sitabuldi"],
-            "Nagpur Rural": ["Kalmeshwar", "Kamptee", "Ramtek", "Parseoni", "Mouda", "Kuhi"],
-            "Umred": ["Umred", "Khapa", "Bhiwapur", "Kuhi"],
-            "Kalameshwar": ["Kalameshwar", "Mouza", "Parseoni", "Savner", "Hinganghat"]
-        }
-    },
-    "Nashik": {
-        "tehsils": {
-            "Nashik": ["Nashik Road", "Panchavati", "Satpur", "Deolali", "College Road", "Cidco"],
-            "Igatpuri": ["Igatpuri", "Ghoti", "Trimbakeshwar", "Peth"],
-            "Sinnar": ["Sinnar", "Malegaon", "Nandgaon", "Manmad"],
-            "Niphad": ["Niphad", "Dindori", "Vani"],
-            "Dindori": ["Dindori", "Peth", "Mohadi"],
-            "Kalwan": ["Kalwan", "Satana", "Surgana"],
-            "Yeola": ["Yeola", "Nandgaon"],
-            "Chandwad": ["Chandwad", "Malegaon Camp"],
-            "Surgana": ["Surgana", "Peth", "Trimbak"],
-            "Peint": ["Peint", "Deola"],
-            "Trimbakeshwar": ["Trimbak", "Anjaneri", "Nimon"],
-            "Baglan": ["Satana", "Malegaon", "Kalwan"],
-            "Malegaon": ["Malegaon City", "Malegaon Camp", "Nandgaon"],
-            "Nandgaon": ["Nandgaon", "Vani", "Malegaon"],
-            "Satana": ["Satana", "Dindori", "Kalwan"]
-        }
-    },
-    "Thane": {
-        "tehsils": {
-            "Thane": ["Naupada", "Kopri", "Vartak Nagar", "Wagle Estate", "Ghodbunder", "Majiwada"],
-            "Kalyan": ["Kalyan East", "Kalyan West", "Dombivli East", "Dombivli West", "Titwala", "Ambernath"],
-            "Bhiwandi": ["Bhiwandi", "Nizampur", "Anjur", "Padgha"],
-            "Shahapur": ["Shahapur", "Asangaon", "Atgaon", "Vashind", "Tokawade"],
-            "Ulhasnagar": ["Ulhasnagar 1", "Ulhasnagar 2", "Ulhasnagar 3", "Ulhasnagar 4", "Ulhasnagar 5"],
-            "Murbad": ["Murbad", "Khardi", "Tokawade"],
-            "Dahanu": ["Dahanu", "Bordi", "Kasa"],
-            "Palghar": ["Palghar", "Vasai", "Virar"],
-            "Jawhar": ["Jawhar", "Mokhada"],
-            "Mokhada": ["Mokhada", "Vikramgad"],
-            "Talasari": ["Talasari", "Dahanu"],
-            "Vikramgad": ["Vikramgad", "Jawhar"],
-            "Vasai": ["Vasai East", "Vasai West", "Nala Sopara"],
-            "Wada": ["Wada", "Vikramgad"]
-        }
-    },
-    "Aurangabad": {
-        "tehsils": {
-            "Aurangabad": ["Aurangabad City", "Paithan", "Gangapur", "Vaijapur"],
-            "Paithan": ["Paithan", "Gangapur", "Phulambri"],
-            "Gangapur": ["Gangapur", "Vaijapur"],
-            "Vaijapur": ["Vaijapur", "Harsul"],
-            "Kannad": ["Kannad", "Phulambri"],
-            "Sillod": ["Sillod", "Phulambri"],
-            "Phulambri": ["Phulambri", "Khultabad"],
-            "Khultabad": ["Khultabad", "Vaijapur"],
-            "Soegaon": ["Soegaon", "Sillod"]
-        }
-    },
-    "Solapur": {
-        "tehsils": {
-            "Solapur North": ["Solapur City", "Barshi", "Karmala"],
-            "Solapur South": ["Solapur South", "Mohol", "Malshiras"],
-            "Barshi": ["Barshi", "Karmala"],
-            "Karmala": ["Karmala", "Madha"],
-            "Madha": ["Madha", "Karmala"],
-            "Mohol": ["Mohol", "Pandharpur"],
-            "Pandharpur": ["Pandharpur", "Malshiras"],
-            "Malshiras": ["Malshiras", "Sangole"],
-            "Sangole": ["Sangole", "Pandharpur"],
-            "Mangalvedhe": ["Mangalvedhe", "Barshi"],
-            "Akkalkot": ["Akkalkot", "Solapur South"]
-        }
-    },
-    "Kolhapur": {
-        "tehsils": {
-            "Kolhapur": ["Kolhapur City", "Karveer", "Panhala", "Hatkanangle"],
-            "Karveer": ["Kolhapur", "Shirol"],
-            "Panhala": ["Panhala", "Shahuwadi"],
-            "Shahuwadi": ["Shahuwadi", "Bavda"],
-            "Hatkanangle": ["Hatkanangle", "Nesari"],
-            "Shirol": ["Shirol", "Kurundwad"],
-            "Radhanagari": ["Radhanagari", "Gaganbawda"],
-            "Kagal": ["Kagal", "Hatkanangle"],
-            "Bhudargad": ["Bhudargad", "Ajra"],
-            "Ajra": ["Ajra", "Gadhinglaj"],
-            "Gadhinglaj": ["Gadhinglaj", "Chandgad"],
-            "Chandgad": ["Chandgad", "Bhudargad"]
-        }
-    },
-    "Ahmednagar": {
-        "tehsils": {
-            "Ahmednagar": ["Ahmednagar City", "Nagar", "Shevgaon"],
-            "Nagar": ["Nagar", "Rahuri"],
-            "Shrigonda": ["Shrigonda", "Parner", "Karjat"],  # HERE IT IS!
-            "Parner": ["Parner", "Shrigonda"],
-            "Sangamner": ["Sangamner", "Akole", "Kopargaon"],
-            "Kopargaon": ["Kopargaon", "Shrirampur"],
-            "Rahuri": ["Rahuri", "Nevasa"],
-            "Nevasa": ["Nevasa", "Pathardi"],
-            "Pathardi": ["Pathardi", "Shrigonda"],
-            "Akole": ["Akole", "Sangamner"],
-            "Shevgaon": ["Shevgaon", "Karjat"],
-            "Karjat": ["Karjat", "Jamkhed"],
-            "Jamkhed": ["Jamkhed", "Karjat"],
-            "Shrirampur": ["Shrirampur", "Kopargaon"],
-            "Rahata": ["Rahata", "Shrirampur"]
-        }
-    },
-    "Satara": {
-        "tehsils": {
-            "Satara": ["Satara City", "Karad", "Koregaon", "Phaltan"],
-            "Karad": ["Karad", "Patan"],
-            "Koregaon": ["Koregaon", "Satara"],
-            "Phaltan": ["Phaltan", "Lonand"],
-            "Wai": ["Wai", "Mahabaleshwar"],
-            "Mahabaleshwar": ["Mahabaleshwar", "Panchgani"],
-            "Patan": ["Patan", "Khandala"],
-            "Khandala": ["Khandala", "Satara"],
-            "Jaoli": ["Jaoli", "Koregaon"],
-            "Khatav": ["Khatav", "Phaltan"],
-            "Maan": ["Maan", "Khatav"]
-        }
-    },
-    "Sangli": {
-        "tehsils": {
-            "Sangli": ["Sangli City", "Miraj", "Tasgaon", "Jat"],
-            "Miraj": ["Miraj", "Kavathe Mahankal"],
-            "Tasgaon": ["Tasgaon", "Kavalapur"],
-            "Jat": ["Jat", "Khanapur"],
-            "Walwa": ["Walwa", "Islampur"],
-            "Khanapur": ["Khanapur", "Atpadi"],
-            "Atpadi": ["Atpadi", "Palus"],
-            "Palus": ["Palus", "Kavalapur"],
-            "Kavalapur": ["Kavalapur", "Tasgaon"],
-            "Shirala": ["Shirala", "Walwa"]
-        }
-    }
-}
-
 # Initialize session state
 if 'user_data' not in st.session_state:
     st.session_state.user_data = None
@@ -703,515 +436,7 @@ if 'price_alerts' not in st.session_state:
 if 'crop_tracking' not in st.session_state:
     st.session_state.crop_tracking = []
 
-# Crop Database with ALL original details
-CROP_DATABASE = {
-    "Rice": {
-        "seed_rate_kg_per_acre": "10-12",
-        "spacing": "20cm x 15cm",
-        "water_requirement": "485-607 mm",
-        "duration_days": "120-150",
-        "expected_yield_tons": "1.6-2.4",
-        "best_season": "Kharif (June-October)",
-        "soil_type": "Clay loam, silt loam",
-        "market_price_range": "₹2000-2800/quintal",
-        "msp_2024": "₹2183/quintal",
-        "insurance_premium_percent": "2.0",
-        "critical_growth_stages": [
-            {"stage": "Germination", "days": "0-10", "water_need": "High", "nutrients": "Minimal"},
-            {"stage": "Tillering", "days": "15-40", "water_need": "Medium", "nutrients": "High N"},
-            {"stage": "Panicle Initiation", "days": "45-65", "water_need": "Critical", "nutrients": "Balanced NPK"},
-            {"stage": "Flowering", "days": "70-90", "water_need": "High", "nutrients": "Low N, High K"},
-            {"stage": "Grain Filling", "days": "95-120", "water_need": "Medium", "nutrients": "K only"}
-        ],
-        "detailed_practices": {
-            "land_preparation": [
-                "First plowing: Deep plowing to 20-25 cm depth after monsoon onset",
-                "Puddle the field 2-3 times with 5 cm water standing",
-                "Level the field properly for uniform water distribution",
-                "Create 30 cm height bunds to retain water",
-                "Apply decomposed FYM 2 weeks before transplanting"
-            ],
-            "nursery_management": [
-                "Seed treatment: Soak seeds in water for 24 hours, incubate for 48 hours",
-                "Prepare raised nursery bed of 1m width, 10m length, 15cm height",
-                "Apply 2 kg Urea, 4 kg SSP per 100 sq.m nursery",
-                "Sow pre-germinated seeds @ 20-25 kg per hectare",
-                "Maintain 2-3 cm water in nursery after 3 days of sowing"
-            ],
-            "transplanting": [
-                "Transplant 21-25 days old seedlings (3-4 leaf stage)",
-                "Plant 2-3 seedlings per hill at 20x15 cm spacing",
-                "Transplant at shallow depth (2-3 cm) for better tillering",
-                "Complete transplanting within 3-4 weeks for uniform maturity",
-                "Replant missing hills within 7 days"
-            ]
-        },
-        "chemical_fertilizers": {
-            "urea_kg": "65",
-            "dap_kg": "50",
-            "mop_kg": "20",
-            "total_npk": "48:24:16 kg/acre",
-            "application_schedule": [
-                "Basal: 50% N + 100% P + 100% K at transplanting",
-                "First top dressing: 25% N at tillering (21-25 days)",
-                "Second top dressing: 25% N at panicle initiation (40-45 days)"
-            ]
-        },
-        "organic_fertilizers": {
-            "fym_tons": "4-5",
-            "vermicompost_kg": "500-600",
-            "neem_cake_kg": "100",
-            "green_manure": "Dhaincha or Sunhemp - 8-10 kg/acre",
-            "biofertilizers": "Azospirillum + PSB @ 2 kg each per acre",
-        },
-        "common_pests": ["Stem Borer", "Brown Plant Hopper", "Leaf Folder"],
-        "common_diseases": ["Blast Disease", "Sheath Blight", "Bacterial Leaf Blight"],
-        "rotation_crops": ["Wheat", "Chickpea", "Mustard"],
-        "intercrop_options": ["None (flooded conditions)"],
-        "export_potential": "Medium",
-        "storage_duration_months": "6-12",
-        "processing_options": ["Milling", "Parboiling", "Flaking"]
-    },
-    "Wheat": {
-        "seed_rate_kg_per_acre": "40-50",
-        "spacing": "20-23cm row spacing",
-        "water_requirement": "182-263 mm",
-        "duration_days": "110-130",
-        "expected_yield_tons": "1.6-2.0",
-        "best_season": "Rabi (November-March)",
-        "soil_type": "Loam to clay loam",
-        "market_price_range": "₹2000-2400/quintal",
-        "msp_2024": "₹2125/quintal",
-        "insurance_premium_percent": "1.5",
-        "critical_growth_stages": [
-            {"stage": "Crown Root Initiation", "days": "20-25", "water_need": "Critical", "nutrients": "High N"},
-            {"stage": "Tillering", "days": "30-50", "water_need": "Medium", "nutrients": "High N"},
-            {"stage": "Jointing", "days": "60-70", "water_need": "High", "nutrients": "Balanced NPK"},
-            {"stage": "Flowering", "days": "80-85", "water_need": "Critical", "nutrients": "Low N, High K"},
-            {"stage": "Grain Filling", "days": "95-110", "water_need": "Medium", "nutrients": "K only"}
-        ],
-        "chemical_fertilizers": {
-            "urea_kg": "87",
-            "dap_kg": "65",
-            "mop_kg": "17",
-            "total_npk": "48:24:16 kg/acre",
-            "application_schedule": [
-                "Basal: 50% N + 100% P + 100% K at sowing",
-                "First top dressing: 25% N at CRI (21 days)",
-                "Second top dressing: 25% N at tillering (45 days)"
-            ]
-        },
-        "organic_fertilizers": {
-            "fym_tons": "4-5",
-            "vermicompost_kg": "500-600",
-            "neem_cake_kg": "80-100",
-            "biofertilizers": "Azotobacter + PSB @ 2 kg each per acre",
-        },
-        "common_pests": ["Aphids", "Termites"],
-        "common_diseases": ["Yellow Rust", "Brown Rust", "Powdery Mildew"],
-        "rotation_crops": ["Rice", "Cotton", "Soybean"],
-        "intercrop_options": ["Chickpea", "Mustard"],
-        "export_potential": "Low",
-        "storage_duration_months": "6-9",
-        "processing_options": ["Flour milling", "Semolina", "Bread"]
-    },
-    "Cotton": {
-        "seed_rate_kg_per_acre": "5-6",
-        "spacing": "90cm x 60cm",
-        "water_requirement": "283-526 mm",
-        "duration_days": "150-180",
-        "expected_yield_tons": "0.8-1.2",
-        "best_season": "Kharif (May-June sowing)",
-        "soil_type": "Deep black cotton soil",
-        "market_price_range": "₹5500-7000/quintal",
-        "msp_2024": "₹6620/quintal",
-        "insurance_premium_percent": "2.0",
-        "critical_growth_stages": [
-            {"stage": "Germination", "days": "0-15", "water_need": "High", "nutrients": "Minimal"},
-            {"stage": "Square Formation", "days": "40-60", "water_need": "Critical", "nutrients": "High N"},
-            {"stage": "Flowering", "days": "70-100", "water_need": "Critical", "nutrients": "Balanced NPK"},
-            {"stage": "Boll Development", "days": "105-140", "water_need": "High", "nutrients": "High K"},
-            {"stage": "Boll Opening", "days": "145-180", "water_need": "Low", "nutrients": "Minimal"}
-        ],
-        "chemical_fertilizers": {
-            "urea_kg": "87",
-            "dap_kg": "65",
-            "mop_kg": "25",
-            "total_npk": "48:24:24 kg/acre",
-            "application_schedule": [
-                "Basal: 25% N + 100% P + 50% K at sowing",
-                "First: 25% N + 50% K at square formation (30-35 days)",
-                "Second: 25% N at flowering (60-65 days)",
-                "Third: 25% N at boll development (90-95 days)"
-            ]
-        },
-        "organic_fertilizers": {
-            "fym_tons": "5-6",
-            "vermicompost_kg": "800-1000",
-            "neem_cake_kg": "120-150",
-            "biofertilizers": "Azospirillum + PSB + KSB @ 2 kg each",
-        },
-        "common_pests": ["Pink Bollworm", "Whitefly", "Aphids"],
-        "common_diseases": ["Wilt", "Root Rot", "Leaf Spot"],
-        "rotation_crops": ["Wheat", "Chickpea", "Sorghum"],
-        "intercrop_options": ["Soybean", "Green gram"],
-        "export_potential": "High",
-        "storage_duration_months": "12",
-        "processing_options": ["Ginning", "Spinning", "Textile"]
-    },
-    "Tomato": {
-        "seed_rate_kg_per_acre": "80-100 grams",
-        "spacing": "60cm x 45cm",
-        "water_requirement": "243-324 mm",
-        "duration_days": "65-90",
-        "expected_yield_tons": "20-28",
-        "best_season": "Kharif, Rabi & Summer",
-        "soil_type": "Well-drained sandy loam",
-        "market_price_range": "₹800-2500/quintal",
-        "msp_2024": "Not applicable",
-        "insurance_premium_percent": "5.0",
-        "critical_growth_stages": [
-            {"stage": "Transplanting", "days": "0-10", "water_need": "High", "nutrients": "Minimal"},
-            {"stage": "Vegetative Growth", "days": "15-35", "water_need": "Medium", "nutrients": "High N"},
-            {"stage": "Flowering", "days": "40-55", "water_need": "Critical", "nutrients": "Balanced NPK + Ca"},
-            {"stage": "Fruit Setting", "days": "60-75", "water_need": "High", "nutrients": "High K + Ca"},
-            {"stage": "Fruit Development", "days": "80-90", "water_need": "Medium", "nutrients": "High K"}
-        ],
-        "chemical_fertilizers": {
-            "urea_kg": "108",
-            "dap_kg": "109",
-            "mop_kg": "33",
-            "total_npk": "60:40:40 kg/acre",
-            "application_schedule": [
-                "Basal: 50% N + 100% P + 50% K at transplanting",
-                "30 days: 25% N + 25% K",
-                "60 days: 25% N + 25% K"
-            ]
-        },
-        "organic_fertilizers": {
-            "fym_tons": "6-8",
-            "vermicompost_kg": "800-1000",
-            "neem_cake_kg": "100-120",
-            "biofertilizers": "Azotobacter + PSB @ 2 kg each",
-        },
-        "common_pests": ["Fruit Borer", "Whitefly", "Leaf Miner"],
-        "common_diseases": ["Early Blight", "Late Blight", "Wilt", "Leaf Curl Virus"],
-        "rotation_crops": ["Cabbage", "Cauliflower", "Onion"],
-        "intercrop_options": ["Coriander", "Fenugreek"],
-        "export_potential": "Medium",
-        "storage_duration_months": "0.5-1",
-        "processing_options": ["Puree", "Ketchup", "Paste", "Drying"]
-    },
-    "Onion": {
-        "seed_rate_kg_per_acre": "3-4",
-        "spacing": "15cm x 10cm",
-        "water_requirement": "182-283 mm",
-        "duration_days": "120-150",
-        "expected_yield_tons": "10-16",
-        "best_season": "Kharif, Late Kharif, Rabi",
-        "soil_type": "Well-drained loamy soil",
-        "market_price_range": "₹1000-3500/quintal",
-        "msp_2024": "Not applicable",
-        "insurance_premium_percent": "5.0",
-        "critical_growth_stages": [
-            {"stage": "Transplanting", "days": "0-10", "water_need": "High", "nutrients": "Minimal"},
-            {"stage": "Vegetative Growth", "days": "15-50", "water_need": "Medium", "nutrients": "High N"},
-            {"stage": "Bulb Initiation", "days": "60-90", "water_need": "Critical", "nutrients": "Balanced NPK"},
-            {"stage": "Bulb Development", "days": "100-130", "water_need": "Medium", "nutrients": "High K"},
-            {"stage": "Maturity", "days": "140-150", "water_need": "Stop", "nutrients": "None"}
-        ],
-        "chemical_fertilizers": {
-            "urea_kg": "72",
-            "dap_kg": "54",
-            "mop_kg": "17",
-            "total_npk": "40:20:20 kg/acre",
-            "application_schedule": [
-                "Basal: 50% N + 100% P + 50% K at transplanting",
-                "30 days: 25% N + 25% K",
-                "60 days: 25% N + 25% K"
-            ]
-        },
-        "organic_fertilizers": {
-            "fym_tons": "4-5",
-            "vermicompost_kg": "600-800",
-            "neem_cake_kg": "80-100",
-            "biofertilizers": "Azospirillum + PSB @ 2 kg each"
-        },
-        "common_pests": ["Thrips", "Onion Maggot"],
-        "common_diseases": ["Purple Blotch", "Stemphylium Blight", "Basal Rot"],
-        "rotation_crops": ["Wheat", "Cabbage", "Tomato"],
-        "intercrop_options": ["Not recommended"],
-        "export_potential": "High",
-        "storage_duration_months": "3-6",
-        "processing_options": ["Dehydration", "Powder", "Flakes"]
-    },
-    "Sugarcane": {
-    "seed_rate_kg_per_acre": "3000-4000 setts (3 budded)",
-    "spacing": "90cm x 60cm (furrow to furrow)",
-    "water_requirement": "607-850 mm",
-    "duration_days": "300-365",
-    "expected_yield_tons": "40-60",
-    "best_season": "Year-round (Main: Feb-March, Oct-Nov)",
-    "soil_type": "Deep, well-drained loamy soil",
-    "market_price_range": "₹2800-3500/ton",
-    "msp_2024": "₹3150/ton",
-    "insurance_premium_percent": "2.0",
-    "critical_growth_stages": [
-        {"stage": "Germination", "days": "0-30", "water_need": "High", "nutrients": "Minimal"},
-        {"stage": "Tillering/Grand Growth", "days": "60-120", "water_need": "Critical", "nutrients": "High N"},
-        {"stage": "Formation", "days": "150-240", "water_need": "Critical", "nutrients": "Balanced NPK"},
-        {"stage": "Maturation", "days": "270-330", "water_need": "Medium", "nutrients": "High K"},
-        {"stage": "Ripening", "days": "335-365", "water_need": "Low", "nutrients": "Minimal"}
-    ],
-    "detailed_practices": {
-        "land_preparation": [
-            "Deep plowing 2-3 times to 30-45 cm depth",
-            "Prepare furrows at 90 cm spacing",
-            "Apply FYM 10-15 tons per acre 3-4 weeks before planting",
-            "Level the field properly for uniform water distribution",
-            "Make ridges and furrows for planting and irrigation"
-        ],
-        "sett_preparation": [
-            "Select healthy, disease-free canes of 8-10 months age",
-            "Cut into 3-budded setts (45-60 cm length)",
-            "Treat setts with fungicide (Carbendazim @ 2g/liter)",
-            "Dip setts in insecticide solution to prevent termite attack",
-            "Plant within 24 hours of cutting for best germination"
-        ],
-        "planting": [
-            "Plant during Feb-March (Adsali) or Oct-Nov (Suru)",
-            "Place setts end-to-end in furrows at 60 cm spacing",
-            "Cover setts with 5-8 cm soil",
-            "Apply light irrigation immediately after planting",
-            "Gap filling within 3-4 weeks with reserve setts"
-        ]
-    },
-    "chemical_fertilizers": {
-        "urea_kg": "260",
-        "dap_kg": "130",
-        "mop_kg": "65",
-        "total_npk": "140:60:60 kg/acre",
-        "application_schedule": [
-            "Basal: 25% N + 100% P + 50% K at planting",
-            "30 days: 25% N (earthing up)",
-            "60 days: 25% N + 25% K",
-            "90 days: 25% N + 25% K"
-        ]
-    },
-    "organic_fertilizers": {
-        "fym_tons": "10-15",
-        "vermicompost_kg": "1000-1500",
-        "neem_cake_kg": "200-250",
-        "green_manure": "Sunhemp or Dhaincha - intercrop in early stage",
-        "biofertilizers": "Azotobacter + PSB + Trichoderma @ 2 kg each per acre",
-    },
-    "common_pests": ["Early Shoot Borer", "Top Borer", "White Grub", "Termites", "Woolly Aphid"],
-    "common_diseases": ["Red Rot", "Smut", "Wilt", "Rust", "Grassy Shoot"],
-    "rotation_crops": ["Wheat", "Chickpea", "Soybean", "Onion"],
-    "intercrop_options": ["Potato", "Onion", "Garlic", "Cabbage", "Cauliflower (in early stage)"],
-    "export_potential": "Low (mainly domestic consumption)",
-    "storage_duration_months": "Harvest and crush immediately",
-    "processing_options": ["Sugar mills", "Jaggery (Gur)", "Khandsari", "Ethanol production"]
-    }
-    
-    
-}
-
-# Government Schemes Database - NEW ADDITION
-GOVERNMENT_SCHEMES = {
-    "PM-KISAN": {
-        "name": "Pradhan Mantri Kisan Samman Nidhi",
-        "benefit": "₹6000/year in 3 installments",
-        "eligibility": "All landholding farmers",
-        "how_to_apply": "Online at pmkisan.gov.in or through agriculture office",
-        "documents": ["Aadhaar", "Land records", "Bank account"],
-        "contact": "Toll-free: 155261 / 011-24300606"
-    },
-    "PMFBY": {
-        "name": "Pradhan Mantri Fasal Bima Yojana",
-        "benefit": "Crop insurance at subsidized premium",
-        "eligibility": "All farmers including sharecroppers",
-        "how_to_apply": "Through banks, CSCs, or insurance agents",
-        "documents": ["Land records", "Loan documents", "Bank account"],
-        "contact": "Toll-free: 1800-180-1551"
-    },
-    "KCC": {
-        "name": "Kisan Credit Card",
-        "benefit": "Credit up to ₹3 lakh at 4% interest",
-        "eligibility": "All farmers with land holdings",
-        "how_to_apply": "Any nationalized or cooperative bank",
-        "documents": ["Land records", "Identity proof", "Address proof"],
-        "contact": "Contact nearest bank branch"
-    },
-    "Soil_Health_Card": {
-        "name": "Soil Health Card Scheme",
-        "benefit": "Free soil testing every 2 years",
-        "eligibility": "All farmers",
-        "how_to_apply": "Through agriculture department",
-        "documents": ["Land records"],
-        "contact": "District Agriculture Office"
-    },
-    "PM_Kusum": {
-        "name": "PM-KUSUM (Solar Pumps)",
-        "benefit": "90% subsidy on solar pumps",
-        "eligibility": "Individual farmers and cooperatives",
-        "how_to_apply": "Through MNRE portal",
-        "documents": ["Land documents", "Electricity connection"],
-        "contact": "State Nodal Agency"
-    }
-}
-
 # Database Functions
-def init_database():
-    """Initialize comprehensive SQLite database"""
-    conn = sqlite3.connect('krishimitra.db', check_same_thread=False)
-    c = conn.cursor()
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  username TEXT UNIQUE NOT NULL,
-                  password_hash TEXT NOT NULL,
-                  full_name TEXT NOT NULL,
-                  mobile TEXT NOT NULL,
-                  email TEXT,
-                  district TEXT,
-                  tehsil TEXT,
-                  village TEXT,
-                  farm_size_acres REAL,
-                  user_type TEXT DEFAULT 'Farmer',
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS activities
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_id INTEGER,
-                  activity_type TEXT,
-                  crop_name TEXT,
-                  area_acres REAL,
-                  activity_data TEXT,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS crop_tracking
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_id INTEGER,
-                  crop_name TEXT,
-                  area_acres REAL,
-                  sowing_date DATE,
-                  expected_harvest_date DATE,
-                  current_stage TEXT,
-                  days_after_sowing INTEGER,
-                  health_status TEXT,
-                  notes TEXT,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS price_alerts
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_id INTEGER,
-                  commodity TEXT,
-                  target_price REAL,
-                  alert_type TEXT,
-                  status TEXT DEFAULT 'Active',
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS irrigation_schedule
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_id INTEGER,
-                  crop_name TEXT,
-                  schedule_date DATE,
-                  water_amount REAL,
-                  completed BOOLEAN DEFAULT 0,
-                  notes TEXT,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS yield_predictions
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_id INTEGER,
-                  crop_name TEXT,
-                  area_acres REAL,
-                  predicted_yield REAL,
-                  confidence_level TEXT,
-                  factors TEXT,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS manual_market_prices
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  district TEXT,
-                  market_name TEXT,
-                  commodity TEXT,
-                  min_price REAL,
-                  max_price REAL,
-                  modal_price REAL,
-                  arrival_quantity TEXT,
-                  price_date DATE,
-                  updated_by INTEGER,
-                  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    # NEW TABLES FOR ENHANCED FEATURES
-    c.execute('''CREATE TABLE IF NOT EXISTS financial_records
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_id INTEGER,
-                  category TEXT,
-                  amount REAL,
-                  transaction_type TEXT,
-                  crop_related TEXT,
-                  transaction_date DATE,
-                  notes TEXT,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS equipment_rentals
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  equipment_type TEXT,
-                  provider_name TEXT,
-                  provider_contact TEXT,
-                  location TEXT,
-                  district TEXT,
-                  daily_rate REAL,
-                  hourly_rate REAL,
-                  availability TEXT,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS buyer_connections
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  buyer_name TEXT,
-                  buyer_type TEXT,
-                  commodities_interested TEXT,
-                  contact_number TEXT,
-                  email TEXT,
-                  district TEXT,
-                  minimum_quantity REAL,
-                  payment_terms TEXT,
-                  active BOOLEAN DEFAULT 1,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS weather_alerts
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_id INTEGER,
-                  alert_type TEXT,
-                  severity TEXT,
-                  message TEXT,
-                  issued_date DATE,
-                  valid_until DATE,
-                  acknowledged BOOLEAN DEFAULT 0,
-                  FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS pest_alerts
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  district TEXT,
-                  crop_name TEXT,
-                  pest_disease TEXT,
-                  severity TEXT,
-                  alert_date DATE,
-                  description TEXT,
-                  recommended_action TEXT)''')
-    
-    conn.commit()
-    conn.close()
-
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
@@ -1223,20 +448,14 @@ def create_user(username, password, full_name, mobile, email, district, tehsil,
         full_name = full_name.strip()
         mobile = mobile.strip()
         
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
         password_hash = hash_password(password)
-        c.execute('''INSERT INTO users (username, password_hash, full_name, mobile, email, 
+        user_id = db.execute('''INSERT INTO users (username, password_hash, full_name, mobile, email, 
                      district, tehsil, village, farm_size_acres, user_type)
                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
                   (username, password_hash, full_name, mobile, email, district, tehsil, village, farm_size, user_type))
-        conn.commit()
-        user_id = c.lastrowid
         
         # Verify the user was actually created
-        c.execute('SELECT username FROM users WHERE id=?', (user_id,))
-        verification = c.fetchone()
-        conn.close()
+        verification = db.query_one('SELECT username FROM users WHERE id=?', (user_id,))
         
         if verification:
             return True, user_id
@@ -1254,15 +473,9 @@ def authenticate_user(username, password):
         username = username.strip()
         password = password.strip()
         
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
         password_hash = hash_password(password)
         
-        c.execute('''SELECT id, username, full_name, mobile, email, district, tehsil, village, farm_size_acres, user_type
-                     FROM users WHERE username=? AND password_hash=?''',
-                  (username, password_hash))
-        user = c.fetchone()
-        conn.close()
+        user = db.query_one(queries.LOGIN_USER, (username, password_hash))
         
         if user:
             return {
@@ -1278,45 +491,106 @@ def authenticate_user(username, password):
 
 def log_activity(user_id, activity_type, crop_name, area_acres, activity_data):
     try:
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
-        c.execute('''INSERT INTO activities (user_id, activity_type, crop_name, area_acres, activity_data)
+        writer.submit('''INSERT INTO activities (user_id, activity_type, crop_name, area_acres, activity_data)
                      VALUES (?, ?, ?, ?, ?)''',
                   (user_id, activity_type, crop_name, area_acres, json.dumps(activity_data)))
-        conn.commit()
-        conn.close()
     except Exception as e:
         st.error(f"Error logging activity: {e}")
 
 def get_user_activities(user_id, limit=10):
-    conn = sqlite3.connect('krishimitra.db')
-    c = conn.cursor()
-    c.execute('''SELECT activity_type, crop_name, area_acres, activity_data, created_at
-                 FROM activities WHERE user_id=?
-                 ORDER BY created_at DESC LIMIT ?''',
-              (user_id, limit))
-    activities = c.fetchall()
-    conn.close()
-    return activities
+    return db.query(queries.USER_ACTIVITIES, (user_id, limit))
+
+def _history(table, build_sql, start, params):
+    """Read the hot table, or hot + archive when ``start`` is older than the archive watermark"""
+    if tiering.in_hot_tier(table, start):
+        return db.query(build_sql(), params)
+    return tiering.query_with_archive(build_sql(include_archive=True), params)
+
+def get_activity_history(user_id, start, end, limit=500):
+    return _history("activities", queries.activity_range, start, (user_id, str(start), str(end), limit))
+
+def get_pest_alert_history(district, start, end, limit=200):
+    return _history("pest_alerts", queries.pest_alert_range, start, (district, str(start), str(end), limit))
+
+def is_admin(user):
+    """Usernames listed under ``admin_users`` in secrets get the System Status page"""
+    try:
+        return user['username'] in st.secrets.get("admin_users", [])
+    except Exception:
+        return False
+
+def get_user_stats(user_id):
+    """Trigger-maintained per-user counters (one primary-key lookup)"""
+    row = db.query_one(queries.USER_STATS, (user_id,)) or (0, 0, 0, 0)
+    return {'activities': row[0], 'crops': row[1], 'financial_records': row[2], 'price_alerts': row[3]}
+
+def crop_season(month):
+    """Map a 'YYYY-MM' month to its Maharashtra cropping season"""
+    year, mon = int(month[:4]), int(month[5:7])
+    if 6 <= mon <= 10:
+        return f"Kharif {year}"
+    if mon >= 11:
+        return f"Rabi {year}-{(year + 1) % 100:02d}"
+    if mon <= 3:
+        return f"Rabi {year - 1}-{year % 100:02d}"
+    return f"Zaid {year}"
+
+def get_financial_rollups(user_id):
+    """Pre-aggregated ledger totals per month, category, crop and type"""
+    rows = db.query(queries.USER_FINANCIAL_ROLLUPS, (user_id,))
+    df = pd.DataFrame(rows, columns=['month', 'category', 'crop', 'type', 'total', 'entries'])
+    df['season'] = [crop_season(m) if m else 'Undated' for m in df['month']]
+    df['crop'] = df['crop'].replace('', 'General')
+    return df
+
+def get_recent_source_prices(commodity, source, days=14):
+    rows = db.query(queries.RECENT_SOURCE_PRICES, (commodity, source, days))
+    return pd.DataFrame(rows, columns=['market', 'date', 'min_price', 'max_price', 'modal_price', 'updated_at'])
+
+def get_daily_prices(commodity, district, days=90):
+    rows = db.query(queries.DISTRICT_DAILY_PRICES, (commodity, district, days))
+    df = pd.DataFrame(rows, columns=['date', 'market', 'min_price', 'max_price', 'modal_price', 'arrivals'])
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+def get_weekly_prices(commodity, market, days=180):
+    rows = db.query(queries.MARKET_WEEKLY_PRICES, (commodity, market, days))
+    df = pd.DataFrame(rows, columns=['week_start', 'open', 'high', 'low', 'close', 'modal_price'])
+    df['week_start'] = pd.to_datetime(df['week_start'])
+    return df
+
+def get_latest_price(commodity, district=None):
+    if district:
+        row = db.query_one(queries.LATEST_DISTRICT_PRICE, (commodity, district))
+    else:
+        row = db.query_one(queries.LATEST_PRICE, (commodity,))
+    if row is None:
+        return None
+    return {'date': row[0], 'market': row[1], 'min_price': row[2], 'max_price': row[3], 'modal_price': row[4]}
+
+def search_pest_reports(text, limit=50):
+    """Full-text search over pest reports, best bm25 matches first"""
+    match, days = queries.fts_search(text)
+    if match is None:
+        return []
+    return db.query(queries.SEARCH_PEST_REPORTS, (match, days, limit))
+
+def search_user_history(user_id, text, limit=50):
+    """Full-text search over a user's activity payloads and crop notes"""
+    match, days = queries.fts_search(text)
+    if match is None:
+        return [], []
+    activities = db.query(queries.SEARCH_USER_ACTIVITIES, (match, user_id, days, limit))
+    notes = db.query(queries.SEARCH_USER_CROP_NOTES, (match, user_id, limit))
+    return activities, notes
 
 def get_manual_prices(commodity=None, district=None, days=30):
-    conn = sqlite3.connect('krishimitra.db')
-    c = conn.cursor()
-    query = '''SELECT district, market_name, commodity, min_price, max_price, modal_price, 
-               arrival_quantity, price_date, updated_at 
-               FROM manual_market_prices 
-               WHERE price_date >= date('now', '-' || ? || ' days')'''
     params = [days]
     if commodity:
-        query += " AND commodity = ?"
         params.append(commodity)
     if district:
-        query += " AND district = ?"
         params.append(district)
-    query += " ORDER BY price_date DESC"
-    c.execute(query, params)
-    results = c.fetchall()
-    conn.close()
+    results = db.query(queries.manual_prices(commodity, district), params)
     if results:
         return pd.DataFrame(results, columns=['district', 'market', 'commodity', 'min_price', 
                                                'max_price', 'modal_price', 'arrival_quantity', 
@@ -1325,32 +599,12 @@ def get_manual_prices(commodity=None, district=None, days=30):
 
 def add_manual_price(district, market_name, commodity, min_price, max_price, modal_price, 
                      arrival_quantity, price_date, updated_by):
-    conn = sqlite3.connect('krishimitra.db')
-    c = conn.cursor()
-    c.execute('''INSERT INTO manual_market_prices 
+    writer.submit('''INSERT INTO manual_market_prices 
                  (district, market_name, commodity, min_price, max_price, modal_price, 
                   arrival_quantity, price_date, updated_by)
                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
               (district, market_name, commodity, min_price, max_price, modal_price, 
                arrival_quantity, price_date, updated_by))
-    conn.commit()
-    conn.close()
-
-def get_nearest_mandis(district):
-    mandis = {
-        "Pune": ["Pune Market Yard", "Baramati APMC", "Daund APMC", "Indapur APMC", "Shirur APMC"],
-        "Nagpur": ["Nagpur Cotton Market", "Kamptee APMC", "Umred APMC", "Hinganghat APMC"],
-        "Nashik": ["Nashik APMC", "Lasalgaon APMC", "Sinnar APMC", "Niphad APMC"],
-        "Mumbai Suburban": ["Vashi APMC", "Turbhe Market", "Kalyan APMC"],
-        "Thane": ["Kalyan APMC", "Bhiwandi Market", "Thane Market"],
-        "Aurangabad": ["Aurangabad APMC", "Paithan Market", "Gangapur Market"],
-        "Solapur": ["Solapur APMC", "Barshi Market", "Pandharpur APMC"],
-        "Kolhapur": ["Kolhapur APMC", "Ichalkaranji Market", "Kagal APMC"],
-        "Ahmednagar": ["Ahmednagar APMC", "Sangamner Market", "Rahuri Market"],
-        "Satara": ["Satara APMC", "Karad Market", "Phaltan APMC"],
-        "Sangli": ["Sangli APMC", "Miraj Market", "Tasgaon APMC"]
-    }
-    return mandis.get(district, ["Contact District Agriculture Office", "Visit nearest APMC"])
 
 # NEW: Weather Functions
 def fetch_weather_data(district, tehsil):
@@ -1376,55 +630,109 @@ def check_weather_alerts(district):
     return alerts
 
 # AI Helper Functions
-def get_ai_response(user_message, context=""):
-    """Get AI response from Claude"""
+AI_MODEL = ai_prompts.MODEL
+
+def _ai_user():
+    user_data = st.session_state.get('user_data') or {}
+    return user_data.get('id', 'anonymous')
+
+def _ai_error_message(error):
+    """What to tell the farmer when a live AI call fails"""
+    if isinstance(error, ratelimit.RateLimited):
+        return "You are asking questions faster than we can answer them. Please wait a minute and try again."
+    if isinstance(error, ai_gateway.GatewayBusy):
+        return "Many farmers are using the AI assistant right now. Please try again in a minute."
+    if ai_gateway.status_of(error) in ai_gateway.RETRY_STATUSES:
+        return "The AI service is overloaded right now. Please try again in a few minutes."
+    return f"Sorry, I encountered an error: {str(error)}"
+
+def get_ai_response(user_message, context="", feature="general"):
+    """Get AI response from Claude, served from the shared cache when ``feature`` allows it"""
     client = get_anthropic_client()
     if not client:
         return "AI Assistant is not configured. Please add ANTHROPIC_API_KEY to secrets."
     
     try:
-        user_data = st.session_state.get('user_data', {})
-        location = f"{user_data.get('village', 'Unknown')}, {user_data.get('tehsil', 'Unknown')}, {user_data.get('district', 'Maharashtra')}"
-        
-        system_prompt = f"""You are KrishiMitra AI, an expert agricultural advisor for Maharashtra farmers. 
-        
-Current farmer context:
-- Location: {location}
-- Farm size: {user_data.get('farm_size', 'Unknown')} acres
-
-You provide:
-1. Practical farming advice specific to Maharashtra
-2. Crop recommendations based on location and season
-3. Pest and disease management guidance
-4. Market insights and pricing trends
-5. Government scheme information
-6. Yield optimization strategies
-7. Water and soil management
-
-Always be:
-- Concise and practical
-- Supportive and encouraging
-- Specific to Indian/Maharashtra agriculture
-- Data-driven with actionable advice
-
-{context}"""
-        
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1500,
+        system_prompt = ai_prompts.system_blocks(feature, st.session_state.get('user_data'), context)
+        key, cached = ai_cache.lookup_request(feature, user_message, ai_prompts.system_text(system_prompt), AI_MODEL)
+        if cached is not None:
+            ai_metrics.record_cache_hit(feature)
+            return cached
+        
+        started = time.perf_counter()
+        message = ai_gateway.gateway.create(
+            client, _ai_user(),
+            model=AI_MODEL,
+            max_tokens=ai_prompts.MAX_TOKENS,
             system=system_prompt,
             messages=[
                 {"role": "user", "content": user_message}
             ]
         )
-        
-        return message.content[0].text
+        response = message.content[0].text
+        ai_metrics.record(feature, time.perf_counter() - started, usage=message.usage)
+        if key:
+            ai_cache.store(key, feature, AI_MODEL, response)
+        return response
     except Exception as e:
-        return f"Sorry, I encountered an error: {str(e)}"
+        ai_metrics.record_error(feature)
+        return _ai_error_message(e)
+
+def stream_ai_response(user_message, context="", feature="general"):
+    """Yield Claude's answer as it is generated, for ``st.write_stream``.
+    
+    A cached answer is yielded whole. A fresh one is cached only once the
+    stream has finished, so an abandoned or failed stream is never stored.
+    """
+    client = get_anthropic_client()
+    if not client:
+        yield "AI Assistant is not configured. Please add ANTHROPIC_API_KEY to secrets."
+        return
+    
+    try:
+        system_prompt = ai_prompts.system_blocks(feature, st.session_state.get('user_data'), context)
+        key, cached = ai_cache.lookup_request(feature, user_message, ai_prompts.system_text(system_prompt), AI_MODEL)
+    except Exception as e:
+        yield f"Sorry, I encountered an error: {str(e)}"
+        return
+    if cached is not None:
+        ai_metrics.record_cache_hit(feature)
+        yield cached
+        return
+    
+    started = time.perf_counter()
+    first_token = None
+    parts = []
+    try:
+        with ai_gateway.gateway.stream(
+            client, _ai_user(),
+            model=AI_MODEL,
+            max_tokens=ai_prompts.MAX_TOKENS,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": user_message}
+            ]
+        ) as stream:
+            for text in stream.text_stream:
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(text)
+                yield text
+            usage = stream.get_final_message().usage
+    except Exception as e:
+        ai_metrics.record_error(feature)
+        yield ("\n\n" if parts else "") + _ai_error_message(e)
+        return
+    
+    ai_metrics.record(feature, time.perf_counter() - started, first_token, usage)
+    if key:
+        ai_cache.store(key, feature, AI_MODEL, "".join(parts))
 
 # Main Application
 def main():
-    init_database()
+    db.ensure_schema()
+    tiering.start_background()
+    ingest.start_background()
     st.markdown('<div class="main-header">🌾 KrishiMitra Maharashtra</div>', unsafe_allow_html=True)
     st.markdown('<p style="text-align: center; font-size: 1.3rem; color: #558B2F; font-weight: 600; margin-top: -1rem;">संपूर्ण कृषी व्यवस्थापन प्रणाली | AI-Powered Complete Agriculture Management System</p>', unsafe_allow_html=True)
     
@@ -1574,6 +882,8 @@ def show_main_app():
                 "Market Prices",
                 "Buyer Connect"
             ]
+        if is_admin(user):
+            pages.append("System Status")
         
         st.markdown("### Navigation")
         for page in pages:
@@ -1640,6 +950,8 @@ def show_main_app():
             show_expert_connect()
         elif page == "My Activity":
             show_activity_history()
+        elif page == "System Status" and is_admin(user):
+            show_system_status()
         else:
             show_dashboard()
     except Exception as e:
@@ -1678,19 +990,14 @@ def show_dashboard():
     st.success(f"✅ {weather['advisory']}")
     
     # Metrics
+    stats = get_user_stats(user['id'])
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("Your Farm", f"{user['farm_size']} acres")
     with col2:
-        activities = get_user_activities(user['id'], limit=1000)
-        st.metric("Activities", len(activities))
+        st.metric("Activities", stats['activities'])
     with col3:
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
-        c.execute("SELECT COUNT(*) FROM crop_tracking WHERE user_id=?", (user['id'],))
-        crop_count = c.fetchone()[0]
-        conn.close()
-        st.metric("Active Crops", crop_count)
+        st.metric("Active Crops", stats['crops'])
     with col4:
         st.metric("Location", f"{user['district']}")
     
@@ -1716,12 +1023,7 @@ def show_dashboard():
     
     # Active crop tracking summary
     st.markdown("### Active Crop Status")
-    conn = sqlite3.connect('krishimitra.db')
-    c = conn.cursor()
-    c.execute('''SELECT crop_name, area_acres, days_after_sowing, current_stage, health_status 
-                 FROM crop_tracking WHERE user_id=? ORDER BY sowing_date DESC LIMIT 5''', (user['id'],))
-    crops = c.fetchall()
-    conn.close()
+    crops = db.query(queries.USER_RECENT_CROPS, (user['id'],))
     
     if crops:
         for crop in crops:
@@ -1749,6 +1051,16 @@ def show_dashboard():
     else:
         st.info("No activities yet. Start using the tools!")
 
+def stream_chat_answer(question, feature):
+    """Stream an answer under the question, then add both to the chat history"""
+    st.markdown(f'<div class="chat-message user-message"><strong>You:</strong> {question}</div>', 
+               unsafe_allow_html=True)
+    st.markdown("**KrishiMitra AI:**")
+    response = st.write_stream(stream_ai_response(question, feature=feature))
+    st.session_state.chat_history.append({"role": "user", "content": question})
+    st.session_state.chat_history.append({"role": "assistant", "content": response})
+    st.rerun()
+
 def show_ai_assistant():
     """AI Chat Assistant - FULL IMPLEMENTATION"""
     st.markdown("### AI Agricultural Assistant")
@@ -1775,27 +1087,15 @@ def show_ai_assistant():
         if st.button("Best crops for my location", use_container_width=True):
             user = st.session_state.user_data
             question = f"What are the best crops for {user['tehsil']}, {user['district']} this season?"
-            with st.spinner("Thinking..."):
-                response = get_ai_response(question)
-                st.session_state.chat_history.append({"role": "user", "content": question})
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
-                st.rerun()
+            stream_chat_answer(question, feature="quick_question")
     with col2:
         if st.button("Current market trends", use_container_width=True):
             question = "What are the current agricultural market trends in Maharashtra?"
-            with st.spinner("Analyzing..."):
-                response = get_ai_response(question)
-                st.session_state.chat_history.append({"role": "user", "content": question})
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
-                st.rerun()
+            stream_chat_answer(question, feature="quick_question")
     with col3:
         if st.button("Yield improvement tips", use_container_width=True):
             question = "What are the top 5 ways to increase crop yields in Maharashtra?"
-            with st.spinner("Searching..."):
-                response = get_ai_response(question)
-                st.session_state.chat_history.append({"role": "user", "content": question})
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
-                st.rerun()
+            stream_chat_answer(question, feature="quick_question")
     
     # Chat input
     with st.form("chat_form", clear_on_submit=True):
@@ -1803,11 +1103,7 @@ def show_ai_assistant():
         submitted = st.form_submit_button("Send", use_container_width=True, type="primary")
         
         if submitted and user_input:
-            with st.spinner("Getting answer..."):
-                response = get_ai_response(user_input)
-                st.session_state.chat_history.append({"role": "user", "content": user_input})
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
-                st.rerun()
+            stream_chat_answer(user_input, feature="chat")
     
     if st.session_state.chat_history:
         if st.button("Clear Chat History"):
@@ -1823,13 +1119,7 @@ def show_crop_growth_tracker():
     tab1, tab2, tab3 = st.tabs(["Active Crops", "Add New Crop", "Growth Insights"])
     
     with tab1:
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
-        c.execute('''SELECT id, crop_name, area_acres, sowing_date, days_after_sowing, 
-                     current_stage, health_status, notes 
-                     FROM crop_tracking WHERE user_id=? ORDER BY sowing_date DESC''', (user['id'],))
-        crops = c.fetchall()
-        conn.close()
+        crops = db.query(queries.USER_CROPS, (user['id'],))
         
         if crops:
             for crop in crops:
@@ -1852,33 +1142,40 @@ def show_crop_growth_tracker():
                         st.info(f"Notes: {crop[7]}")
                     
                     # Show current stage requirements
-                    if crop[1] in CROP_DATABASE and "critical_growth_stages" in CROP_DATABASE[crop[1]]:
-                        stages = CROP_DATABASE[crop[1]]["critical_growth_stages"]
-                        current_stage = None
-                        for stage in stages:
-                            day_range = stage["days"].split("-")
-                            start = int(day_range[0])
-                            end = int(day_range[-1])
-                            if start <= crop[4] <= end:
-                                current_stage = stage
-                                break
-                        
-                        if current_stage:
-                            st.markdown("#### Current Stage Requirements")
-                            col1, col2 = st.columns(2)
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                commodity = st.selectbox("Select Commodity", list(CROP_DATABASE.keys()))
-                            with col2:
-                                # Create district list with Maharashtra first, then user's district, then all others
-                                all_districts = ["Maharashtra (All)"] + [user['district']] + [d for d in sorted(MAHARASHTRA_LOCATIONS.keys()) if d != user['district']]
-                                district = st.selectbox("District", all_districts, index=1)
-                                
-                                # Clean the district name for processing (remove " (All)" suffix)
-                                selected_district = district.replace(" (All)", "") if district != "Maharashtra (All)" else "Maharashtra"
+                    current_stage = advisories.stage_for_day(crop[1], crop[4])
+                    if current_stage:
+                        st.markdown("#### Current Stage Requirements")
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.info(f"Water need: {current_stage.get('water_need', 'Unknown')}")
+                        with col2:
+                            st.info(f"Nutrient focus: {current_stage.get('nutrients', 'Unknown')}")
                     
-                    # AI recommendations for this stage
-                    if st.button(f"Get AI Recommendations for {crop[1]}", key=f"ai_{crop[0]}"):
+                    # Precomputed advisory for this crop, stage and district
+                    advisory = advisories.get_advisory(crop[1], current_stage["stage"], user['district']) if current_stage else None
+                    if advisory:
+                        st.markdown(f"#### {current_stage['stage']} Stage Advisory for {user['district']}")
+                        st.markdown('<div class="ai-card">', unsafe_allow_html=True)
+                        st.markdown(advisory[0])
+                        st.markdown('</div>', unsafe_allow_html=True)
+                        st.caption(f"Prepared {datetime.fromtimestamp(advisory[1]).strftime('%d %b %Y')} for {crop[1]} farms at this stage")
+                        
+                        follow_up = st.text_input("Ask about your own crop", key=f"follow_up_{crop[0]}",
+                                                  placeholder="E.g., Leaves are yellowing at the tips, what should I do?")
+                        if st.button("Ask AI", key=f"ai_{crop[0]}") and follow_up:
+                            prompt = f"""Follow-up question about my {crop[1]} at day {crop[4]}:
+                            
+                            Current details:
+                            - Stage: {crop[5]}
+                            - Health: {crop[6]}
+                            - Notes: {crop[7] or 'None'}
+                            - Location: {user['tehsil']}, {user['district']}
+                            
+                            Question: {follow_up}
+                            """
+                            context = f"The farmer has already read this advisory for the stage:\n{advisory[0]}"
+                            st.write_stream(stream_ai_response(prompt, context=context, feature="crop_care"))
+                    elif st.button(f"Get AI Recommendations for {crop[1]}", key=f"ai_{crop[0]}"):
                         with st.spinner("Getting stage-specific recommendations..."):
                             prompt = f"""Provide specific care recommendations for {crop[1]} at day {crop[4]}:
                             
@@ -1894,7 +1191,7 @@ def show_crop_growth_tracker():
                             4. Pest/disease watch points
                             5. Expected challenges in next growth stage
                             """
-                            response = get_ai_response(prompt)
+                            response = get_ai_response(prompt, feature="crop_care")
                             st.markdown('<div class="ai-card">', unsafe_allow_html=True)
                             st.markdown(response)
                             st.markdown('</div>', unsafe_allow_html=True)
@@ -1934,31 +1231,23 @@ def show_crop_growth_tracker():
                             current_stage = stage["stage"]
                             break
                 
-                conn = sqlite3.connect('krishimitra.db')
-                c = conn.cursor()
-                c.execute('''INSERT INTO crop_tracking 
+                writer.submit('''INSERT INTO crop_tracking 
                             (user_id, crop_name, area_acres, sowing_date, expected_harvest_date,
                              current_stage, days_after_sowing, health_status, notes)
                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
                          (user['id'], crop_name, area, sowing_date, expected_harvest, 
                           current_stage, days_after_sowing, health_status, notes))
-                conn.commit()
-                conn.close()
                 
                 st.success(f"Started tracking {crop_name}!")
                 log_activity(user['id'], "Crop Tracking Started", crop_name, area, 
                             {"sowing_date": str(sowing_date)})
+                writer.flush()
                 st.rerun()
     
     with tab3:
         st.markdown("### Growth Insights & Analytics")
         
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
-        c.execute('''SELECT crop_name, COUNT(*), AVG(area_acres) 
-                     FROM crop_tracking WHERE user_id=? GROUP BY crop_name''', (user['id'],))
-        summary = c.fetchall()
-        conn.close()
+        summary = db.query(queries.USER_CROP_SUMMARY, (user['id'],))
         
         if summary:
             df = pd.DataFrame(summary, columns=['Crop', 'Times Grown', 'Avg Area'])
@@ -2030,7 +1319,7 @@ def show_smart_irrigation_planner():
             
             Consider the crop stage and recent rainfall in recommendations."""
             
-            response = get_ai_response(prompt)
+            response = get_ai_response(prompt, feature="irrigation")
             
             st.markdown('<div class="ai-card">', unsafe_allow_html=True)
             st.markdown("### Your Personalized Irrigation Schedule")
@@ -2040,30 +1329,19 @@ def show_smart_irrigation_planner():
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Save to database
-            conn = sqlite3.connect('krishimitra.db')
-            c = conn.cursor()
-            for day in range(7):
-                schedule_date = datetime.now().date() + timedelta(days=day)
-                c.execute('''INSERT INTO irrigation_schedule 
+            writer.submit_many('''INSERT INTO irrigation_schedule 
                             (user_id, crop_name, schedule_date, notes)
                             VALUES (?, ?, ?, ?)''',
-                         (user['id'], crop, schedule_date, "AI Generated Schedule"))
-            conn.commit()
-            conn.close()
+                         [(user['id'], crop, datetime.now().date() + timedelta(days=day), "AI Generated Schedule")
+                          for day in range(7)])
             
             log_activity(user['id'], "Irrigation Schedule Created", crop, area, 
                         {"stage": current_stage, "irrigation": irrigation_type})
+            writer.flush()
     
     # Show upcoming irrigation schedule
     st.markdown("### Upcoming Irrigation Tasks")
-    conn = sqlite3.connect('krishimitra.db')
-    c = conn.cursor()
-    c.execute('''SELECT crop_name, schedule_date, completed, notes 
-                 FROM irrigation_schedule 
-                 WHERE user_id=? AND schedule_date >= date('now')
-                 ORDER BY schedule_date LIMIT 7''', (user['id'],))
-    schedules = c.fetchall()
-    conn.close()
+    schedules = db.query(queries.USER_UPCOMING_IRRIGATION, (user['id'],))
     
     if schedules:
         for sched in schedules:
@@ -2108,7 +1386,7 @@ def show_soil_health_analyzer():
         with st.spinner("Analyzing soil health..."):
             crop_info = CROP_DATABASE[crop]
             
-            prompt = f"""As a soil scientist, provide comprehensive soil analysis for {crop} cultivation:
+            prompt = f"""Soil analysis for {crop} cultivation:
             
             Current Soil Parameters:
             - Nitrogen (N): {nitrogen}%
@@ -2120,29 +1398,11 @@ def show_soil_health_analyzer():
             - Texture: {soil_texture}
             
             Location: {user['tehsil']}, {user['district']}, Maharashtra
-            Crop Requirements: {crop_info.get('soil_type', 'General')}
-            
-            Provide detailed analysis:
-            1. Overall soil health rating (1-10 with explanation)
-            2. Specific deficiencies or excesses identified
-            3. Critical amendments needed:
-               - Product names (both organic and chemical)
-               - Exact quantities per acre
-               - Application timing
-               - Expected cost (in INR)
-            4. Expected yield impact (% increase) if recommendations followed
-            5. Timeline for soil improvement (short-term and long-term)
-            6. Organic vs chemical correction comparison
-            7. Maintenance plan for optimal soil health
-            8. Impact on neighboring crops/future rotations
-            
-            Be specific with local Maharashtra product names and realistic prices."""
-            
-            response = get_ai_response(prompt)
+            Crop Requirements: {crop_info.get('soil_type', 'General')}"""
             
             st.markdown('<div class="ai-card">', unsafe_allow_html=True)
             st.markdown("### Comprehensive Soil Analysis Report")
-            st.markdown(response)
+            st.write_stream(stream_ai_response(prompt, feature="soil_health"))
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Visual representation
@@ -2240,7 +1500,7 @@ def show_yield_predictor():
             crop_info = CROP_DATABASE[crop]
             base_yield = crop_info.get("expected_yield_tons", "1.0-1.5")
             
-            prompt = f"""As an agricultural data scientist, predict the yield for this farm:
+            prompt = f"""Yield prediction for this farm:
             
             Crop Details:
             - Crop: {crop}
@@ -2254,26 +1514,11 @@ def show_yield_predictor():
             - Irrigation: {irrigation_quality}
             - Pest/Disease Control: {pest_disease_control}
             - Weather: {weather_conditions}
-            - Fertilizer Application: {fertilizer_application}
-            
-            Provide:
-            1. Predicted yield (in tons and quintals)
-            2. Confidence level (High/Medium/Low) with reasoning
-            3. Yield range (best case - worst case)
-            4. Key factors positively impacting yield
-            5. Key factors negatively impacting yield
-            6. Critical interventions needed NOW to improve yield
-            7. Expected yield if all recommendations followed
-            8. Comparison with district average yield
-            9. Financial projection (estimated revenue at current market rates)
-            
-            Be realistic and data-driven. Use Maharashtra-specific benchmarks."""
-            
-            response = get_ai_response(prompt)
+            - Fertilizer Application: {fertilizer_application}"""
             
             st.markdown('<div class="success-card">', unsafe_allow_html=True)
             st.markdown("### Yield Prediction Report")
-            st.markdown(response)
+            st.write_stream(stream_ai_response(prompt, feature="yield_prediction"))
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Visual yield comparison
@@ -2328,9 +1573,7 @@ def show_yield_predictor():
             st.plotly_chart(fig, use_container_width=True)
             
             # Save prediction
-            conn = sqlite3.connect('krishimitra.db')
-            c = conn.cursor()
-            c.execute('''INSERT INTO yield_predictions 
+            writer.submit('''INSERT INTO yield_predictions 
                         (user_id, crop_name, area_acres, predicted_yield, confidence_level, factors)
                         VALUES (?, ?, ?, ?, ?, ?)''',
                      (user['id'], crop, area, predicted_yield, confidence, 
@@ -2339,8 +1582,6 @@ def show_yield_predictor():
                           "pest_control": pest_disease_control, "weather": weather_conditions,
                           "fertilizer": fertilizer_application
                       })))
-            conn.commit()
-            conn.close()
             
             log_activity(user['id'], "Yield Prediction", crop, area, 
                         {"predicted_yield": predicted_yield, "confidence": confidence})
@@ -2444,27 +1685,19 @@ def show_financial_manager():
             submitted = st.form_submit_button("Add Transaction", use_container_width=True, type="primary")
             
             if submitted:
-                conn = sqlite3.connect('krishimitra.db')
-                c = conn.cursor()
-                c.execute('''INSERT INTO financial_records 
+                writer.submit('''INSERT INTO financial_records 
                             (user_id, category, amount, transaction_type, crop_related, transaction_date, notes)
                             VALUES (?, ?, ?, ?, ?, ?, ?)''',
                          (user['id'], category, amount, transaction_type, crop_related, transaction_date, notes))
-                conn.commit()
-                conn.close()
                 st.success("Transaction added!")
                 log_activity(user['id'], "Financial Record", crop_related, 0, 
                            {"type": transaction_type, "amount": amount})
+                writer.flush()
                 st.rerun()
     
     with tab2:
-        conn = sqlite3.connect('krishimitra.db')
-        df = pd.read_sql_query(
-            '''SELECT transaction_date as Date, category as Category, amount as Amount, 
-               transaction_type as Type, crop_related as Crop, notes as Notes
-               FROM financial_records WHERE user_id=? ORDER BY transaction_date DESC LIMIT 50''',
-            conn, params=(user['id'],))
-        conn.close()
+        with db.connection() as conn:
+            df = pd.read_sql_query(queries.USER_FINANCIAL_RECORDS, conn, params=(user['id'],))
         
         if not df.empty:
             st.dataframe(df, use_container_width=True)
@@ -2472,15 +1705,10 @@ def show_financial_manager():
             st.info("No financial records yet")
     
     with tab3:
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
+        rollups = get_financial_rollups(user['id'])
         
         # Total income and expenses
-        c.execute('''SELECT transaction_type, SUM(amount) FROM financial_records 
-                     WHERE user_id=? GROUP BY transaction_type''', (user['id'],))
-        summary = dict(c.fetchall())
-        conn.close()
-        
+        summary = rollups.groupby('type')['total'].sum()
         total_income = summary.get('Income', 0)
         total_expense = summary.get('Expense', 0)
         net_profit = total_income - total_expense
@@ -2498,6 +1726,29 @@ def show_financial_manager():
             st.success(f"Your farming operations are profitable!")
         elif net_profit < 0:
             st.warning("Consider reviewing expenses and improving yields")
+        
+        if not rollups.empty:
+            breakdown = st.radio("Breakdown by", ["Month", "Season", "Crop"], horizontal=True)
+            key = {"Month": "month", "Season": "season", "Crop": "crop"}[breakdown]
+            by_key = rollups.pivot_table(index=key, columns='type', values='total',
+                                         aggfunc='sum', fill_value=0).reset_index()
+            for column in ('Income', 'Expense'):
+                if column not in by_key.columns:
+                    by_key[column] = 0
+            by_key['Net'] = by_key['Income'] - by_key['Expense']
+            if key == 'month':
+                by_key = by_key.sort_values('month')
+            
+            fig = px.bar(by_key, x=key, y=['Income', 'Expense'], barmode='group',
+                        title=f"Income vs Expenses by {breakdown}",
+                        labels={'value': 'Amount (₹)', key: breakdown})
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(by_key, use_container_width=True)
+            
+            expenses = rollups[rollups['type'] == 'Expense'].groupby('category')['total'].sum()
+            if not expenses.empty:
+                fig2 = px.pie(values=expenses.values, names=expenses.index, title="Expenses by Category")
+                st.plotly_chart(fig2, use_container_width=True)
 
 def show_weather_alerts():
     """Weather information and alerts - FULL IMPLEMENTATION"""
@@ -2555,13 +1806,7 @@ def show_pest_alerts():
     # Current alerts
     st.markdown("### Active Alerts in Your District")
     
-    conn = sqlite3.connect('krishimitra.db')
-    c = conn.cursor()
-    c.execute('''SELECT crop_name, pest_disease, severity, description, recommended_action, alert_date
-                 FROM pest_alerts WHERE district=? ORDER BY alert_date DESC LIMIT 10''',
-              (user['district'],))
-    alerts = c.fetchall()
-    conn.close()
+    alerts = db.query(queries.DISTRICT_PEST_ALERTS, (user['district'],))
     
     if alerts:
         for alert in alerts:
@@ -2573,6 +1818,32 @@ def show_pest_alerts():
     else:
         st.info("No active pest alerts for your district")
     
+    # Alert history (older ranges are read from the archive as well)
+    st.markdown("### Alert History")
+    history_range = st.date_input("Alert Date Range",
+                                  value=(datetime.now().date() - timedelta(days=90), datetime.now().date()),
+                                  key="pest_history_range")
+    if len(history_range) == 2:
+        history = get_pest_alert_history(user['district'], *history_range)
+        if history:
+            df = pd.DataFrame(history, columns=['Crop', 'Pest/Disease', 'Severity', 'Description',
+                                                'Recommended Action', 'Date'])
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.info("No alerts in this period")
+    
+    # Search all reports
+    st.markdown("### Search Pest Reports")
+    search_text = st.text_input("Search", placeholder="e.g., whitefly cotton Nashik last 30 days", key="pest_search")
+    if search_text:
+        results = search_pest_reports(search_text)
+        if results:
+            df = pd.DataFrame(results, columns=['Crop', 'Pest/Disease', 'Severity', 'Description',
+                                                'Recommended Action', 'Date', 'District'])
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.info("No matching reports")
+    
     # Report pest/disease
     st.markdown("### Report Pest/Disease Sighting")
     with st.form("report_pest"):
@@ -2587,16 +1858,13 @@ def show_pest_alerts():
         submitted = st.form_submit_button("Submit Report", use_container_width=True, type="primary")
         
         if submitted and pest_disease:
-            conn = sqlite3.connect('krishimitra.db')
-            c = conn.cursor()
-            c.execute('''INSERT INTO pest_alerts 
+            writer.submit('''INSERT INTO pest_alerts 
                         (district, crop_name, pest_disease, severity, alert_date, description, recommended_action)
                         VALUES (?, ?, ?, ?, ?, ?, ?)''',
                      (user['district'], crop, pest_disease, severity, datetime.now().date(), 
                       description, "Under investigation"))
-            conn.commit()
-            conn.close()
             st.success("Report submitted! Agricultural officers will investigate.")
+            writer.flush()
             st.rerun()
 def show_live_market_prices():
     """Live Market Prices with CEDA Integration - FULL IMPLEMENTATION"""
@@ -2634,92 +1902,86 @@ def show_live_market_prices():
         selected_district = district.replace(" (All)", "") if district != "Maharashtra (All)" else "Maharashtra"
         
         if st.button("Show Typical Price Ranges & Market Info", type="primary", use_container_width=True):
-            with st.spinner("Fetching real-time prices from CEDA Ashoka University..."):
-                # Fetch from CEDA
-                ceda_df, ceda_status = fetch_ceda_prices(commodity, selected_district)
+            # Prices are scraped in the background by ingest.py; this only reads the database.
+            ceda_df = get_recent_source_prices(commodity, 'ceda')
+            
+            if not ceda_df.empty:
+                st.success(f"✅ CEDA Ashoka University prices, last updated {ceda_df['updated_at'].max()}")
+                ceda_df = ceda_df.drop(columns='updated_at')
                 
-                if ceda_df is not None:
-                    st.success(ceda_status)
-                    
-                    # Display CEDA data
-                    st.markdown("#### CEDA Market Data")
-                    st.dataframe(ceda_df, use_container_width=True)
-                    
-                    # Show statistics
-                    if 'price' in ceda_df.columns:
-                        try:
-                            prices = pd.to_numeric(ceda_df['price'].str.replace('[^\d.]', '', regex=True), errors='coerce')
-                            prices = prices.dropna()
-                            
-                            if len(prices) > 0:
-                                col1, col2, col3 = st.columns(3)
-                                with col1:
-                                    st.metric("Average Price", f"₹{prices.mean():.0f}/quintal")
-                                with col2:
-                                    st.metric("Min Price", f"₹{prices.min():.0f}/quintal")
-                                with col3:
-                                    st.metric("Max Price", f"₹{prices.max():.0f}/quintal")
-                                
-                                # Price distribution chart
-                                fig = px.histogram(prices, nbins=10, 
-                                                title=f"{commodity} Price Distribution",
-                                                labels={'value': 'Price (₹/quintal)', 'count': 'Frequency'})
-                                st.plotly_chart(fig, use_container_width=True)
-                        except Exception as e:
-                            st.info("Price analysis not available")
-                    
-                    # CEDA Attribution
-                    st.markdown('<div class="info-card">', unsafe_allow_html=True)
-                    st.markdown("""
-                    **Data Source:** Centre for Economic Data and Analysis (CEDA), Ashoka University
-                    
-                    CEDA provides economic data for research and non-commercial use. 
-                    Learn more: https://ceda.ashoka.edu.in
-                    
-                    **Usage Compliance:**
-                    - Non-commercial educational use
-                    - Proper attribution provided
-                    - Rate-limited respectful access
-                    """)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                else:
-                    st.warning(ceda_status)
-                    
-                    # Generate sample prices as fallback
-                    st.info("Showing estimated market prices based on typical ranges")
-                    # Use selected district if not "Maharashtra", otherwise use user's district
-                    district_for_sample = user['district'] if selected_district == "Maharashtra" else selected_district
-                    sample_df = generate_sample_prices(commodity, district_for_sample)
-                    
-                    st.markdown("#### Estimated Market Prices (Last 7 Days)")
-                    st.dataframe(sample_df, use_container_width=True)
-                    
-                    # Calculate and show statistics
+                # Display CEDA data
+                st.markdown("#### CEDA Market Data")
+                st.dataframe(ceda_df, use_container_width=True)
+                
+                # Show statistics
+                prices = ceda_df['modal_price'].dropna()
+                if len(prices) > 0:
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Average Modal Price", f"₹{sample_df['modal_price'].mean():.0f}/quintal")
+                        st.metric("Average Price", f"₹{prices.mean():.0f}/quintal")
                     with col2:
-                        st.metric("Typical Min", f"₹{sample_df['min_price'].mean():.0f}/quintal")
+                        st.metric("Min Price", f"₹{ceda_df['min_price'].min():.0f}/quintal")
                     with col3:
-                        st.metric("Typical Max", f"₹{sample_df['max_price'].mean():.0f}/quintal")
+                        st.metric("Max Price", f"₹{ceda_df['max_price'].max():.0f}/quintal")
                     
-                    # Price chart
-                    fig = px.line(sample_df, x='date', y=['min_price', 'modal_price', 'max_price'],
-                                title=f"{commodity} Price Trends (Estimated)",
-                                labels={'value': 'Price (₹/quintal)', 'date': 'Date'})
+                    # Price distribution chart
+                    fig = px.histogram(prices, nbins=10, 
+                                    title=f"{commodity} Price Distribution",
+                                    labels={'value': 'Price (₹/quintal)', 'count': 'Frequency'})
                     st.plotly_chart(fig, use_container_width=True)
-                    
-                    st.markdown('<div class="alert-card">', unsafe_allow_html=True)
-                    st.markdown("""
-                    **Note:** These are estimated prices based on typical market ranges.
-                    
-                    **For real-time prices:**
-                    - Visit your nearest APMC mandi
-                    - Call mandi offices (numbers below)
-                    - Check AGMARKNET: https://agmarknet.gov.in
-                    - Add manual prices in Tab 3 to help the community
-                    """)
-                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # CEDA Attribution
+                st.markdown('<div class="info-card">', unsafe_allow_html=True)
+                st.markdown("""
+                **Data Source:** Centre for Economic Data and Analysis (CEDA), Ashoka University
+                
+                CEDA provides economic data for research and non-commercial use. 
+                Learn more: https://ceda.ashoka.edu.in
+                
+                **Usage Compliance:**
+                - Non-commercial educational use
+                - Proper attribution provided
+                - Rate-limited respectful access
+                """)
+                st.markdown('</div>', unsafe_allow_html=True)
+            else:
+                st.warning("No recent CEDA prices for this commodity yet. They are refreshed in the background.")
+                
+                # Generate sample prices as fallback
+                st.info("Showing estimated market prices based on typical ranges")
+                # Use selected district if not "Maharashtra", otherwise use user's district
+                district_for_sample = user['district'] if selected_district == "Maharashtra" else selected_district
+                sample_df = generate_sample_prices(commodity, district_for_sample)
+                
+                st.markdown("#### Estimated Market Prices (Last 7 Days)")
+                st.dataframe(sample_df, use_container_width=True)
+                
+                # Calculate and show statistics
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Average Modal Price", f"₹{sample_df['modal_price'].mean():.0f}/quintal")
+                with col2:
+                    st.metric("Typical Min", f"₹{sample_df['min_price'].mean():.0f}/quintal")
+                with col3:
+                    st.metric("Typical Max", f"₹{sample_df['max_price'].mean():.0f}/quintal")
+                
+                # Price chart
+                fig = px.line(sample_df, x='date', y=['min_price', 'modal_price', 'max_price'],
+                            title=f"{commodity} Price Trends (Estimated)",
+                            labels={'value': 'Price (₹/quintal)', 'date': 'Date'})
+                st.plotly_chart(fig, use_container_width=True)
+                
+                st.markdown('<div class="alert-card">', unsafe_allow_html=True)
+                st.markdown("""
+                **Note:** These are estimated prices based on typical market ranges.
+                
+                **For real-time prices:**
+                - Visit your nearest APMC mandi
+                - Call mandi offices (numbers below)
+                - Check AGMARKNET: https://agmarknet.gov.in
+                - Add manual prices in Tab 3 to help the community
+                """)
+                st.markdown('</div>', unsafe_allow_html=True)
     
     # Show database prices
     st.markdown("### Manual Market Prices (User Contributed)")
@@ -2729,17 +1991,18 @@ def show_live_market_prices():
     
     if manual_df is not None:
         st.dataframe(manual_df, use_container_width=True)
-        
-        # Show latest price
-        if len(manual_df) > 0:
-            latest = manual_df.iloc[0]
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Latest Min Price", f"₹{latest['min_price']:,.0f}")
-            with col2:
-                st.metric("Latest Max Price", f"₹{latest['max_price']:,.0f}")
-            with col3:
-                st.metric("Latest Modal Price", f"₹{latest['modal_price']:,.0f}")
+    
+    # Show latest price across all recorded sources
+    latest = get_latest_price(commodity, district_filter)
+    if latest is not None:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Latest Min Price", f"₹{latest['min_price']:,.0f}")
+        with col2:
+            st.metric("Latest Max Price", f"₹{latest['max_price']:,.0f}")
+        with col3:
+            st.metric("Latest Modal Price", f"₹{latest['modal_price']:,.0f}")
+        st.caption(f"{latest['market']} on {latest['date']}")
     else:
         # Show expected price from database
         crop_info = CROP_DATABASE[commodity]
@@ -2766,7 +2029,7 @@ def show_live_market_prices():
             
             Be specific and actionable."""
             
-            response = get_ai_response(prompt)
+            response = get_ai_response(prompt, feature="price_analysis")
             st.markdown('<div class="ai-card">', unsafe_allow_html=True)
             st.markdown("### AI Price Analysis")
             st.markdown(response)
@@ -2777,23 +2040,23 @@ def show_live_market_prices():
         
         commodity_trend = st.selectbox("Select Commodity for Trends", list(CROP_DATABASE.keys()), key="trend_commodity")
         
-        # Get historical data
-        trend_df = get_manual_prices(commodity=commodity_trend, district=user['district'], days=90)
+        # Daily rollups for the district (one index range read)
+        daily_df = get_daily_prices(commodity_trend, user['district'], days=90)
         
-        if trend_df is not None and len(trend_df) > 1:
-            # Convert price_date to datetime
-            trend_df['price_date'] = pd.to_datetime(trend_df['price_date'])
-            trend_df = trend_df.sort_values('price_date')
+        if len(daily_df) > 1:
+            trend_df = daily_df.groupby('date', as_index=False).agg(
+                min_price=('min_price', 'min'), max_price=('max_price', 'max'),
+                modal_price=('modal_price', 'mean'))
             
             # Create line chart
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=trend_df['price_date'], y=trend_df['min_price'],
+            fig.add_trace(go.Scatter(x=trend_df['date'], y=trend_df['min_price'],
                                     mode='lines+markers', name='Min Price',
                                     line=dict(color='red', width=2)))
-            fig.add_trace(go.Scatter(x=trend_df['price_date'], y=trend_df['modal_price'],
+            fig.add_trace(go.Scatter(x=trend_df['date'], y=trend_df['modal_price'],
                                     mode='lines+markers', name='Modal Price',
                                     line=dict(color='green', width=3)))
-            fig.add_trace(go.Scatter(x=trend_df['price_date'], y=trend_df['max_price'],
+            fig.add_trace(go.Scatter(x=trend_df['date'], y=trend_df['max_price'],
                                     mode='lines+markers', name='Max Price',
                                     line=dict(color='blue', width=2)))
             
@@ -2816,6 +2079,18 @@ def show_live_market_prices():
             with col3:
                 volatility = trend_df['modal_price'].std()
                 st.metric("Price Volatility", f"₹{volatility:,.0f}")
+            
+            # Weekly OHLC for one market
+            market = st.selectbox("Weekly view for market", sorted(daily_df['market'].unique()), key="trend_market")
+            weekly_df = get_weekly_prices(commodity_trend, market, days=180)
+            if not weekly_df.empty:
+                fig = go.Figure(go.Candlestick(x=weekly_df['week_start'], open=weekly_df['open'],
+                                               high=weekly_df['high'], low=weekly_df['low'],
+                                               close=weekly_df['close'], name=market))
+                fig.update_layout(title=f"{commodity_trend} at {market} (Weekly)",
+                                xaxis_title="Week", yaxis_title="Price (₹/quintal)",
+                                xaxis_rangeslider_visible=False)
+                st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("Not enough historical data for trends. Add manual prices to see trends.")
     
@@ -2856,6 +2131,7 @@ def show_live_market_prices():
                     st.success("Price data added successfully! Thank you for contributing.")
                     log_activity(user['id'], "Price Data Added", price_commodity, 0,
                                {"market": market_name, "modal_price": modal_price})
+                    writer.flush()
                     st.rerun()
 
 def show_price_alert_system():
@@ -2870,12 +2146,7 @@ def show_price_alert_system():
     with tab1:
         st.markdown("### Your Active Price Alerts")
         
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
-        c.execute('''SELECT id, commodity, target_price, alert_type, status, created_at 
-                     FROM price_alerts WHERE user_id=? ORDER BY created_at DESC''', (user['id'],))
-        alerts = c.fetchall()
-        conn.close()
+        alerts = db.query(queries.USER_PRICE_ALERTS, (user['id'],))
         
         if alerts:
             for alert in alerts:
@@ -2921,18 +2192,15 @@ def show_price_alert_system():
             submitted = st.form_submit_button("Create Alert", use_container_width=True, type="primary")
             
             if submitted:
-                conn = sqlite3.connect('krishimitra.db')
-                c = conn.cursor()
-                c.execute('''INSERT INTO price_alerts 
+                writer.submit('''INSERT INTO price_alerts 
                             (user_id, commodity, target_price, alert_type, status)
                             VALUES (?, ?, ?, ?, 'Active')''',
                          (user['id'], commodity, target_price, alert_type.lower()))
-                conn.commit()
-                conn.close()
                 
                 st.success(f"Alert created! You'll be notified when {commodity} price goes {alert_type.lower()} ₹{target_price}")
                 log_activity(user['id'], "Price Alert Created", commodity, 0, 
                             {"target_price": target_price, "type": alert_type})
+                writer.flush()
                 st.rerun()
         
         # Show AI price trend analysis
@@ -2951,7 +2219,7 @@ def show_price_alert_system():
                 
                 Be specific to Maharashtra markets and current season."""
                 
-                response = get_ai_response(prompt)
+                response = get_ai_response(prompt, feature="market_trends")
                 st.markdown('<div class="ai-card">', unsafe_allow_html=True)
                 st.markdown("### Market Trends & Insights")
                 st.markdown(response)
@@ -2987,7 +2255,7 @@ def show_best_time_to_sell():
             crop_info = CROP_DATABASE[crop]
             current_price_range = crop_info.get("market_price_range", "₹2000")
             
-            prompt = f"""As an agricultural market expert, provide comprehensive selling strategy:
+            prompt = f"""Selling strategy for this harvest:
             
             Crop Details:
             - Crop: {crop}
@@ -2999,36 +2267,11 @@ def show_best_time_to_sell():
             
             Farmer's Situation:
             - Storage: {storage_capacity}
-            - Urgency: {urgency}
-            
-            Provide detailed analysis:
-            1. IMMEDIATE RECOMMENDATION: Sell now vs wait? (Clear yes/no with reasoning)
-            2. Optimal selling timeline:
-               - Best case scenario
-               - Good scenario
-               - Acceptable scenario
-            3. Expected price trends for next 3-6 months with reasoning
-            4. Price targets to aim for (realistic based on quality and market)
-            5. Specific APMC mandis in Maharashtra with best rates for this crop
-            6. Storage vs immediate sale cost-benefit analysis
-            7. Risk factors to consider (market glut, weather, government policies)
-            8. Alternative selling channels (FPOs, contract farming, direct buyers)
-            9. Negotiation tips for getting best prices
-            10. Documentation and quality certification recommendations
-            
-            Consider:
-            - Current season and supply situation
-            - Upcoming festivals/events affecting demand
-            - Export opportunities if any
-            - Government procurement prices
-            
-            Be specific, actionable, and realistic about Maharashtra market conditions."""
-            
-            response = get_ai_response(prompt)
+            - Urgency: {urgency}"""
             
             st.markdown('<div class="success-card">', unsafe_allow_html=True)
             st.markdown("### Your Personalized Selling Strategy")
-            st.markdown(response)
+            st.write_stream(stream_ai_response(prompt, feature="selling_strategy"))
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Additional insights
@@ -3304,7 +2547,7 @@ Be specific with Indian product names and practical solutions."""
 
                 client = get_anthropic_client()
                 if client:
-                    response = get_ai_response(prompt)
+                    response = get_ai_response(prompt, feature="disease_diagnosis")
                     st.markdown('<div class="ai-card">', unsafe_allow_html=True)
                     st.markdown("### AI Diagnosis")
                     st.markdown(response)
@@ -3355,7 +2598,7 @@ def show_government_schemes():
                     
                     Be specific to Maharashtra and include actual website URLs where applicable."""
                     
-                    response = get_ai_response(prompt)
+                    response = get_ai_response(prompt, feature="government_schemes")
                     st.markdown('<div class="ai-card">', unsafe_allow_html=True)
                     st.markdown(response)
                     st.markdown('</div>', unsafe_allow_html=True)
@@ -3455,7 +2698,7 @@ def show_loan_calculator():
             8. What to do if loan is rejected
             """
             
-            response = get_ai_response(prompt)
+            response = get_ai_response(prompt, feature="loan_advice")
             st.markdown('<div class="ai-card">', unsafe_allow_html=True)
             st.markdown(response)
             st.markdown('</div>', unsafe_allow_html=True)
@@ -3549,14 +2792,7 @@ def show_equipment_rental():
         equipment_type = st.selectbox("Equipment Needed", 
             ["Tractor", "Harvester", "Sprayer", "Seed Drill", "Rotavator", "Thresher", "Other"])
         
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
-        c.execute('''SELECT equipment_type, provider_name, provider_contact, location, 
-                     daily_rate, hourly_rate, availability FROM equipment_rentals 
-                     WHERE district=? AND equipment_type=? AND availability='Available' ''',
-                 (user['district'], equipment_type))
-        equipment = c.fetchall()
-        conn.close()
+        equipment = db.query(queries.AVAILABLE_EQUIPMENT, (user['district'], equipment_type))
         
         if equipment:
             for eq in equipment:
@@ -3592,17 +2828,14 @@ def show_equipment_rental():
             submitted = st.form_submit_button("List Equipment", use_container_width=True, type="primary")
             
             if submitted and provider_name and provider_contact:
-                conn = sqlite3.connect('krishimitra.db')
-                c = conn.cursor()
-                c.execute('''INSERT INTO equipment_rentals 
+                writer.submit('''INSERT INTO equipment_rentals 
                             (equipment_type, provider_name, provider_contact, location, district, 
                              daily_rate, hourly_rate, availability)
                             VALUES (?, ?, ?, ?, ?, ?, ?, 'Available')''',
                          (eq_type, provider_name, provider_contact, location, user['district'],
                           daily_rate, hourly_rate if hourly_rate > 0 else None))
-                conn.commit()
-                conn.close()
                 st.success("Equipment listed successfully!")
+                writer.flush()
                 st.rerun()
 
 def show_buyer_connect():
@@ -3616,24 +2849,16 @@ def show_buyer_connect():
         
         crop_filter = st.multiselect("Filter by Commodity", list(CROP_DATABASE.keys()))
         
-        conn = sqlite3.connect('krishimitra.db')
-        c = conn.cursor()
-        c.execute('''SELECT buyer_name, buyer_type, commodities_interested, contact_number, 
-                     minimum_quantity, payment_terms FROM buyer_connections 
-                     WHERE active=1 AND district=?''', (user['district'],))
-        buyers = c.fetchall()
-        conn.close()
+        buyers = db.query(queries.district_buyers(crop_filter), [user['district']] + crop_filter)
         
         if buyers:
             for buyer in buyers:
-                commodities = buyer[2].split(',')
-                if not crop_filter or any(c in commodities for c in crop_filter):
-                    with st.expander(f"{buyer[0]} - {buyer[1]}"):
-                        st.write(f"**Interested in:** {buyer[2]}")
-                        st.write(f"**Minimum Quantity:** {buyer[4]} quintals")
-                        st.write(f"**Payment Terms:** {buyer[5]}")
-                        if st.button(f"Contact {buyer[0]}", key=f"contact_{buyer[0]}"):
-                            st.info(f"Phone: {buyer[3]}")
+                with st.expander(f"{buyer[0]} - {buyer[1]}"):
+                    st.write(f"**Interested in:** {buyer[2]}")
+                    st.write(f"**Minimum Quantity:** {buyer[4]} quintals")
+                    st.write(f"**Payment Terms:** {buyer[5]}")
+                    if st.button(f"Contact {buyer[0]}", key=f"contact_{buyer[0]}"):
+                        st.info(f"Phone: {buyer[3]}")
         else:
             st.info("No active buyers in your district currently")
     
@@ -3655,16 +2880,15 @@ def show_buyer_connect():
             submitted = st.form_submit_button("Register", use_container_width=True, type="primary")
             
             if submitted and buyer_name and contact:
-                conn = sqlite3.connect('krishimitra.db')
-                c = conn.cursor()
-                c.execute('''INSERT INTO buyer_connections 
-                            (buyer_name, buyer_type, commodities_interested, contact_number, 
-                             email, district, minimum_quantity, payment_terms, active)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)''',
-                         (buyer_name, buyer_type, ','.join(commodities), contact, email,
-                          user['district'], min_qty, payment_terms))
-                conn.commit()
-                conn.close()
+                with db.connection() as conn:
+                    buyer_id = conn.execute('''INSERT INTO buyer_connections 
+                                (buyer_name, buyer_type, commodities_interested, contact_number, 
+                                 email, district, minimum_quantity, payment_terms, active)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)''',
+                             (buyer_name, buyer_type, ','.join(commodities), contact, email,
+                              user['district'], min_qty, payment_terms)).lastrowid
+                    conn.executemany(queries.INSERT_BUYER_COMMODITY,
+                                     [(buyer_id, commodity) for commodity in commodities])
                 st.success("Registered successfully! Farmers can now see your details.")
                 st.rerun()
 
@@ -3723,7 +2947,7 @@ def show_crop_rotation():
             
             Be specific to Maharashtra climate and market conditions."""
             
-            response = get_ai_response(prompt)
+            response = get_ai_response(prompt, feature="crop_rotation")
             st.markdown('<div class="ai-card">', unsafe_allow_html=True)
             st.markdown("### Your 3-Year Rotation Plan")
             st.markdown(response)
@@ -3788,7 +3012,7 @@ def show_expert_connect():
                 
                 Be practical, specific, and considerate of Indian farming conditions."""
                 
-                response = get_ai_response(prompt)
+                response = get_ai_response(prompt, feature="expert_advice")
                 st.markdown('<div class="ai-card">', unsafe_allow_html=True)
                 st.markdown("### Expert Advice")
                 st.markdown(response)
@@ -3828,20 +3052,34 @@ def show_activity_history():
     st.markdown("### Activity History")
     user = st.session_state.user_data
     
-    activities = get_user_activities(user['id'], limit=50)
+    search_text = st.text_input("Search your history", placeholder="e.g., drip irrigation rice last 90 days",
+                                key="activity_search")
+    if search_text:
+        found_activities, found_notes = search_user_history(user['id'], search_text)
+        if found_activities:
+            st.dataframe(pd.DataFrame(found_activities, columns=['Activity', 'Crop', 'Area', 'Data', 'Date']),
+                         use_container_width=True)
+        if found_notes:
+            st.markdown("#### Matching Crop Notes")
+            st.dataframe(pd.DataFrame(found_notes, columns=['Crop', 'Sowing Date', 'Stage', 'Health', 'Notes']),
+                         use_container_width=True)
+        if not found_activities and not found_notes:
+            st.info("No matching activities or notes")
+    
+    date_range = st.date_input("Date Range", 
+                               value=(datetime.now().date() - timedelta(days=30), datetime.now().date()))
+    if len(date_range) != 2:
+        st.info("Select a start and end date")
+        return
+    activities = get_activity_history(user['id'], *date_range)
     
     if activities:
         df = pd.DataFrame(activities, columns=['Activity', 'Crop', 'Area', 'Data', 'Date'])
         
         # Filter options
-        col1, col2 = st.columns(2)
-        with col1:
-            activity_filter = st.multiselect("Filter by Activity Type", 
-                                            df['Activity'].unique(), 
-                                            default=df['Activity'].unique())
-        with col2:
-            date_range = st.date_input("Date Range", 
-                                       value=(datetime.now() - timedelta(days=30), datetime.now()))
+        activity_filter = st.multiselect("Filter by Activity Type", 
+                                        df['Activity'].unique(), 
+                                        default=df['Activity'].unique())
         
         # Apply filters
         filtered_df = df[df['Activity'].isin(activity_filter)]
@@ -3862,7 +3100,122 @@ def show_activity_history():
                          title="Activities by Crop")
             st.plotly_chart(fig2, use_container_width=True)
     else:
-        st.info("No activities yet. Start using the platform features!")
+        st.info("No activities in this period. Start using the platform features!")
+
+def show_system_status():
+    """Ops view of upstream health, caches and the write queue (admins only)"""
+    st.markdown("### System Status")
+    
+    st.markdown("#### Upstream Circuit Breakers")
+    breakers = breaker.snapshots()
+    if breakers:
+        df = pd.DataFrame(breakers)
+        df['state'] = df['state'].map({breaker.CLOSED: "🟢 closed", breaker.HALF_OPEN: "🟡 half-open",
+                                       breaker.OPEN: "🔴 open"})
+        st.dataframe(df, use_container_width=True)
+    else:
+        st.info("No upstream calls made by this server process yet")
+    
+    st.markdown("#### CEDA Price Ingest")
+    ingest_stats = ingest.stats()
+    if ingest_stats['runs']:
+        cache_stats = ceda.cache_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Last Run", datetime.fromtimestamp(ingest_stats['last_run_at']).strftime('%d %b %H:%M'))
+        with col2:
+            st.metric("Rows Stored", ingest_stats['last_rows'])
+        with col3:
+            st.metric("Commodities Missing", len(ingest_stats['last_missing']))
+        with col4:
+            st.metric("Cached Failures", cache_stats['negative_stores'])
+        st.json({"ingest": ingest_stats, "cache": cache_stats})
+    else:
+        st.info("No CEDA ingest has run in this server process yet")
+    
+    st.markdown("#### HTTP Client")
+    st.json(http_client.stats())
+
+    st.markdown("#### AI Response Cache")
+    ai_stats = ai_cache.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Hit Ratio", f"{ai_stats['hit_ratio']:.0%}")
+    with col2:
+        st.metric("Entries", ai_stats['entries'])
+    with col3:
+        st.metric("Evictions", ai_stats['evictions'])
+    with col4:
+        st.metric("Chat (uncached)", ai_stats['bypassed'])
+    if st.button("Clear AI Cache"):
+        ai_cache.invalidate()
+        st.success("AI response cache cleared")
+
+    st.markdown("#### Precomputed Stage Advisories")
+    advisory_count = db.query_one("SELECT COUNT(*) FROM stage_advisories")[0]
+    st.metric("Advisories Stored", f"{advisory_count} / {len(advisories.enumerate_keys())}")
+    batches = db.query('''SELECT batch_id, datetime(submitted_at, 'unixepoch') AS submitted, requests, status,
+                          succeeded, failed FROM advisory_batches ORDER BY submitted_at DESC LIMIT 5''')
+    if batches:
+        st.dataframe(pd.DataFrame(batches, columns=['Batch', 'Submitted (UTC)', 'Requests', 'Status',
+                                                    'Succeeded', 'Failed']), use_container_width=True)
+    else:
+        st.info("No advisory batches yet. Run `python advisories.py` to generate them.")
+
+    st.markdown("#### AI Gateway")
+    gateway_stats = ai_gateway.gateway.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("In Flight", f"{gateway_stats['in_flight']} / {ai_gateway.gateway.max_concurrency}")
+    with col2:
+        st.metric("Queued", gateway_stats['queued'])
+    with col3:
+        wait_p95 = gateway_stats['queue_wait_p95_s']
+        st.metric("Queue Wait p95", f"{wait_p95:.1f}s" if wait_p95 is not None else "–")
+    with col4:
+        service_p95 = gateway_stats['service_time_p95_s']
+        st.metric("Service Time p95", f"{service_p95:.1f}s" if service_p95 is not None else "–")
+    st.json(gateway_stats)
+
+    st.markdown("#### AI Latency")
+    ai_latency = ai_metrics.snapshot()
+    if ai_latency:
+        st.dataframe(pd.DataFrame(ai_latency), use_container_width=True)
+    else:
+        st.info("No AI requests served by this server process yet")
+    
+    st.markdown("#### Write-Behind Queue")
+    write_stats = writer.metrics()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Queue Depth", write_stats['queue_depth'])
+    with col2:
+        st.metric("Rows Written", write_stats['rows'])
+    with col3:
+        st.metric("Dropped Writes", write_stats['errors'])
+    st.json(write_stats)
+    
+    st.markdown("#### Bulk Price Import")
+    st.caption("AGMARKNET-style CSV/XLSX export: market, commodity, min/max/modal price and price date columns")
+    upload = st.file_uploader("Price export", type=["csv", "xlsx"], key="price_import_upload")
+    if upload is not None and st.button("Import Prices", type="primary"):
+        progress_text = st.empty()
+        
+        def report(summary):
+            progress_text.info(f"{summary['rows_read']:,} rows read, {summary['rows_imported']:,} imported "
+                               f"({summary['rows_per_sec']:,.0f} rows/s)")
+        
+        try:
+            with st.spinner("Importing..."):
+                result = price_import.import_prices(upload, upload.name, progress=report)
+        except price_import.ImportFormatError as e:
+            st.error(f"Cannot import this file: {e}")
+        else:
+            report(result)
+            st.success(f"Imported {result['rows_imported']:,} prices in {result['seconds']:.1f}s "
+                       f"({result['duplicates']:,} duplicates collapsed)")
+            if result['skipped']:
+                st.dataframe(pd.DataFrame(sorted(result['skipped'].items()), columns=['Reason', 'Rows skipped']))
 # Continue in next message due to length...
 # Due to character limit, I'll continue in the format but need to note:
 # The full version would be 2400+ lines with ALL page functions fully implemented
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """A freshly migrated database file, used by ``db`` for the test's duration"""
+    path = str(tmp_path / "krishimitra.db")
+    monkeypatch.setattr(db, "DB_PATH", path)
+    monkeypatch.setattr(db, "_pool", db.ConnectionPool(path))
+    monkeypatch.setattr(db, "_schema_ready", False)
+    db.ensure_schema()
+    yield path
+    db._pool.close()
@@ -0,0 +1,37 @@
+import advisories
+import db
+
+
+def test_precompute_collects_then_skips_fresh_advisories(temp_db):
+    client = advisories.FakeBatchClient()
+    expected = len(advisories.stages("Onion"))
+    assert advisories.precompute(client, ["Onion"], ["Nashik"]) == (expected, 0)
+    assert advisories.precompute(client, ["Onion"], ["Nashik"]) == (0, 0)
+
+    stage = advisories.stages("Onion")[0]["stage"]
+    advisory, generated_at = advisories.get_advisory("Onion", stage, "Nashik")
+    assert "Crop: Onion" in advisory and stage in advisory
+    batches = db.query("SELECT requests, status, succeeded, failed FROM advisory_batches")
+    assert batches == [(expected, "collected", expected, 0)]
+
+
+def test_refresh_and_stale_advisories_are_regenerated(temp_db):
+    client = advisories.FakeBatchClient()
+    expected = len(advisories.stages("Onion"))
+    advisories.precompute(client, ["Onion"], ["Nashik"])
+    assert advisories.precompute(client, ["Onion"], ["Nashik"], refresh=True) == (expected, 0)
+    assert advisories.precompute(client, ["Onion"], ["Nashik"], max_age_days=0) == (expected, 0)
+    assert db.query_one("SELECT COUNT(*) FROM stage_advisories")[0] == expected
+
+
+def test_unknown_results_are_counted_as_failed(temp_db):
+    client = advisories.FakeBatchClient()
+    keys = advisories.enumerate_keys(["Onion"], ["Nashik"])
+    batch_id = advisories.submit(client, keys)
+    assert advisories.collect(client, batch_id, keys[1:]) == (len(keys) - 1, 1)
+
+
+def test_custom_ids_fit_the_batch_api():
+    ids = {advisories.custom_id(*key) for key in advisories.enumerate_keys()}
+    assert len(ids) == len(advisories.enumerate_keys())
+    assert all(len(i) <= 64 and i.replace("-", "").replace("_", "").isalnum() for i in ids)
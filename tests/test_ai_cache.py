@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pytest
+
+import ai_cache
+import db
+
+
+@pytest.fixture
+def clock(temp_db, monkeypatch):
+    """Controls ``time.time()`` as seen by ai_cache; starts with fresh counters"""
+    now = SimpleNamespace(value=1_700_000_000.0)
+    monkeypatch.setattr(ai_cache, "time", SimpleNamespace(time=lambda: now.value))
+    monkeypatch.setattr(ai_cache, "_stats", dict.fromkeys(ai_cache._stats, 0))
+    return now
+
+
+def test_entries_expire_after_the_feature_ttl(clock):
+    ai_cache.store("k", "price_analysis", "model", "answer")
+    clock.value += ai_cache.FEATURE_TTLS["price_analysis"] - 1
+    assert ai_cache.lookup("k") == "answer"
+    clock.value += 1
+    assert ai_cache.lookup("k") is None
+
+
+def test_chat_is_never_cached(clock):
+    assert ai_cache.lookup_request("chat", "hello", "system", "model") == (None, None)
+    ai_cache.store(ai_cache.make_key("hello", "system", "model"), "chat", "model", "answer")
+    assert db.query_one("SELECT COUNT(*) FROM ai_response_cache")[0] == 0
+    assert ai_cache.stats()["bypassed"] == 1
+
+
+def test_key_ignores_whitespace():
+    assert ai_cache.make_key("rice  yield\n", "sys", "m") == ai_cache.make_key(" rice yield", "sys", "m")
+    assert ai_cache.make_key("rice yield", "sys", "m") != ai_cache.make_key("rice yield", "sys", "other")
+
+
+def test_store_evicts_the_least_recently_used(clock, monkeypatch):
+    monkeypatch.setattr(ai_cache, "MAX_ENTRIES", 2)
+    ai_cache.store("a", "crop_care", "model", "A")
+    clock.value += 1
+    ai_cache.store("b", "crop_care", "model", "B")
+    clock.value += 1
+    assert ai_cache.lookup("a") == "A"
+    clock.value += 1
+    ai_cache.store("c", "crop_care", "model", "C")
+    keys = [row[0] for row in db.query("SELECT key FROM ai_response_cache ORDER BY key")]
+    assert keys == ["a", "c"]
+    assert ai_cache.stats()["evictions"] == 1
+
+
+def test_lookup_counts_hits_and_misses(clock):
+    ai_cache.store("k", "crop_care", "model", "answer")
+    ai_cache.lookup("k")
+    ai_cache.lookup("k")
+    ai_cache.lookup("missing")
+    assert db.query_one("SELECT hits FROM ai_response_cache WHERE key = 'k'")[0] == 2
+    stats = ai_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
@@ -0,0 +1,209 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import ai_gateway
+import ratelimit
+
+UNLIMITED = (1000.0, 1000)
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class FakeClient:
+    """``messages.create`` runs ``behaviour(**params)`` and records each call"""
+
+    def __init__(self, behaviour=None):
+        self.behaviour = behaviour or (lambda **params: "ok")
+        self.calls = []
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, timeout=None, **params):
+        self.calls.append((params.get("who"), timeout))
+        return self.behaviour(**params)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(temp_db, monkeypatch):
+    monkeypatch.setattr(ai_gateway, "backoff", lambda attempt: 0.0)
+
+
+def test_queued_users_are_served_round_robin():
+    gateway = ai_gateway.Gateway(max_concurrency=1, user_limits=UNLIMITED)
+    release = threading.Event()
+    served = []
+
+    def behaviour(who):
+        if who == "holder":
+            release.wait(5)
+        served.append(who)
+
+    client = FakeClient(behaviour)
+    threads = []
+
+    def call(user):
+        thread = threading.Thread(target=gateway.create, args=(client, user), kwargs={"who": user})
+        thread.start()
+        threads.append(thread)
+
+    call("holder")
+    wait_until(lambda: gateway.stats()["in_flight"] == 1)
+    for expected, user in enumerate(["heavy", "heavy", "heavy", "a", "b"], start=1):
+        call(user)
+        wait_until(lambda: gateway.stats()["queued"] == expected)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert served == ["holder", "heavy", "a", "b", "heavy", "heavy"]
+
+
+def test_busy_when_no_slot_frees_in_time():
+    gateway = ai_gateway.Gateway(max_concurrency=1, user_limits=UNLIMITED, max_queue_wait=0.1)
+    release = threading.Event()
+    client = FakeClient(lambda who: release.wait(5))
+    holder = threading.Thread(target=gateway.create, args=(client, "holder"), kwargs={"who": "holder"})
+    holder.start()
+    wait_until(lambda: gateway.stats()["in_flight"] == 1)
+    with pytest.raises(ai_gateway.GatewayBusy):
+        gateway.create(client, "late", who="late")
+    release.set()
+    holder.join(5)
+    stats = gateway.stats()
+    assert (stats["busy"], stats["queued"], stats["in_flight"]) == (1, 0, 0)
+
+
+def test_user_budget_is_enforced():
+    gateway = ai_gateway.Gateway(user_limits=(0.001, 2))
+    client = FakeClient()
+    gateway.create(client, "farmer")
+    gateway.create(client, "farmer")
+    with pytest.raises(ratelimit.RateLimited):
+        gateway.create(client, "farmer")
+    assert gateway.stats()["user_limited"] == 1
+
+
+def test_overloaded_answers_are_retried():
+    answers = [APIStatusError(529), APIStatusError(429), "done"]
+
+    def behaviour(who):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    gateway = ai_gateway.Gateway(user_limits=UNLIMITED)
+    assert gateway.create(FakeClient(behaviour), "farmer", who="farmer") == "done"
+    stats = gateway.stats()
+    assert (stats["retries"], stats["errors"], stats["in_flight"]) == (2, 0, 0)
+
+
+def test_other_errors_and_exhausted_retries_raise():
+    gateway = ai_gateway.Gateway(user_limits=UNLIMITED, max_retries=2)
+    bad_request = FakeClient(lambda who: (_ for _ in ()).throw(APIStatusError(400)))
+    with pytest.raises(APIStatusError):
+        gateway.create(bad_request, "farmer", who="farmer")
+    assert len(bad_request.calls) == 1
+
+    overloaded = FakeClient(lambda who: (_ for _ in ()).throw(APIStatusError(529)))
+    with pytest.raises(APIStatusError):
+        gateway.create(overloaded, "farmer", who="farmer")
+    assert len(overloaded.calls) == 3
+    assert gateway.stats()["errors"] == 2
+
+
+def test_retry_after_past_the_deadline_gives_up_without_sleeping():
+    gateway = ai_gateway.Gateway(user_limits=UNLIMITED, deadline=1.0)
+    client = FakeClient(lambda who: (_ for _ in ()).throw(APIStatusError(429, retry_after=30)))
+    started = time.monotonic()
+    with pytest.raises(APIStatusError):
+        gateway.create(client, "farmer", who="farmer")
+    assert time.monotonic() - started < 0.5
+    assert len(client.calls) == 1
+    assert client.calls[0][1] <= 1.0
+
+
+def test_time_spent_queueing_comes_off_the_request_timeout():
+    gateway = ai_gateway.Gateway(max_concurrency=1, user_limits=UNLIMITED, deadline=2.0)
+    client = FakeClient(lambda who: time.sleep(0.5) if who == "holder" else "ok")
+    holder = threading.Thread(target=gateway.create, args=(client, "holder"), kwargs={"who": "holder"})
+    holder.start()
+    wait_until(lambda: gateway.stats()["in_flight"] == 1)
+    assert gateway.create(client, "late", who="late") == "ok"
+    holder.join(5)
+    (late_timeout,) = [timeout for who, timeout in client.calls if who == "late"]
+    assert late_timeout <= 1.6
+
+
+def test_deadline_spent_in_the_queue_gives_the_slot_back():
+    gateway = ai_gateway.Gateway(max_concurrency=1, user_limits=UNLIMITED, deadline=0.2)
+    client = FakeClient(lambda who: time.sleep(0.4) if who == "holder" else "ok")
+    holder = threading.Thread(target=gateway.create, args=(client, "holder"), kwargs={"who": "holder"})
+    holder.start()
+    wait_until(lambda: gateway.stats()["in_flight"] == 1)
+    with pytest.raises(ai_gateway.GatewayTimeout):
+        gateway.create(client, "late", who="late")
+    holder.join(5)
+    assert [who for who, _ in client.calls] == ["holder"]
+    stats = gateway.stats()
+    assert (stats["timeouts"], stats["in_flight"]) == (1, 0)
+
+
+def test_slot_is_free_while_backing_off():
+    gateway = ai_gateway.Gateway(max_concurrency=1, user_limits=UNLIMITED)
+    finished = []
+    first = [True]
+
+    def behaviour(who):
+        if who == "retrying" and first:
+            first.pop()
+            raise APIStatusError(529, retry_after=0.5)
+        finished.append(who)
+
+    client = FakeClient(behaviour)
+    retrying = threading.Thread(target=gateway.create, args=(client, "retrying"), kwargs={"who": "retrying"})
+    retrying.start()
+    wait_until(lambda: gateway.stats()["retries"] == 1)
+    assert gateway.stats()["in_flight"] == 0
+    gateway.create(client, "other", who="other")
+    retrying.join(5)
+    assert finished == ["other", "retrying"]
+
+
+def test_stream_holds_the_slot_until_closed():
+    class Manager:
+        exited = None
+
+        def __enter__(self):
+            return iter(["a", "b"])
+
+        def __exit__(self, *exc_info):
+            Manager.exited = exc_info[0]
+            return False
+
+    client = SimpleNamespace(messages=SimpleNamespace(stream=lambda timeout=None, **params: Manager()))
+    gateway = ai_gateway.Gateway(user_limits=UNLIMITED)
+    with gateway.stream(client, "farmer") as stream:
+        assert list(stream) == ["a", "b"]
+        assert gateway.stats()["in_flight"] == 1
+    assert gateway.stats()["in_flight"] == 0
+
+    with pytest.raises(KeyError):
+        with gateway.stream(client, "farmer"):
+            raise KeyError("page abandoned")
+    assert Manager.exited is KeyError
+    assert gateway.stats()["in_flight"] == 0
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+import breaker
+
+
+def trip(circuit):
+    for _ in range(circuit.failure_threshold):
+        circuit.before_call()
+        circuit.record_failure("boom")
+
+
+def test_opens_after_consecutive_failures():
+    circuit = breaker.CircuitBreaker("upstream", failure_threshold=3, reset_timeout=60)
+    circuit.record_failure()
+    circuit.record_success()
+    circuit.record_failure()
+    circuit.record_failure()
+    assert circuit.snapshot()["state"] == breaker.CLOSED
+    circuit.record_failure("boom")
+    with pytest.raises(breaker.CircuitOpen):
+        circuit.before_call()
+    snapshot = circuit.snapshot()
+    assert (snapshot["state"], snapshot["last_error"], snapshot["short_circuits"]) == (breaker.OPEN, "boom", 1)
+
+
+def test_half_open_admits_one_trial_call():
+    circuit = breaker.CircuitBreaker("upstream", failure_threshold=2, reset_timeout=0.05)
+    trip(circuit)
+    time.sleep(0.06)
+    circuit.before_call()
+    assert circuit.snapshot()["state"] == breaker.HALF_OPEN
+    with pytest.raises(breaker.CircuitOpen):
+        circuit.before_call()
+    circuit.record_success()
+    assert circuit.snapshot()["state"] == breaker.CLOSED
+    circuit.before_call()
+
+
+def test_failed_trial_reopens_for_a_full_cool_down():
+    circuit = breaker.CircuitBreaker("upstream", failure_threshold=2, reset_timeout=0.05)
+    trip(circuit)
+    time.sleep(0.06)
+    circuit.before_call()
+    circuit.record_failure("still down")
+    assert circuit.snapshot()["state"] == breaker.OPEN
+    with pytest.raises(breaker.CircuitOpen):
+        circuit.before_call()
+    time.sleep(0.06)
+    circuit.before_call()
+
+
+def test_abandoned_trial_lets_the_next_call_try():
+    circuit = breaker.CircuitBreaker("upstream", failure_threshold=2, reset_timeout=0.05)
+    trip(circuit)
+    time.sleep(0.06)
+    circuit.before_call()
+    circuit.abandon()
+    assert circuit.snapshot()["state"] == breaker.OPEN
+    # No new cool-down: the trial never reached the endpoint.
+    circuit.before_call()
+    assert circuit.snapshot()["state"] == breaker.HALF_OPEN
+
+
+def test_abandon_leaves_a_closed_breaker_alone():
+    circuit = breaker.CircuitBreaker("upstream")
+    circuit.before_call()
+    circuit.abandon()
+    assert circuit.snapshot()["state"] == breaker.CLOSED
+
+
+def test_registry_is_per_endpoint_and_resettable():
+    breaker.reset()
+    assert breaker.get("a") is breaker.get("a")
+    assert breaker.get("a") is not breaker.get("b")
+    assert [s["endpoint"] for s in breaker.snapshots()] == ["a", "b"]
+    breaker.reset()
+    assert breaker.snapshots() == []
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+import db
+import migrations
+import queries
+
+BUYERS = [
+    # name, district, commodities_interested, active
+    ("Shinde Traders", "Nashik", "Onion, Grapes ,Tomato", 1),
+    ("Pawar Exports", "Nashik", "Grapes,,  ,Pomegranate,", 1),
+    ("Closed Mill", "Nashik", "Onion", 0),
+    ("Pune Agro", "Pune", "Onion", 1),
+    ("No List", "Nashik", None, 1),
+]
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    """Buyers written at version 6, then migrated through the junction backfill"""
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    full = migrations.MIGRATIONS
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in full if m[0] < 7])
+    db.migrate(conn)
+    conn.executemany('''INSERT INTO buyer_connections (buyer_name, district, commodities_interested, active)
+                        VALUES (?, ?, ?, ?)''', BUYERS)
+    monkeypatch.setattr(migrations, "MIGRATIONS", full)
+    db.migrate(conn)
+    yield conn
+    conn.close()
+
+
+def junction(conn):
+    return conn.execute('''SELECT b.buyer_name, c.commodity FROM buyer_commodities c
+                           JOIN buyer_connections b ON b.id = c.buyer_id
+                           ORDER BY b.buyer_name, c.commodity''').fetchall()
+
+
+def buyers(conn, district, *commodities):
+    return sorted(row[0] for row in conn.execute(queries.district_buyers(commodities), (district, *commodities)))
+
+
+def test_backfill_trims_names_and_skips_empty_segments(conn):
+    assert junction(conn) == [
+        ("Closed Mill", "Onion"),
+        ("Pawar Exports", "Grapes"), ("Pawar Exports", "Pomegranate"),
+        ("Pune Agro", "Onion"),
+        ("Shinde Traders", "Grapes"), ("Shinde Traders", "Onion"), ("Shinde Traders", "Tomato"),
+    ]
+
+
+def test_district_buyers_filters_through_the_junction(conn):
+    assert buyers(conn, "Nashik") == ["No List", "Pawar Exports", "Shinde Traders"]
+    assert buyers(conn, "Nashik", "Onion") == ["Shinde Traders"]
+    assert buyers(conn, "Nashik", "Grapes", "Tomato") == ["Pawar Exports", "Shinde Traders"]
+    assert buyers(conn, "Nashik", "Soybean") == []
+
+
+def test_deleting_a_buyer_clears_its_commodities(conn):
+    conn.execute("DELETE FROM buyer_connections WHERE buyer_name = 'Shinde Traders'")
+    assert [name for name, _ in junction(conn)].count("Shinde Traders") == 0
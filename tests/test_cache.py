@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+import cache
+
+
+def test_hits_within_ttl_and_reloads_after():
+    ttl_cache = cache.TTLCache(0.05)
+    loads = []
+    load = lambda: loads.append(1) or len(loads)
+    assert ttl_cache.get("k", load) == 1
+    assert ttl_cache.get("k", load) == 1
+    time.sleep(0.06)
+    assert ttl_cache.get("k", load) == 2
+    assert ttl_cache.stats()["hits"] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    ttl_cache = cache.TTLCache(60)
+    started, release = threading.Event(), threading.Event()
+    loads = []
+
+    def load():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(ttl_cache.get("k", load))) for _ in range(5)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while ttl_cache.stats()["coalesced"] < 4:
+        time.sleep(0.005)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["value"] * 5
+    assert len(loads) == 1
+
+
+def test_failed_load_is_shared_and_not_stored():
+    ttl_cache = cache.TTLCache(60)
+
+    def load():
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        ttl_cache.get("k", load)
+    assert ttl_cache.get("k", lambda: "recovered") == "recovered"
+    assert ttl_cache.stats()["load_errors"] == 1
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    ttl_cache = cache.TTLCache(0.05, stale_ttl=60)
+    ttl_cache.get("k", lambda: "old")
+    time.sleep(0.06)
+    release = threading.Event()
+    refreshes = []
+
+    def refresh():
+        refreshes.append(1)
+        release.wait(5)
+        return "new"
+
+    assert ttl_cache.get("k", refresh) == "old"
+    assert ttl_cache.get("k", refresh) == "old"
+    release.set()
+    while ttl_cache.stats()["inflight"]:
+        time.sleep(0.005)
+    assert ttl_cache.get("k", refresh) == "new"
+    assert len(refreshes) == 1
+    stats = ttl_cache.stats()
+    assert (stats["stale_hits"], stats["refreshes"]) == (2, 1)
+
+
+def test_allow_stale_false_reloads_a_stale_entry():
+    ttl_cache = cache.TTLCache(0.05, stale_ttl=60)
+    ttl_cache.get("k", lambda: "old")
+    time.sleep(0.06)
+    assert ttl_cache.get("k", lambda: "new", allow_stale=False) == "new"
+
+
+def test_failures_are_cached_for_the_negative_ttl():
+    ttl_cache = cache.TTLCache(60, cacheable=lambda value: value is not None, negative_ttl=0.05)
+    loads = []
+    failing = lambda: loads.append(1)
+    assert ttl_cache.get("k", failing) is None
+    assert ttl_cache.get("k", failing) is None
+    assert len(loads) == 1
+    time.sleep(0.06)
+    assert ttl_cache.get("k", lambda: "back") == "back"
+    assert ttl_cache.stats()["negative_stores"] == 1
+
+
+def test_failure_does_not_replace_a_servable_good_entry():
+    ttl_cache = cache.TTLCache(0.05, stale_ttl=60, cacheable=lambda value: value is not None, negative_ttl=60)
+    ttl_cache.get("k", lambda: "good")
+    time.sleep(0.06)
+    ttl_cache.put("k", None)
+    assert ttl_cache.get("k", lambda: "unused") == "good"
+
+
+def test_least_recently_used_entry_is_evicted():
+    ttl_cache = cache.TTLCache(60, maxsize=2)
+    ttl_cache.get("a", lambda: 1)
+    ttl_cache.get("b", lambda: 2)
+    ttl_cache.get("a", lambda: 1)
+    ttl_cache.get("c", lambda: 3)
+    assert ttl_cache.get("b", lambda: "reloaded") == "reloaded"
+    assert ttl_cache.stats()["evictions"] == 2
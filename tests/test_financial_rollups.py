@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+import db
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    db.migrate(conn)
+    yield conn
+    conn.close()
+
+
+def add(conn, user_id, amount, category="Seeds"):
+    return conn.execute('''INSERT INTO financial_records
+                           (user_id, category, amount, transaction_type, crop_related, transaction_date)
+                           VALUES (?, ?, ?, 'Expense', 'Onion', '2026-06-15')''',
+                        (user_id, category, amount)).lastrowid
+
+
+def rollups(conn):
+    return conn.execute('''SELECT user_id, category, total, entries FROM financial_rollups
+                           ORDER BY user_id, category''').fetchall()
+
+
+def test_update_moves_totals_between_keys(conn):
+    record = add(conn, 1, 100)
+    add(conn, 1, 50)
+    conn.execute("UPDATE financial_records SET category = 'Fertilizer', amount = 70 WHERE id = ?", (record,))
+    assert rollups(conn) == [(1, "Fertilizer", 70, 1), (1, "Seeds", 50, 1)]
+
+
+def test_update_to_and_from_a_missing_user(conn):
+    record = add(conn, 1, 100)
+    conn.execute("UPDATE financial_records SET user_id = NULL WHERE id = ?", (record,))
+    assert rollups(conn) == []
+    conn.execute("UPDATE financial_records SET amount = 80 WHERE id = ?", (record,))
+    assert rollups(conn) == []
+    conn.execute("UPDATE financial_records SET user_id = 2 WHERE id = ?", (record,))
+    assert rollups(conn) == [(2, "Seeds", 80, 1)]
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+import http_client
+
+URL = "https://example.org/prices"
+
+
+class StubSession:
+    """Answers ``get`` from a list of ``(status, body, headers)`` and records request headers"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.sent = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.sent.append(dict(headers or {}))
+        status, content, headers = self.answers.pop(0)
+        return SimpleNamespace(status_code=status, content=content, headers=CaseInsensitiveDict(headers))
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_client, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(http_client, "_stats", dict.fromkeys(http_client._stats, 0))
+
+    def install(*answers):
+        session = StubSession(*answers)
+        monkeypatch.setattr(http_client, "_session", session)
+        return session
+    return install
+
+
+def test_not_modified_serves_the_cached_body(stub):
+    session = stub((200, b"<table>prices</table>", {"ETag": '"v1"', "Content-Type": "text/html"}),
+                   (304, b"", {"ETag": '"v2"'}))
+    first = http_client.get(URL)
+    assert (first.status_code, first.revalidated) == (200, False)
+    fetched_at = http_client._load_cached(URL)[0]["fetched_at"]
+
+    second = http_client.get(URL)
+    assert session.sent[1]["If-None-Match"] == '"v1"'
+    assert (second.status_code, second.content, second.revalidated) == (200, b"<table>prices</table>", True)
+    assert second.headers["Content-Type"] == "text/html"
+
+    meta, body = http_client._load_cached(URL)
+    assert meta["headers"]["ETag"] == '"v2"'
+    assert meta["fetched_at"] >= fetched_at
+    assert body == b"<table>prices</table>"
+    assert http_client.stats()["not_modified"] == 1
+
+
+def test_responses_without_validators_are_not_cached(stub):
+    stub((200, b"fresh", {}), (200, b"fresher", {}))
+    assert http_client.get(URL).content == b"fresh"
+    assert http_client._load_cached(URL) == (None, None)
+    assert http_client.get(URL).content == b"fresher"
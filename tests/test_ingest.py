@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import ceda
+import db
+import ingest
+
+
+@pytest.fixture
+def scrapes(temp_db, monkeypatch):
+    """Count full-page scrapes; ``scrapes.down`` makes them fail"""
+    calls = []
+
+    def scrape_all(keyword_map=ceda.CEDA_COMMODITY_MAP):
+        calls.append(1)
+        if scrape_all.down:
+            return {commodity: (None, "Connection error.") for commodity in keyword_map}
+        frame = pd.DataFrame({"market": ["Lasalgaon"], "price": ["₹1,250"], "date": ["05/10/2026"]})
+        return {commodity: (frame, "ok") for commodity in keyword_map}
+
+    scrape_all.down = False
+    scrape_all.calls = calls
+    monkeypatch.setattr(ceda, "scrape_all_ceda_prices", scrape_all)
+    ceda.reset()
+    yield scrape_all
+    ceda.reset()
+
+
+def test_one_scrape_fills_every_commodity(scrapes):
+    hits = ceda.cache_stats()["hits"]
+    ingested = ingest.ingest_all()
+    assert len(scrapes.calls) == 1
+    assert set(ingested.values()) == {1}
+    assert db.query_one("SELECT COUNT(*) FROM price_observations WHERE source = 'ceda'")[0] == len(ingested)
+    assert ceda.cache_stats()["hits"] - hits == len(ingested) - 1
+    assert ingest.stats()["last_rows"] == len(ingested)
+
+
+def test_stale_entries_are_reloaded_not_stored(scrapes, monkeypatch):
+    monkeypatch.setattr(ceda._cache, "ttl", 0)
+    stale_hits = ceda.cache_stats()["stale_hits"]
+    ingest.ingest_all(["Onion"])
+    ingest.ingest_all(["Onion"])
+    assert len(scrapes.calls) == 2
+    assert ceda.cache_stats()["stale_hits"] == stale_hits
+
+
+def test_outage_is_scraped_once_per_negative_ttl(scrapes):
+    scrapes.down = True
+    assert set(ingest.ingest_all().values()) == {0}
+    assert set(ingest.ingest_all().values()) == {0}
+    assert len(scrapes.calls) == 1
+    assert ingest.stats()["last_missing"] == list(ceda.CEDA_COMMODITY_MAP)
+
+
+def test_concurrent_misses_share_one_scrape(scrapes, monkeypatch):
+    scrape_all = ceda.scrape_all_ceda_prices
+    monkeypatch.setattr(ceda, "scrape_all_ceda_prices", lambda: (time.sleep(0.2), scrape_all())[1])
+    threads = [threading.Thread(target=ceda.fetch_ceda_prices, args=(commodity,))
+               for commodity in ("Onion", "Wheat", "Tomato", "Rice")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(scrapes.calls) == 1
+    assert ceda._scrape_inflight is None
+
+
+def test_a_failed_pass_does_not_end_the_loop(monkeypatch):
+    passes = []
+
+    def ingest_all():
+        passes.append(1)
+        if len(passes) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return {"Onion": 1}
+
+    class Stop(BaseException):
+        pass
+
+    def sleep(seconds):
+        if len(passes) == 2:
+            raise Stop
+
+    monkeypatch.setattr(ingest, "ingest_all", ingest_all)
+    monkeypatch.setattr(ingest.time, "sleep", sleep)
+    with pytest.raises(Stop):
+        ingest._ingest_forever(60)
+    assert len(passes) == 2
@@ -0,0 +1,39 @@
+import sqlite3
+
+import pandas as pd
+
+import ceda
+import db
+import markets
+import migrations
+import queries
+
+
+def test_market_district():
+    assert markets.market_district("Lasalgaon") == "Nashik"
+    assert markets.market_district("pune market yard") == "Pune"
+    assert markets.market_district("Nagpur") == "Nagpur"
+    # Listed under both Mumbai Suburban and Thane.
+    assert markets.market_district("Kalyan") is None
+    assert markets.market_district("Pimpalgaon") is None
+
+
+def test_ceda_rows_reach_district_reads(temp_db):
+    scraped = pd.DataFrame({"market": ["Lasalgaon", "Pimpalgaon"],
+                            "price": ["₹1,250", "₹1,300"],
+                            "date": ["05/10/2026", "05/10/2026"]})
+    rows = ceda.observation_rows("Onion", scraped)
+    assert [row[1] for row in rows] == ["Nashik", None]
+    db.executemany(queries.UPSERT_PRICE_OBSERVATION, [("ceda",) + row for row in rows])
+    assert db.query_one(queries.LATEST_DISTRICT_PRICE, ("Onion", "Nashik"))[1] == "Lasalgaon"
+
+
+def test_migration_backfills_stored_ceda_districts(monkeypatch):
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 14])
+    db.migrate(conn)
+    conn.execute(queries.UPSERT_PRICE_OBSERVATION,
+                 ("ceda", "Onion", None, "Lasalgaon", "2026-10-05", 1250, 1250, 1250, None))
+    monkeypatch.undo()
+    db.migrate(conn)
+    assert conn.execute(queries.LATEST_DISTRICT_PRICE, ("Onion", "Nashik")).fetchone()[1] == "Lasalgaon"
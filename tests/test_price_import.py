@@ -0,0 +1,75 @@
+import io
+import sqlite3
+
+import db
+import price_import
+import queries
+
+HEADER = "State,District,Market,Commodity,Min Price,Max Price,Modal Price,Price Date\n"
+
+
+def dump(*rows):
+    return io.BytesIO((HEADER + "".join(row + "\n" for row in rows)).encode("utf-8"))
+
+
+def daily(conn):
+    return conn.execute('''SELECT commodity, market, day, district, low, high, modal, observations
+                           FROM price_daily ORDER BY commodity, market, day''').fetchall()
+
+
+def weekly(conn):
+    return conn.execute('''SELECT commodity, market, week_start, open, high, low, close, days
+                           FROM price_weekly ORDER BY commodity, market, week_start''').fetchall()
+
+
+def test_duplicates_collapse_within_and_across_chunks(temp_db):
+    rows = ["Maharashtra,Nashik,Lasalgaon,Onion,1000,1400,1200,01/10/2026",
+            "Maharashtra,Nashik,Lasalgaon APMC,Onion,1100,1500,1300,01/10/2026",
+            "Maharashtra,Nashik,Lasalgaon,Onion,900,1300,1100,02/10/2026",
+            "Maharashtra,Nashik,Lasalgaon,Onion,950,1350,1150,02/10/2026"]
+    summary = price_import.import_prices(dump(*rows), "prices.csv", chunk_size=2)
+    # Rows 1 and 2 meet in one chunk; row 4 lands in the next and is upserted.
+    assert (summary["rows_read"], summary["rows_imported"], summary["duplicates"]) == (4, 3, 1)
+    stored = db.query("SELECT market, day, modal_price FROM price_observations ORDER BY day")
+    # The last row for a (market, commodity, date) wins.
+    assert stored == [("Lasalgaon APMC", "2026-10-01", 1300), ("Lasalgaon APMC", "2026-10-02", 1150)]
+
+
+def test_reimport_upserts_instead_of_duplicating(temp_db):
+    rows = ["Maharashtra,Pune,Pune Market Yard,Tomato,800,1200,1000,05/10/2026"]
+    price_import.import_prices(dump(*rows), "prices.csv")
+    price_import.import_prices(dump(*rows), "prices.csv")
+    assert db.query_one("SELECT COUNT(*) FROM price_observations")[0] == 1
+
+
+def test_bad_rows_are_skipped_with_a_reason(temp_db):
+    summary = price_import.import_prices(dump(
+        "Gujarat,Surat,Surat,Onion,1000,1400,1200,01/10/2026",
+        "Maharashtra,Pune,Pune,Unobtainium,1000,1400,1200,01/10/2026",
+        "Maharashtra,Pune,Pune,Onion,1000,1400,1200,not a date",
+        "Maharashtra,Pune,Pune,Onion,1500,1400,1200,01/10/2026",
+        "Maharashtra,Pune,Pune,Onion,1000,1400,1200,01/10/2026"), "prices.csv")
+    assert summary["rows_imported"] == 1
+    assert summary["skipped"] == {"other state": 1, "unknown commodity": 1, "bad date": 1, "bad price": 1}
+
+
+def test_bulk_rollups_match_the_per_row_triggers(temp_db):
+    rows = [f"Maharashtra,Nashik,{market},Onion,{low},{low + 400},{low + 200},{day:02d}/10/2026"
+            for day in range(1, 15) for market, low in (("Lasalgaon", 900 + day * 10), ("Sinnar", 1000 - day))]
+    rows += ["Maharashtra,,Vashi,Tomato,700,900,800,03/10/2026"]
+    price_import.import_prices(dump(*rows), "prices.csv", chunk_size=5)
+
+    bulk = sqlite3.connect(temp_db)
+    per_row = sqlite3.connect(":memory:")
+    db.migrate(per_row)
+    observations = bulk.execute('''SELECT source, commodity, district, market, day, min_price, max_price,
+                                          modal_price, arrivals FROM price_observations''').fetchall()
+    for observation in observations:
+        per_row.execute(queries.UPSERT_PRICE_OBSERVATION, observation)
+
+    assert daily(bulk) == daily(per_row)
+    assert weekly(bulk) == weekly(per_row)
+    assert len(daily(bulk)) == 29
+    # Triggers are back on once the load is done.
+    assert bulk.execute("SELECT COUNT(*) FROM price_bulk_load").fetchone()[0] == 0
+    assert bulk.execute("SELECT district FROM price_daily WHERE market = 'Vashi APMC'").fetchone()[0] == "Mumbai Suburban"
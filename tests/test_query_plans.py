@@ -0,0 +1,31 @@
+import sqlite3
+
+import pytest
+
+import db
+import queries
+import tiering
+
+
+@pytest.fixture
+def conn(temp_db, tmp_path):
+    conn = sqlite3.connect(temp_db)
+    tiering.attach(conn, str(tmp_path / "archive.db"))
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("name, sql, params", queries.PLAN_CHECKS + queries.ARCHIVE_PLAN_CHECKS,
+                         ids=[check[0] for check in queries.PLAN_CHECKS + queries.ARCHIVE_PLAN_CHECKS])
+def test_query_uses_an_index(conn, name, sql, params):
+    assert queries.table_scans(conn, sql, params) == []
+
+
+def test_schema_is_current(conn):
+    from migrations import MIGRATIONS
+
+    assert db.schema_version(conn) == MIGRATIONS[-1][0]
+
+
+def test_login_lookup_is_checked():
+    assert any(sql == queries.LOGIN_USER for _, sql, _ in queries.PLAN_CHECKS)
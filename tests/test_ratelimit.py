@@ -0,0 +1,43 @@
+import pytest
+
+import db
+import ratelimit
+
+
+def tokens(key):
+    return db.query_one("SELECT tokens FROM rate_limits WHERE host = ?", (key,))[0]
+
+
+def test_burst_is_free_then_tokens_are_borrowed(temp_db):
+    limits = (10.0, 2)
+    assert ratelimit.reserve("k", limits) == 0.0
+    assert ratelimit.reserve("k", limits) == 0.0
+    # Each borrowed token waits for its own place in line.
+    assert ratelimit.reserve("k", limits) == pytest.approx(0.1, abs=0.02)
+    assert ratelimit.reserve("k", limits) == pytest.approx(0.2, abs=0.02)
+
+
+def test_refused_caller_refunds_its_token(temp_db):
+    limits = (0.01, 1)
+    ratelimit.acquire_key("k", limits)
+    before = tokens("k")
+    with pytest.raises(ratelimit.RateLimited):
+        ratelimit.acquire_key("k", limits, max_wait=1)
+    # Refused callers don't push later callers further back.
+    assert tokens("k") == pytest.approx(before, abs=0.01)
+
+
+def test_caller_within_max_wait_sleeps_for_its_slot(temp_db, monkeypatch):
+    slept = []
+    monkeypatch.setattr(ratelimit.time, "sleep", slept.append)
+    limits = (10.0, 1)
+    ratelimit.acquire_key("k", limits)
+    ratelimit.acquire_key("k", limits, max_wait=1)
+    assert slept == [pytest.approx(0.1, abs=0.02)]
+
+
+def test_keys_have_separate_buckets(temp_db):
+    limits = (0.01, 1)
+    ratelimit.reserve("ai-user:1", limits)
+    assert ratelimit.reserve("ai-user:2", limits) == 0.0
+    assert ratelimit.reserve("ai-user:1", limits) > 0
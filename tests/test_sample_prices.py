@@ -0,0 +1,46 @@
+from datetime import date
+
+import pandas as pd
+
+import sample_prices
+from agri_data import CROP_DATABASE, get_nearest_mandis
+
+END = date(2024, 3, 15)
+
+
+def test_same_inputs_give_the_same_frame():
+    first = sample_prices.generate_sample_prices("Onion", ["Pune", "Nashik"], days=10, end=END)
+    second = sample_prices.generate_sample_prices("Onion", ["Pune", "Nashik"], days=10, end=END)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_one_row_per_day_and_mandi_newest_first():
+    frame = sample_prices.generate_sample_prices("Onion", "Pune", days=3, end=END)
+    mandis = get_nearest_mandis("Pune")
+    assert len(frame) == 3 * len(mandis)
+    assert frame["date"].iloc[0] == pd.Timestamp(END)
+    assert frame["date"].is_monotonic_decreasing
+    assert set(frame["market"]) == set(mandis)
+
+
+def test_column_types():
+    frame = sample_prices.generate_sample_prices("Onion", days=2, end=END)
+    for column in ("commodity", "district", "market", "source"):
+        assert isinstance(frame[column].dtype, pd.CategoricalDtype), column
+    for column in ("min_price", "max_price", "modal_price"):
+        assert frame[column].dtype == "int32", column
+    assert pd.api.types.is_datetime64_dtype(frame["date"])
+
+
+def test_prices_stay_within_ten_percent_of_the_crop_range():
+    commodity = next(iter(CROP_DATABASE))
+    low, high = sample_prices.base_range(commodity)
+    frame = sample_prices.generate_sample_prices(commodity, days=30, end=END)
+    assert frame["min_price"].min() >= round(low * 0.9)
+    assert frame["max_price"].max() <= round(high * 1.09)
+    assert (frame["min_price"] <= frame["modal_price"]).all()
+    assert (frame["modal_price"] <= frame["max_price"]).all()
+
+
+def test_unknown_crop_falls_back_to_the_default_range():
+    assert sample_prices.base_range("Dragonfruit") == sample_prices.DEFAULT_RANGE
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+import db
+import queries
+
+
+def report(pest, description, days_ago=0, crop="Cotton"):
+    alert_date = time.strftime("%Y-%m-%d", time.gmtime(time.time() - days_ago * 86400))
+    db.execute('''INSERT INTO pest_alerts (district, crop_name, pest_disease, severity, alert_date, description)
+                  VALUES ('Pune', ?, ?, 'High', ?, ?)''', (crop, pest, alert_date, description))
+
+
+def search(text):
+    match, days = queries.fts_search(text)
+    return [row[1] for row in db.query(queries.SEARCH_PEST_REPORTS, (match, days, 50))]
+
+
+def test_last_n_days_becomes_the_window():
+    assert queries.fts_search("whitefly last 30 days") == ('"whitefly"*', 30)
+    assert queries.fts_search("Past 1 day") == (None, 1)
+    assert queries.fts_search("whitefly") == ('"whitefly"*', queries.ALL_TIME_DAYS)
+
+
+def test_embedded_quotes_are_doubled():
+    assert queries._fts_prefix('a"b') == '"a""b"*'
+
+
+@pytest.mark.parametrize("text", ['"whitefly', "whitefly -cotton", "whitefly*", "(whitefly) cotton",
+                                  "whitefl*(cott", "whitefly: cotton ^ +", "'whitefly'"])
+def test_punctuation_is_not_query_syntax(temp_db, text):
+    report("Whitefly", "Whitefly colonies on cotton leaves")
+    assert search(text) == ["Whitefly"]
+
+
+def test_operators_are_plain_words(temp_db):
+    report("Whitefly", "Whitefly colonies on cotton leaves")
+    report("Aphids", "Aphid colonies on cotton leaves")
+    assert search("whitefly OR aphids") == []
+    assert search("NEAR(whitefly aphids)") == []
+
+
+def test_words_match_as_prefixes(temp_db):
+    report("Whitefly", "Sticky honeydew on leaves")
+    report("Pink bollworm", "Rosette flowers")
+    assert search("whitefl") == ["Whitefly"]
+    assert search("boll rosett") == ["Pink bollworm"]
+    assert search("whitefly rosette") == []
+
+
+def test_date_window_drops_older_reports(temp_db):
+    report("Whitefly", "recent", days_ago=5)
+    report("Whitefly old", "older", days_ago=60)
+    assert sorted(search("whitefly")) == ["Whitefly", "Whitefly old"]
+    assert search("whitefly last 30 days") == ["Whitefly"]
+
+
+def test_pest_name_matches_rank_above_description_matches(temp_db):
+    report("Aphids", "Check for thrips under the leaves as well")
+    report("Thrips", "Silvering on onion leaves")
+    assert search("thrips") == ["Thrips", "Aphids"]
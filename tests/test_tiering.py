@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+import db
+import queries
+import tiering
+
+
+@pytest.fixture
+def archive(temp_db, tmp_path):
+    return str(tmp_path / "archive.db")
+
+
+def log(user_id, created_at, activity="Sowing"):
+    db.execute("INSERT INTO activities (user_id, activity_type, created_at) VALUES (?, ?, ?)",
+               (user_id, activity, created_at))
+
+
+def activity_count(user_id):
+    return db.query_one("SELECT activity_count FROM user_stats WHERE user_id = ?", (user_id,))[0]
+
+
+def test_old_rows_move_to_the_archive(archive):
+    log(1, "2020-01-05 08:00:00", "Old")
+    log(1, "2020-02-05 08:00:00", "Older")
+    log(1, tiering.hot_cutoff(0) + " 08:00:00", "Recent")
+    assert tiering.archive_old_rows(30, archive)["activities"] == 2
+
+    assert [row[0] for row in db.query("SELECT activity_type FROM activities")] == ["Recent"]
+    archived = sqlite3.connect(archive)
+    try:
+        assert sorted(row[0] for row in archived.execute("SELECT activity_type FROM activities")) == ["Old", "Older"]
+    finally:
+        archived.close()
+
+
+def test_history_reads_both_tiers(archive):
+    log(1, "2020-01-05 08:00:00", "Old")
+    log(1, tiering.hot_cutoff(0) + " 08:00:00", "Recent")
+    tiering.archive_old_rows(30, archive)
+    rows = tiering.query_with_archive(queries.activity_range(include_archive=True),
+                                      (1, "2020-01-01", tiering.hot_cutoff(0), 10), archive)
+    assert [row[0] for row in rows] == ["Recent", "Old"]
+
+
+def test_history_does_not_leave_a_pooled_connection_attached(archive):
+    tiering.query_with_archive("SELECT COUNT(*) FROM activities_all", (), archive)
+    with db.connection() as conn:
+        assert "archive" not in {row[1] for row in conn.execute("PRAGMA database_list")}
+
+
+def test_hot_tier_ends_at_the_watermark(archive):
+    assert tiering.in_hot_tier("activities", "2000-01-01")
+    tiering.archive_old_rows(30, archive)
+    cutoff = tiering.archived_before("activities")
+    assert cutoff == tiering.hot_cutoff(30)
+    assert tiering.in_hot_tier("activities", cutoff)
+    assert not tiering.in_hot_tier("activities", "2020-01-01")
+
+
+def test_archived_rows_still_count_in_user_stats(archive):
+    for day in range(1, 4):
+        log(7, f"2020-01-0{day} 08:00:00")
+    log(7, tiering.hot_cutoff(0) + " 08:00:00")
+    assert activity_count(7) == 4
+    tiering.archive_old_rows(30, archive)
+    assert activity_count(7) == 4
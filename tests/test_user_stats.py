@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+import db
+import migrations
+import queries
+
+SOURCES = dict(migrations._STAT_SOURCES)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    db.migrate(conn)
+    conn.executemany("INSERT INTO users (id, username, password_hash, full_name, mobile) VALUES (?, ?, '', '', '')",
+                     [(1, "farmer1"), (2, "farmer2")])
+    yield conn
+    conn.close()
+
+
+def add(conn, table, user_id):
+    return conn.execute(f"INSERT INTO {table} (user_id) VALUES (?)", (user_id,)).lastrowid
+
+
+def counted(conn, user_id):
+    row = conn.execute(queries.USER_STATS, (user_id,)).fetchone()
+    return row or (0, 0, 0, 0)
+
+
+def fresh_counts(conn, user_id):
+    return tuple(conn.execute(f"SELECT COUNT(*) FROM {table} WHERE user_id = ?", (user_id,)).fetchone()[0]
+                 for table in SOURCES)
+
+
+def test_counters_follow_inserts_and_deletes(conn):
+    ids = {table: [add(conn, table, 1) for _ in range(3)] for table in SOURCES}
+    add(conn, "activities", 2)
+    add(conn, "activities", None)
+    assert counted(conn, 1) == fresh_counts(conn, 1) == (3, 3, 3, 3)
+
+    for table, rows in ids.items():
+        conn.execute(f"DELETE FROM {table} WHERE id = ?", (rows[0],))
+    conn.execute("DELETE FROM activities WHERE user_id IS NULL")
+    assert counted(conn, 1) == fresh_counts(conn, 1) == (2, 2, 2, 2)
+    assert counted(conn, 2) == fresh_counts(conn, 2) == (1, 0, 0, 0)
+
+
+def test_counters_never_go_negative(conn):
+    add(conn, "price_alerts", 1)
+    conn.execute("UPDATE user_stats SET price_alert_count = 0 WHERE user_id = 1")
+    conn.execute("DELETE FROM price_alerts")
+    assert counted(conn, 1) == (0, 0, 0, 0)
+
+
+def test_migration_backfills_existing_rows(monkeypatch):
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    full = migrations.MIGRATIONS
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in full if m[0] < 3])
+    db.migrate(conn)
+    conn.execute("INSERT INTO users (id, username, password_hash, full_name, mobile) VALUES (1, 'f', '', '', '')")
+    for table in SOURCES:
+        add(conn, table, 1)
+    add(conn, "crop_tracking", 1)
+    monkeypatch.setattr(migrations, "MIGRATIONS", full)
+    db.migrate(conn)
+    assert counted(conn, 1) == fresh_counts(conn, 1) == (1, 2, 1, 1)
+    conn.close()
@@ -0,0 +1,40 @@
+import threading
+
+import db
+import writer
+
+
+def test_rows_commit_in_submission_order_when_the_queue_fills(temp_db, monkeypatch):
+    monkeypatch.setattr(writer, "SUBMIT_TIMEOUT", 0.05)
+    queue = writer.WriteBehindQueue(maxsize=5, max_batch=3, batch_window=0)
+    db.execute("CREATE TABLE log (seq INTEGER)")
+    sql = "INSERT INTO log (seq) VALUES (?)"
+
+    # Stall the writer thread (not the database) so the queue fills up.
+    release = threading.Event()
+    write = queue._write
+    monkeypatch.setattr(queue, "_write", lambda conn, rows: (release.wait(10), write(conn, rows)))
+    done = threading.Event()
+
+    def submit_all():
+        queue.submit_many(sql, [(i,) for i in range(40)])
+        done.set()
+
+    thread = threading.Thread(target=submit_all)
+    thread.start()
+    assert not done.wait(0.5)
+    assert queue.metrics()["full_waits"] >= 1
+
+    release.set()
+    thread.join(10)
+    assert done.is_set()
+    assert queue.flush(10)
+    assert [row[0] for row in db.query("SELECT seq FROM log ORDER BY rowid")] == list(range(40))
+
+
+def test_flush_makes_writes_visible(temp_db):
+    queue = writer.WriteBehindQueue()
+    db.execute("CREATE TABLE log (seq INTEGER)")
+    queue.submit("INSERT INTO log (seq) VALUES (?)", (1,))
+    assert queue.flush()
+    assert db.query_one("SELECT COUNT(*) FROM log")[0] == 1
@@ -0,0 +1,167 @@
+"""Hot/cold tiering for the append-only tables.
+
+Rows older than ``ARCHIVE_AFTER_DAYS`` move from the main database into a
+separate archive file that is ``ATTACH``ed only when a history view asks for
+an older range, keeping the hot database small enough to stay in cache.
+Each pass records its cutoff in ``archive_watermarks``; readers decide
+whether to attach the archive from that, not from their own setting.
+
+Run ``python tiering.py [--days N]`` from cron, or let the app start the
+daily background pass with ``start_background()``.
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+
+import db
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PATH = os.environ.get("KRISHIMITRA_ARCHIVE_DB", "krishimitra_archive.db")
+ARCHIVE_AFTER_DAYS = int(os.environ.get("KRISHIMITRA_ARCHIVE_AFTER_DAYS", "180"))
+CHUNK_SIZE = 5000
+
+# table -> (age column, columns indexed in the archive copy)
+TIERED_TABLES = {
+    "activities": ("created_at", ("user_id", "created_at")),
+    "irrigation_schedule": ("schedule_date", ("user_id", "schedule_date")),
+    "pest_alerts": ("alert_date", ("district", "alert_date")),
+}
+
+# Archived rows still count towards the dashboard totals.
+_STATS_COLUMNS = {"activities": "activity_count"}
+
+
+_WATERMARK = '''INSERT INTO archive_watermarks (table_name, archived_before) VALUES (?, ?)
+                ON CONFLICT(table_name) DO UPDATE SET
+                    archived_before = MAX(archived_before, excluded.archived_before)'''
+
+
+def hot_cutoff(max_age_days=ARCHIVE_AFTER_DAYS):
+    """UTC date ``max_age_days`` ago; ages are compared against UTC timestamps"""
+    return time.strftime("%Y-%m-%d", time.gmtime(time.time() - max_age_days * 86400))
+
+
+def archived_before(table, conn=None):
+    """Rows of ``table`` older than this date may be in the archive (None: nothing archived)"""
+    sql = "SELECT archived_before FROM archive_watermarks WHERE table_name = ?"
+    row = conn.execute(sql, (table,)).fetchone() if conn else db.query_one(sql, (table,))
+    return row[0] if row else None
+
+
+def in_hot_tier(table, start):
+    """Whether every ``table`` row from ``start`` on is still in the main database"""
+    watermark = archived_before(table)
+    return watermark is None or str(start) >= watermark
+
+
+def attach(conn, path=ARCHIVE_PATH):
+    """Attach the archive to ``conn`` (idempotent) and expose ``<table>_all`` views"""
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    if "archive" in attached:
+        return
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    for table, (age_column, index_columns) in TIERED_TABLES.items():
+        conn.execute(f"CREATE TABLE IF NOT EXISTS archive.{table} AS SELECT * FROM main.{table} WHERE 0")
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_{table}_id ON {table}(id)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS archive.idx_{table}_{'_'.join(index_columns)} "
+                     f"ON {table}({', '.join(index_columns)})")
+        conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {table}_all AS "
+                     f"SELECT * FROM main.{table} UNION ALL SELECT * FROM archive.{table}")
+    if conn.in_transaction:
+        conn.commit()
+
+
+def query_with_archive(sql, params=(), path=ARCHIVE_PATH):
+    """Run a read query with the archive attached, on a connection of its own.
+
+    Pooled connections never hold the archive open, so a history view does
+    not leave every later dashboard query paying for the attached file.
+    """
+    conn = db._connect(db.DB_PATH)
+    try:
+        attach(conn, path)
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def archive_old_rows(max_age_days=ARCHIVE_AFTER_DAYS, path=ARCHIVE_PATH):
+    """Move rows older than ``max_age_days`` into the archive; returns counts per table"""
+    conn = db._connect(db.DB_PATH)
+    try:
+        attach(conn, path)
+        cutoff = hot_cutoff(max_age_days)
+        moved = {}
+        for table, (age_column, _) in TIERED_TABLES.items():
+            # Raise the watermark before moving anything, so readers include
+            # the archive for the whole range that may already be there.
+            with conn:
+                conn.execute(_WATERMARK, (table, cutoff))
+            moved[table] = 0
+            while True:
+                with conn:
+                    ids = [row[0] for row in conn.execute(
+                        f"SELECT id FROM main.{table} WHERE {age_column} < ? ORDER BY id LIMIT ?",
+                        (cutoff, CHUNK_SIZE))]
+                    if not ids:
+                        break
+                    _move_chunk(conn, table, ids)
+                moved[table] += len(ids)
+            if moved[table]:
+                logger.info("Archived %d %s rows older than %s", moved[table], table, cutoff)
+        return moved
+    finally:
+        conn.close()
+
+
+def _move_chunk(conn, table, ids):
+    placeholders = ", ".join("?" * len(ids))
+    stats_column = _STATS_COLUMNS.get(table)
+    if stats_column:
+        per_user = conn.execute(f"SELECT user_id, COUNT(*) FROM main.{table} "
+                                f"WHERE id IN ({placeholders}) AND user_id IS NOT NULL GROUP BY user_id",
+                                ids).fetchall()
+    conn.execute(f"INSERT OR IGNORE INTO archive.{table} SELECT * FROM main.{table} WHERE id IN ({placeholders})",
+                 ids)
+    conn.execute(f"DELETE FROM main.{table} WHERE id IN ({placeholders})", ids)
+    if stats_column:
+        # The delete triggers decremented the counters; archived rows still count.
+        conn.executemany(f"UPDATE user_stats SET {stats_column} = {stats_column} + ? WHERE user_id = ?",
+                         [(count, user_id) for user_id, count in per_user])
+
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def start_background(interval_hours=24):
+    """Run ``archive_old_rows`` now and then every ``interval_hours`` in a daemon thread"""
+    global _background
+    with _background_lock:
+        if _background is not None:
+            return
+        _background = threading.Thread(target=_archive_forever, args=(interval_hours,),
+                                       name="krishimitra-tiering", daemon=True)
+        _background.start()
+
+
+def _archive_forever(interval_hours):
+    while True:
+        try:
+            archive_old_rows()
+        except Exception:
+            logger.exception("Archive pass failed")
+        time.sleep(interval_hours * 3600)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old rows into the archive database")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help="archive rows older than this many days")
+    args = parser.parse_args()
+    db.ensure_schema()
+    for table, count in archive_old_rows(args.days).items():
+        print(f"{table}: {count} rows archived")
@@ -0,0 +1,175 @@
+"""Single-writer, write-behind queue for INSERTs.
+
+Page code hands rows to ``submit``; one background thread owns a dedicated
+connection, drains the bounded queue and commits whatever has accumulated
+as one transaction, grouping consecutive rows for the same statement into a
+single ``executemany``. Callers that must read their own writes (typically
+right before ``st.rerun()``) call ``flush``.
+
+Every row goes through the queue, so rows commit in submission order; when
+the queue is full ``submit`` waits for room rather than writing around it.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+import db
+
+logger = logging.getLogger(__name__)
+
+MAX_QUEUE = 10000
+MAX_BATCH = 500
+# How long the writer waits for more rows to join a batch once one arrives.
+BATCH_WINDOW = 0.02
+SUBMIT_TIMEOUT = 2.0
+
+
+class _FlushMarker:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class WriteBehindQueue:
+    def __init__(self, path=None, maxsize=MAX_QUEUE, max_batch=MAX_BATCH, batch_window=BATCH_WINDOW):
+        self.path = path or db.DB_PATH
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=200)
+        self._stats = {"batches": 0, "rows": 0, "errors": 0, "full_waits": 0}
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="krishimitra-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, sql, params=()):
+        """Queue one row; blocks while the queue is full"""
+        self.submit_many(sql, [params])
+
+    def submit_many(self, sql, seq_of_params):
+        self.start()
+        for params in seq_of_params:
+            self._put((sql, tuple(params)))
+
+    def _put(self, item):
+        try:
+            self._queue.put(item, timeout=SUBMIT_TIMEOUT)
+            return
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["full_waits"] += 1
+        # Writing this row ourselves would commit it ahead of the queued ones;
+        # wait for the writer instead, restarting it if it has died.
+        while True:
+            self.start()
+            try:
+                self._queue.put(item, timeout=SUBMIT_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+    def flush(self, timeout=5.0):
+        """Wait until everything submitted so far is committed"""
+        if self._thread is None:
+            return True
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def metrics(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+        stats["queue_depth"] = self._queue.qsize()
+        if latencies:
+            stats["flush_ms_avg"] = sum(latencies) / len(latencies)
+            stats["flush_ms_p95"] = latencies[int(0.95 * (len(latencies) - 1))]
+            stats["flush_ms_max"] = latencies[-1]
+        return stats
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        conn = db._connect(self.path)
+        while True:
+            batch = self._next_batch()
+            rows = [item for item in batch if not isinstance(item, _FlushMarker)]
+            if rows:
+                self._write(conn, rows)
+            for item in batch:
+                if isinstance(item, _FlushMarker):
+                    item.done.set()
+
+    def _write(self, conn, rows):
+        started = time.perf_counter()
+        groups = []
+        for sql, params in rows:
+            if groups and groups[-1][0] == sql:
+                groups[-1][1].append(params)
+            else:
+                groups.append((sql, [params]))
+        try:
+            with conn:
+                for sql, params in groups:
+                    conn.executemany(sql, params)
+        except Exception as e:
+            logger.warning("Batch of %d rows failed (%s); retrying row by row", len(rows), e)
+            self._write_individually(conn, rows)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["rows"] += len(rows)
+            self._latencies.append(elapsed_ms)
+
+    def _write_individually(self, conn, rows):
+        for sql, params in rows:
+            try:
+                with conn:
+                    conn.execute(sql, params)
+            except Exception:
+                logger.exception("Dropped write: %s", sql.split("(")[0].strip())
+                with self._stats_lock:
+                    self._stats["errors"] += 1
+
+
+_writer = WriteBehindQueue()
+
+
+def submit(sql, params=()):
+    _writer.submit(sql, params)
+
+
+def submit_many(sql, seq_of_params):
+    _writer.submit_many(sql, seq_of_params)
+
+
+def flush(timeout=5.0):
+    return _writer.flush(timeout)
+
+
+def metrics():
+    return _writer.metrics()
+
+
+atexit.register(flush, 2.0)